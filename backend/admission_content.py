@@ -0,0 +1,270 @@
+"""
+Static admission and college-information content.
+
+The content lives in a versioned data file (data/admission_content.json) that
+is read once at import. The /api/admission/* payloads (including every fee-calculator
+combination) are serialized once, with
+an ETag derived from the file version and body, and the chatbot's markdown
+answers are rendered once per (intent, sub-topic) and then reused.
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CONTENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'admission_content.json')
+
+# Keywords that pick the sub-topic of an ask_admission question, checked in order
+ADMISSION_SUBTOPICS = [
+    ('eligibility', ['eligibility', 'criteria', 'qualification']),
+    ('cutoff', ['cutoff', 'merit', 'rank']),
+    ('intake', ['seat', 'intake', 'capacity']),
+]
+
+
+class AdmissionContent:
+    def __init__(self, path: str):
+        with open(path, encoding='utf-8') as content_file:
+            self._content: Dict[str, Any] = json.load(content_file)
+        self.version: str = self._content.get('version', 'unversioned')
+        self.college_data: Dict[str, Any] = self._content['college_data']
+        self._payloads: Dict[Any, Tuple[bytes, str]] = {}
+        self._build_fee_matrix()
+
+    def _serialize(self, key, document: Dict[str, Any]) -> Tuple[bytes, str]:
+        if key not in self._payloads:
+            body = json.dumps(document, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            digest = hashlib.sha1(body).hexdigest()[:16]
+            self._payloads[key] = (body, f'{self.version}-{digest}')
+        return self._payloads[key]
+
+    def payload(self, section: str) -> Tuple[bytes, str]:
+        """Serialized {'success': True, 'data': <section>} body and its ETag"""
+        return self._serialize(section, {'success': True, 'data': self._content[section]})
+
+    # ---------- Fee calculator ----------
+    def _build_fee_matrix(self):
+        """Precompute the calculator result for every branch x hostel x transport choice"""
+        calculator = self._content['fee_calculator']
+        branch_fees = {code: branch['total'] for code, branch in self._content['admission_fees']['feeStructure'].items()}
+        self.default_branch: str = calculator['defaultBranch']
+        self.fee_matrix: Dict[Tuple[str, bool, bool], Dict[str, Any]] = {}
+        for branch, base_fee in branch_fees.items():
+            for include_hostel in (False, True):
+                for include_transport in (False, True):
+                    hostel_fee = calculator['hostelFee'] if include_hostel else 0
+                    transport_fee = calculator['transportFee'] if include_transport else 0
+                    self.fee_matrix[(branch, include_hostel, include_transport)] = {
+                        "baseFees": base_fee,
+                        "hostelFees": hostel_fee,
+                        "transportFees": transport_fee,
+                        "breakdown": {
+                            "tuitionFee": base_fee * 0.8,
+                            "developmentFee": base_fee * 0.08,
+                            "libraryFee": 2000,
+                            "laboratoryFee": 3000,
+                            "examinationFee": 2000,
+                            "sportsFee": 1000
+                        },
+                        "totalFees": base_fee + hostel_fee + transport_fee
+                    }
+
+    def fee_calculation_payload(self, branch: str, include_hostel: bool, include_transport: bool) -> Tuple[bytes, str]:
+        """Calculator body for one selection; unknown branches are priced as the default branch"""
+        if (branch, include_hostel, include_transport) not in self.fee_matrix:
+            branch = self.default_branch
+        key = (branch, include_hostel, include_transport)
+        return self._serialize(('fee_calculation',) + key, {'success': True, 'calculation': self.fee_matrix[key]})
+
+    def fee_matrix_payload(self) -> Tuple[bytes, str]:
+        """Every calculator result, nested as branch -> includeHostel -> includeTransport"""
+        matrix: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (branch, include_hostel, include_transport), calculation in self.fee_matrix.items():
+            hostel_key = 'true' if include_hostel else 'false'
+            transport_key = 'true' if include_transport else 'false'
+            matrix.setdefault(branch, {}).setdefault(hostel_key, {})[transport_key] = calculation
+        return self._serialize('fee_matrix', {
+            'success': True,
+            'data': {'defaultBranch': self.default_branch, 'matrix': matrix}
+        })
+
+
+admission_content = AdmissionContent(os.getenv('ADMISSION_CONTENT_PATH', DEFAULT_CONTENT_PATH))
+
+
+def _admission_subtopic(message_lower: str) -> Optional[str]:
+    for subtopic, keywords in ADMISSION_SUBTOPICS:
+        if any(word in message_lower for word in keywords):
+            return subtopic
+    return None
+
+
+def get_college_info_response(message, intent):
+    """Generate responses for college information queries"""
+    subtopic = _admission_subtopic(message.lower()) if intent == 'ask_admission' else None
+    return _render_college_info(intent, subtopic)
+
+
+@lru_cache(maxsize=64)
+def _render_college_info(intent, subtopic):
+    college_data = admission_content.college_data
+
+    # Admission queries
+    if intent == 'ask_admission':
+        if subtopic == 'eligibility':
+            response = f"📋 **Admission Eligibility**\n{'='*60}\n\n"
+            response += f"✅ **UG (B.Tech):** {college_data['admission_eligibility_ug']}\n\n"
+            response += f"✅ **PG (M.Tech):** B.E./B.Tech in relevant discipline with minimum 50% (45% for reserved).\n\n"
+            response += f"✅ **Entrance Exams:** {', '.join(college_data['admission_exams'])}\n\n"
+            response += f"📝 **Total UG Intake:** {college_data['total_intake_ug']} seats\n"
+            response += f"{'='*60}"
+            return response
+        
+        elif subtopic == 'cutoff':
+            response = f"📊 **Cutoff Information (2025)**\n{'='*60}\n\n"
+            response += f"🎓 **Computer Science:** MHT-CET: {college_data['cutoff_cse']}%, JEE: 201,109\n"
+            response += f"🤖 **AI & Data Science:** MHT-CET: {college_data['cutoff_ai']}%\n"
+            response += f"📡 **ENTC:** MHT-CET: 76.33%\n"
+            response += f"⚙️ **Mechanical:** MHT-CET: 72.38%\n"
+            response += f"🏗️ **Civil:** MHT-CET: 73.20%\n\n"
+            response += f"💡 80% seats via CAP, 20% via Institute Quota\n"
+            response += f"{'='*60}"
+            return response
+        
+        elif subtopic == 'intake':
+            response = f"📚 **Courses & Intake**\n{'='*60}\n\n"
+            response += f"**Undergraduate (B.Tech):**\n"
+            for course in college_data['courses_ug']:
+                response += f"  • {course['course']} - {course['intake']} seats\n"
+            response += f"\n**Postgraduate (M.Tech):**\n"
+            for course in college_data['courses_pg']:
+                response += f"  • {course['course']} - {course['intake']} seats\n"
+            response += f"\n📊 Total UG: {college_data['total_intake_ug']} seats\n"
+            response += f"{'='*60}"
+            return response
+        
+        else:
+            response = f"🎓 **Admission Process**\n{'='*60}\n\n"
+            response += f"📍 **College:** {college_data['college_name']}\n"
+            response += f"📝 **Intake:** {college_data['total_intake_ug']} UG seats\n"
+            response += f"🎯 **Entrance Exams:** {', '.join(college_data['admission_exams'])}\n"
+            response += f"✅ **Seats:** 80% CAP, 20% Institute Quota\n\n"
+            response += f"📞 **Contact:** {college_data['phone']}\n"
+            response += f"🌐 **Website:** {college_data['website']}\n"
+            response += f"{'='*60}"
+            return response
+    
+    # Fees queries
+    elif intent == 'ask_fees':
+        response = f"💰 **Fee Structure (2025-26)**\n{'='*60}\n\n"
+        response += f"🎓 **B.Tech (Per Year):**\n"
+        response += f"   Open Category:       ₹{college_data['fee_structure']['open']:,}\n"
+        response += f"   OBC/EBC/SEBC:        ₹{college_data['fee_structure']['obc']:,}\n"
+        response += f"   TFWS/NT/Girls:       ₹{college_data['fee_structure']['reserved']:,}\n"
+        response += f"   SC/ST:               ₹{college_data['fee_structure']['sc_st']:,}\n\n"
+        response += f"📚 **M.Tech:** ₹68,213 (General), ₹38,500 (Reserved)\n\n"
+        response += f"🛏️ **Hostel & Mess:** ₹{college_data['hostel_fee']:,} per year\n"
+        response += f"💳 **Caution Deposit:** ₹{college_data['fee_structure']['caution']:,}\n"
+        response += f"{'='*60}"
+        return response
+    
+    # Cutoff queries
+    elif intent == 'ask_cutoff':
+        response = f"📊 **Cutoff Information (2025)**\n{'='*60}\n\n"
+        response += f"🎓 **Computer Science:** MHT-CET: {college_data['cutoff_cse']}%, JEE: 201,109 rank\n"
+        response += f"🤖 **AI & Data Science:** MHT-CET: {college_data['cutoff_ai']}%\n"
+        response += f"📡 **ENTC:** MHT-CET: 76.33%\n"
+        response += f"⚙️ **Mechanical:** MHT-CET: 72.38%\n"
+        response += f"🏗️ **Civil:** MHT-CET: 73.20%\n\n"
+        response += f"💡 **Seat Distribution:** 80% CAP, 20% Institute Quota\n"
+        response += f"{'='*60}"
+        return response
+    
+    # College info queries
+    elif intent == 'ask_college_info':
+        response = f"🏛️ **College Information**\n{'='*60}\n\n"
+        response += f"📚 **Name:** {college_data['college_name']}\n"
+        response += f"📅 **Established:** {college_data['established_year']}\n"
+        response += f"✅ **Approval:** {college_data['approval']}\n"
+        response += f"🎓 **Affiliation:** {college_data['affiliation']}\n"
+        response += f"📍 **Address:** {college_data['address']}\n"
+        response += f"📞 **Phone:** {college_data['phone']}\n"
+        response += f"✉️ **Email:** {college_data['email']}\n"
+        response += f"🌐 **Website:** {college_data['website']}\n"
+        response += f"{'='*60}"
+        return response
+    
+    # Hostel queries
+    elif intent == 'ask_hostel':
+        response = f"🛏️ **Hostel Information**\n{'='*60}\n\n"
+        response += f"🏠 **Total Capacity:** {college_data['hostel_capacity']}\n"
+        response += f"💵 **Annual Fee:** ₹{college_data['hostel_fee']:,} (including mess)\n"
+        response += f"🪑 **Room Type:** 3-4 students per room with bed, table, chair, cupboard\n"
+        response += f"✨ **Facilities:** 24x7 Security, Wi-Fi, RO Water, Laundry, Recreation, Hot Water, Medical Aid\n\n"
+        response += f"📋 **Allocation:** First-Come-First-Serve\n"
+        response += f"🚫 **Ragging Policy:** Zero Tolerance\n"
+        response += f"{'='*60}"
+        return response
+    
+    # Transport queries
+    elif intent == 'ask_transport':
+        response = f"🚌 **Transport Facility**\n{'='*60}\n\n"
+        response += f"✅ **Available:** Yes\n"
+        response += f"📍 **Routes:** Pandharpur, Mangalwedha, Sangola, and nearby villages\n"
+        response += f"📝 **Note:** Students can register during admission or at admin office\n"
+        response += f"{'='*60}"
+        return response
+    
+    # Placement queries
+    elif intent == 'ask_placement':
+        response = f"💼 **Placement Information**\n{'='*60}\n\n"
+        response += f"📊 **Average Package:** ₹{college_data['average_package']} LPA\n"
+        response += f"🏆 **Highest Package:** ₹{college_data['highest_package']} LPA\n"
+        response += f"🏢 **Major Recruiters:** {', '.join(college_data['recruiters'])}\n\n"
+        response += f"📚 **Training:** Soft Skills, Aptitude, Technical Interview Prep, Resume Building\n"
+        response += f"🎯 **Internships:** Available for 3rd & 4th year students\n"
+        response += f"{'='*60}"
+        return response
+    
+    # Scholarship queries
+    elif intent == 'ask_scholarship':
+        response = f"🎓 **Scholarship Information**\n{'='*60}\n\n"
+        for scholarship in college_data['scholarships']:
+            response += f"• {scholarship}\n"
+        response += f"\n💰 **SC/ST:** Full tuition fee waiver under government scheme\n"
+        response += f"💵 **Fee Structure:**\n"
+        response += f"   Open: ₹{college_data['fee_structure']['open']:,}\n"
+        response += f"   OBC/EBC: ₹{college_data['fee_structure']['obc']:,}\n"
+        response += f"   TFWS/NT: ₹{college_data['fee_structure']['reserved']:,}\n"
+        response += f"   SC/ST: ₹{college_data['fee_structure']['sc_st']:,}\n"
+        response += f"{'='*60}"
+        return response
+    
+    # Document queries
+    elif intent == 'ask_documents':
+        response = f"📋 **Documents Required**\n{'='*60}\n\n"
+        documents = ["10th & 12th Marksheets", "Entrance Exam Scorecard", "CAP Allotment Letter", 
+                    "Caste Certificate (if applicable)", "Domicile Certificate", "Aadhaar Card", 
+                    "Passport-size Photos", "Medical Fitness Certificate", "Income Certificate"]
+        for i, doc in enumerate(documents, 1):
+            response += f"{i}. {doc}\n"
+        response += f"{'='*60}"
+        return response
+    
+    # Guidance queries
+    elif intent == 'ask_guidance':
+        response = f"💡 **Student Guidance**\n{'='*60}\n\n"
+        response += f"🤖 **For AI Career:** Choose Computer Science (CSE) or AI & Data Science\n"
+        response += f"🎯 **Best Placements:** Computer Science Engineering\n"
+        response += f"🔄 **Branch Change:** Allowed after 1st year based on merit and seat availability\n"
+        response += f"📊 **Placement Rates:** CSE > AI/DS > ENTC > MECH > CIVIL\n\n"
+        response += f"💡 **Tips:**\n"
+        response += f"   • Choose based on interest and career goals\n"
+        response += f"   • Consider placement trends and emerging technologies\n"
+        response += f"   • Mechanical and Civil have good core industry prospects\n"
+        response += f"{'='*60}"
+        return response
+    
+    else:
+        return "How can I help you with college information?"
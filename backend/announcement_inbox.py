@@ -0,0 +1,181 @@
+"""
+Per-user announcement inbox without per-user copies.
+
+An announcement is stored once with its audience (target = all / students /
+teachers / class / dept / student, target_id). 'teachers' means staff
+accounts: every user whose role is not 'student'. A user's feed is a single
+query over the announcements addressed to them, through
+ix_announcements_target_id:
+
+    target = 'all'
+    OR target = 'students' (students) / target = 'teachers' (staff)
+    OR (target = 'class' AND target_id = :class_id)
+    OR (target = 'dept' AND target_id = :dept_id)
+    OR (target = 'student' AND target_id = :student_id)
+
+Read state is a per-user watermark (every announcement_id at or below it
+counts as read) plus sparse read marks for individual announcements above
+it. "Mark all read" just moves the watermark and prunes the marks beneath it,
+so publishing to thousands of students writes one row, and reading state
+costs at most one row per announcement a user opened out of order.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Announcement, AnnouncementRead, AnnouncementWatermark, Class, Department, Student, User
+from pagination import keyset_page
+
+FEED_ORDER = ((Announcement.announcement_id, True),)
+
+# Audiences an announcement can be addressed to; the last three need a target_id
+ANNOUNCEMENT_TARGETS = ('all', 'students', 'teachers', 'class', 'dept', 'student')
+# Scoped targets -> the model whose primary key target_id must name
+SCOPED_TARGETS = {'class': Class, 'dept': Department, 'student': Student}
+
+
+class InvalidAudience(ValueError):
+    """target/target_id do not name anyone an announcement could be delivered to"""
+
+
+def validate_audience(target: Optional[str], target_id: Any) -> Tuple[str, Optional[int]]:
+    """(target, target_id) to store for a new announcement; raises InvalidAudience"""
+    target = target or 'all'
+    if target not in ANNOUNCEMENT_TARGETS:
+        raise InvalidAudience(f"target must be one of: {', '.join(ANNOUNCEMENT_TARGETS)}")
+    model = SCOPED_TARGETS.get(target)
+    if model is None:
+        return target, None
+    try:
+        target_id = int(target_id)
+    except (TypeError, ValueError):
+        raise InvalidAudience(f"target '{target}' needs a numeric target_id")
+    if db.session.get(model, target_id) is None:
+        raise InvalidAudience(f"target_id {target_id} does not match any {target}")
+    return target, target_id
+
+
+def audience_clause(principal):
+    """Announcements addressed to a principal (staff see target='all' and 'teachers')"""
+    clauses = [Announcement.target == 'all',
+               Announcement.target == ('students' if principal.student_id is not None else 'teachers')]
+    for target, target_id in (('class', principal.class_id), ('dept', principal.dept_id),
+                              ('student', principal.student_id)):
+        if target_id is not None:
+            clauses.append(and_(Announcement.target == target, Announcement.target_id == target_id))
+    return or_(*clauses)
+
+
+def _visible():
+    return and_(
+        Announcement.is_active == True,
+        or_(Announcement.expires_at.is_(None), Announcement.expires_at > datetime.utcnow())
+    )
+
+
+def fetch_feed(principal, limit: Optional[int] = None, after: Optional[str] = None,
+               unread_only: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One keyset page of a principal's announcements, newest first, with is_read.
+    Returns (announcements, next cursor).
+    """
+    watermark = func.coalesce(AnnouncementWatermark.last_seen_id, 0)
+    query = (
+        db.session.query(Announcement, AnnouncementRead.announcement_id.label('read_mark'),
+                         watermark.label('watermark'))
+        .outerjoin(AnnouncementRead, and_(AnnouncementRead.announcement_id == Announcement.announcement_id,
+                                          AnnouncementRead.user_id == principal.user_id))
+        .outerjoin(AnnouncementWatermark, AnnouncementWatermark.user_id == principal.user_id)
+        .filter(audience_clause(principal), _visible())
+    )
+    if unread_only:
+        query = query.filter(Announcement.announcement_id > watermark, AnnouncementRead.announcement_id.is_(None))
+    rows, next_cursor = keyset_page(query, FEED_ORDER, limit, after,
+                                    row_key=lambda row: [row.Announcement.announcement_id])
+    feed = []
+    for announcement, read_mark, last_seen_id in rows:
+        item = announcement.to_dict()
+        item['is_read'] = read_mark is not None or announcement.announcement_id <= last_seen_id
+        feed.append(item)
+    return feed, next_cursor
+
+
+def unread_announcement_count(principal) -> int:
+    watermark = (
+        select(AnnouncementWatermark.last_seen_id)
+        .where(AnnouncementWatermark.user_id == principal.user_id)
+        .scalar_subquery()
+    )
+    return db.session.query(func.count(Announcement.announcement_id)).outerjoin(
+        AnnouncementRead, and_(AnnouncementRead.announcement_id == Announcement.announcement_id,
+                               AnnouncementRead.user_id == principal.user_id)
+    ).filter(
+        audience_clause(principal), _visible(),
+        Announcement.announcement_id > func.coalesce(watermark, 0),
+        AnnouncementRead.announcement_id.is_(None)
+    ).scalar()
+
+
+def mark_read(principal, announcement_id: int) -> bool:
+    """Record a read mark (committed here); already-read announcements are left alone.
+    Returns False if the announcement does not exist or is not addressed to the principal.
+    """
+    addressed = db.session.query(Announcement.announcement_id).filter(
+        Announcement.announcement_id == announcement_id, audience_clause(principal)
+    ).first()
+    if addressed is None:
+        return False
+    last_seen_id = db.session.query(AnnouncementWatermark.last_seen_id).filter_by(
+        user_id=principal.user_id).scalar() or 0
+    if announcement_id <= last_seen_id:
+        return True
+    db.session.add(AnnouncementRead(user_id=principal.user_id, announcement_id=announcement_id))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    return True
+
+
+def mark_all_read(principal) -> int:
+    """Move the watermark to the newest announcement addressed to the user (committed here)"""
+    newest = db.session.query(func.max(Announcement.announcement_id)).filter(audience_clause(principal)).scalar() or 0
+    state = db.session.get(AnnouncementWatermark, principal.user_id)
+    if state is None:
+        state = AnnouncementWatermark(user_id=principal.user_id, last_seen_id=0)
+        db.session.add(state)
+    state.last_seen_id = max(state.last_seen_id or 0, newest)
+    # Marks under the watermark carry no information any more
+    AnnouncementRead.query.filter(AnnouncementRead.user_id == principal.user_id,
+                                  AnnouncementRead.announcement_id <= state.last_seen_id).delete()
+    db.session.commit()
+    return state.last_seen_id
+
+
+def forget_announcement(announcement_id: int):
+    """Drop the read marks of an announcement that is about to be deleted (not committed)"""
+    AnnouncementRead.query.filter_by(announcement_id=announcement_id).delete()
+
+
+def announcement_recipients(connection, target: Optional[str], target_id: Optional[int]) -> Optional[List[int]]:
+    """User ids an announcement is addressed to, or None for everyone.
+    Mirrors audience_clause; an unknown target is logged and reaches nobody.
+    """
+    if not target or target == 'all':
+        return None
+    if target == 'teachers':
+        query = select(User.user_id).where(User.role != 'student')
+    elif target == 'students':
+        query = select(Student.user_id)
+    elif target == 'class':
+        query = select(Student.user_id).where(Student.class_id == target_id)
+    elif target == 'dept':
+        query = (select(Student.user_id).join(Class, Class.class_id == Student.class_id)
+                 .where(Class.dept_id == target_id))
+    elif target == 'student':
+        query = select(Student.user_id).where(Student.student_id == target_id)
+    else:
+        print(f"Announcement target {target!r} is not one of {', '.join(ANNOUNCEMENT_TARGETS)}; not delivered")
+        return []
+    return [user_id for (user_id,) in connection.execute(query)]
@@ -1,22 +1,41 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from models import (db, User, Department, Class, Subject, Student, Fee, Mark, 
                    Attendance, Event, EventRegistration, Announcement, Course, Notification, ChatMessage,
                    get_fee_details, get_attendance, get_upcoming_events)
+from data_service import (fetch_student_marks, fetch_student_fees, fetch_attendance_summary,
+                          fetch_user_notifications, fetch_user_notifications_page, fetch_class_marks,
+                          fetch_class_attendance, fetch_class_fees, fetch_student_registrations)
+from pagination import InvalidCursor, keyset_page, page_args, DEFAULT_PAGE_SIZE
+from intent_matcher import intent_matcher
+from auth import (init_app as init_auth, issue_token, issue_stream_ticket, login_required,
+                  accepts_stream_ticket, current_principal, caller_principal, IdentityMismatch, invalidate_principal)
+from notification_bus import notification_bus, event_stream
+from notification_counters import get_unread_count
+from announcement_inbox import (fetch_feed, unread_announcement_count, mark_read as mark_announcement_read,
+                                mark_all_read as mark_all_announcements_read, forget_announcement,
+                                validate_audience, InvalidAudience)
+from event_registrations import (register_student, cancel_registration, join_waitlist, leave_waitlist, clear_waitlist,
+                                 registered_event_ids, RegistrationError, EventFull, RegistrationNotFound)
+from admission_content import admission_content, get_college_info_response
+from voice_service import (voice_service, SpeechNotUnderstood, SpeechServiceUnavailable,
+                           VOICE_NOT_UNDERSTOOD, VOICE_SERVICE_ERROR, VOICE_PROCESSING_ERROR,
+                           VOICE_NO_RESPONSE)
 from rasa_service import rasa_service
+from chat_log import chat_log
+from sentiment import get_sentiment_engine
 from config import config
 import json
 import os
 from datetime import datetime, timedelta, date
 from decimal import Decimal
-from textblob import TextBlob
-import PyPDF2
-import docx
 import re
+from urllib.parse import quote
 
 app = Flask(__name__)
-CORS(app, origins=['http://localhost:3000', 'http://localhost:3001', 'http://127.0.0.1:3000', 'http://127.0.0.1:3001'])
+CORS(app, origins=['http://localhost:3000', 'http://localhost:3001', 'http://127.0.0.1:3000', 'http://127.0.0.1:3001'],
+     expose_headers=['X-Next-Cursor', 'X-Audio-Response', 'X-Chatbot-Intent', 'X-Chatbot-Response'])
 
 # Load configuration
 config_name = os.getenv('FLASK_ENV', 'development')
@@ -24,6 +43,15 @@ app.config.from_object(config[config_name])
 
 # Initialize database
 db.init_app(app)
+# Verify Bearer tokens and resolve the cached principal before each request
+init_auth(app)
+
+def _paged_response(body, next_cursor):
+    """JSON response for one page, with the next page's cursor in X-Next-Cursor"""
+    response = jsonify(body)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
 
 def detect_admin_filters(message):
     """Detect class, roll number, or name filters from message"""
@@ -100,8 +128,8 @@ def login():
         if user.password != password:
             return jsonify({'error': 'Invalid email or password'}), 401
         
-        # Generate token (in production, use JWT)
-        token = f"token-{user.user_id}-{datetime.now().timestamp()}"
+        # Signed, expiring token (verified by the auth before_request hook)
+        token = issue_token(app, user.user_id)
         
         # Return user data and token
         user_data = {
@@ -122,62 +150,21 @@ def login():
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
 @app.route('/api/auth/profile', methods=['GET'])
+@login_required
 def get_profile():
     """
     Get user profile (requires authentication)
     """
-    try:
-        # In production, verify JWT token here
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Authorization token required'}), 401
-        
-        token = auth_header.split(' ')[1]
-        # For now, extract user_id from token (in production, verify JWT)
-        if token.startswith('token-'):
-            user_id = int(token.split('-')[1])
-            user = db.session.get(User, user_id)
-            
-            if not user:
-                return jsonify({'error': 'User not found'}), 404
-            
-            user_data = {
-                'user_id': user.user_id,
-                'name': user.name,
-                'email': user.email,
-                'role': user.role,
-                'contact_no': user.contact_no
-            }
-            
-            return jsonify({'user': user_data}), 200
-        else:
-            return jsonify({'error': 'Invalid token'}), 401
-            
-    except Exception as e:
-        return jsonify({'error': f'Profile fetch failed: {str(e)}'}), 500
+    return jsonify({'user': current_principal().to_dict()}), 200
 
 # Sentiment Analysis Functions
 def analyze_sentiment(text):
     """
-    Analyze sentiment of text using TextBlob
+    Analyze sentiment of text with the configured engine (see sentiment.py)
     Returns polarity score (-1 to 1) and sentiment label
     """
     try:
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        
-        # Determine sentiment label
-        if polarity > 0.1:
-            sentiment_label = "positive"
-        elif polarity < -0.1:
-            sentiment_label = "negative"
-        else:
-            sentiment_label = "neutral"
-            
-        return {
-            'polarity': polarity,
-            'sentiment': sentiment_label
-        }
+        return get_sentiment_engine().score(text)
     except Exception as e:
         print(f"Sentiment analysis error: {str(e)}")
         return {
@@ -185,6 +172,9 @@ def analyze_sentiment(text):
             'sentiment': 'neutral'
         }
 
+# Chat turns are inserted in batches off the request path (see chat_log.py)
+chat_log.init_app(app)
+
 def get_empathetic_prefix(sentiment_data):
     """
     Get empathetic message prefix based on sentiment
@@ -234,221 +224,45 @@ def get_educational_response(intent, parameters, user_message, fulfillment_text=
         'suggestions': suggestions
     }
 
-# --------- College Information Response Function ---------
-def get_college_info_response(message, intent):
-    """Generate responses for college information queries"""
-    
-    # College information data
-    college_data = {
-        "college_name": "SKN Sinhgad College of Engineering (SKNSCOE), Korti, Pandharpur",
-        "established_year": 2010,
-        "affiliation": "Punyashlok Ahilyadevi Holkar Solapur University",
-        "approval": "AICTE, New Delhi",
-        "address": "Gat No. 664, Korti, Pandharpur, Solapur, Maharashtra 413304",
-        "website": "https://www.sinhgad.edu/sinhgad-engineering-institutes/sknscoe-pandharpur/",
-        "email": "principal.sknsce@sinhgad.edu",
-        "phone": "+91-9822053108",
-        "courses_ug": [
-            {"course": "B.E. in Computer Science and Engineering", "intake": 120},
-            {"course": "B.E. in Artificial Intelligence and Data Science", "intake": 60},
-            {"course": "B.E. in Electrical Engineering", "intake": 60},
-            {"course": "B.E. in Civil Engineering", "intake": 60},
-            {"course": "B.E. in Electronics and Telecommunication Engineering", "intake": 60},
-            {"course": "B.E. in Mechanical Engineering", "intake": 90}
-        ],
-        "courses_pg": [
-            {"course": "M.E. in Computer Science and Engineering", "intake": 18},
-            {"course": "M.E. in Electronics", "intake": 18},
-            {"course": "M.E. in Structural Engineering", "intake": 18},
-            {"course": "M.E. in Design Engineering", "intake": 18}
-        ],
-        "total_intake_ug": 450,
-        "admission_eligibility_ug": "Passed 10+2 with Physics, Chemistry, Mathematics; minimum 45% marks (40% for reserved).",
-        "admission_exams": ["MHT-CET", "JEE Main"],
-        "cutoff_cse": "84.48",
-        "cutoff_ai": "82.76",
-        "fee_structure": {
-            "open": 96000,
-            "obc": 54261,
-            "reserved": 12522,
-            "sc_st": 0,
-            "caution": 2000
-        },
-        "hostel_capacity": "2,400 (1,600 boys, 800 girls)",
-        "hostel_fee": 36000,
-        "average_package": 3.2,
-        "highest_package": 8.0,
-        "recruiters": ["TCS", "Infosys", "Wipro", "Capgemini", "Tech Mahindra", "Cognizant"],
-        "scholarships": ["EBC", "TFWS", "Government of India Post-Matric for SC/ST", "Minority Scholarships"]
-    }
-    
-    message_lower = message.lower()
-    
-    # Admission queries
-    if intent == 'ask_admission':
-        if any(word in message_lower for word in ['eligibility', 'criteria', 'qualification']):
-            response = f"📋 **Admission Eligibility**\n{'='*60}\n\n"
-            response += f"✅ **UG (B.Tech):** {college_data['admission_eligibility_ug']}\n\n"
-            response += f"✅ **PG (M.Tech):** B.E./B.Tech in relevant discipline with minimum 50% (45% for reserved).\n\n"
-            response += f"✅ **Entrance Exams:** {', '.join(college_data['admission_exams'])}\n\n"
-            response += f"📝 **Total UG Intake:** {college_data['total_intake_ug']} seats\n"
-            response += f"{'='*60}"
-            return response
-        
-        elif any(word in message_lower for word in ['cutoff', 'merit', 'rank']):
-            response = f"📊 **Cutoff Information (2025)**\n{'='*60}\n\n"
-            response += f"🎓 **Computer Science:** MHT-CET: {college_data['cutoff_cse']}%, JEE: 201,109\n"
-            response += f"🤖 **AI & Data Science:** MHT-CET: {college_data['cutoff_ai']}%\n"
-            response += f"📡 **ENTC:** MHT-CET: 76.33%\n"
-            response += f"⚙️ **Mechanical:** MHT-CET: 72.38%\n"
-            response += f"🏗️ **Civil:** MHT-CET: 73.20%\n\n"
-            response += f"💡 80% seats via CAP, 20% via Institute Quota\n"
-            response += f"{'='*60}"
-            return response
-        
-        elif any(word in message_lower for word in ['seat', 'intake', 'capacity']):
-            response = f"📚 **Courses & Intake**\n{'='*60}\n\n"
-            response += f"**Undergraduate (B.Tech):**\n"
-            for course in college_data['courses_ug']:
-                response += f"  • {course['course']} - {course['intake']} seats\n"
-            response += f"\n**Postgraduate (M.Tech):**\n"
-            for course in college_data['courses_pg']:
-                response += f"  • {course['course']} - {course['intake']} seats\n"
-            response += f"\n📊 Total UG: {college_data['total_intake_ug']} seats\n"
-            response += f"{'='*60}"
-            return response
-        
-        else:
-            response = f"🎓 **Admission Process**\n{'='*60}\n\n"
-            response += f"📍 **College:** {college_data['college_name']}\n"
-            response += f"📝 **Intake:** {college_data['total_intake_ug']} UG seats\n"
-            response += f"🎯 **Entrance Exams:** {', '.join(college_data['admission_exams'])}\n"
-            response += f"✅ **Seats:** 80% CAP, 20% Institute Quota\n\n"
-            response += f"📞 **Contact:** {college_data['phone']}\n"
-            response += f"🌐 **Website:** {college_data['website']}\n"
-            response += f"{'='*60}"
-            return response
-    
-    # Fees queries
-    elif intent == 'ask_fees':
-        response = f"💰 **Fee Structure (2025-26)**\n{'='*60}\n\n"
-        response += f"🎓 **B.Tech (Per Year):**\n"
-        response += f"   Open Category:       ₹{college_data['fee_structure']['open']:,}\n"
-        response += f"   OBC/EBC/SEBC:        ₹{college_data['fee_structure']['obc']:,}\n"
-        response += f"   TFWS/NT/Girls:       ₹{college_data['fee_structure']['reserved']:,}\n"
-        response += f"   SC/ST:               ₹{college_data['fee_structure']['sc_st']:,}\n\n"
-        response += f"📚 **M.Tech:** ₹68,213 (General), ₹38,500 (Reserved)\n\n"
-        response += f"🛏️ **Hostel & Mess:** ₹{college_data['hostel_fee']:,} per year\n"
-        response += f"💳 **Caution Deposit:** ₹{college_data['fee_structure']['caution']:,}\n"
-        response += f"{'='*60}"
-        return response
-    
-    # Cutoff queries
-    elif intent == 'ask_cutoff':
-        response = f"📊 **Cutoff Information (2025)**\n{'='*60}\n\n"
-        response += f"🎓 **Computer Science:** MHT-CET: {college_data['cutoff_cse']}%, JEE: 201,109 rank\n"
-        response += f"🤖 **AI & Data Science:** MHT-CET: {college_data['cutoff_ai']}%\n"
-        response += f"📡 **ENTC:** MHT-CET: 76.33%\n"
-        response += f"⚙️ **Mechanical:** MHT-CET: 72.38%\n"
-        response += f"🏗️ **Civil:** MHT-CET: 73.20%\n\n"
-        response += f"💡 **Seat Distribution:** 80% CAP, 20% Institute Quota\n"
-        response += f"{'='*60}"
-        return response
-    
-    # College info queries
-    elif intent == 'ask_college_info':
-        response = f"🏛️ **College Information**\n{'='*60}\n\n"
-        response += f"📚 **Name:** {college_data['college_name']}\n"
-        response += f"📅 **Established:** {college_data['established_year']}\n"
-        response += f"✅ **Approval:** {college_data['approval']}\n"
-        response += f"🎓 **Affiliation:** {college_data['affiliation']}\n"
-        response += f"📍 **Address:** {college_data['address']}\n"
-        response += f"📞 **Phone:** {college_data['phone']}\n"
-        response += f"✉️ **Email:** {college_data['email']}\n"
-        response += f"🌐 **Website:** {college_data['website']}\n"
-        response += f"{'='*60}"
-        return response
-    
-    # Hostel queries
-    elif intent == 'ask_hostel':
-        response = f"🛏️ **Hostel Information**\n{'='*60}\n\n"
-        response += f"🏠 **Total Capacity:** {college_data['hostel_capacity']}\n"
-        response += f"💵 **Annual Fee:** ₹{college_data['hostel_fee']:,} (including mess)\n"
-        response += f"🪑 **Room Type:** 3-4 students per room with bed, table, chair, cupboard\n"
-        response += f"✨ **Facilities:** 24x7 Security, Wi-Fi, RO Water, Laundry, Recreation, Hot Water, Medical Aid\n\n"
-        response += f"📋 **Allocation:** First-Come-First-Serve\n"
-        response += f"🚫 **Ragging Policy:** Zero Tolerance\n"
-        response += f"{'='*60}"
-        return response
-    
-    # Transport queries
-    elif intent == 'ask_transport':
-        response = f"🚌 **Transport Facility**\n{'='*60}\n\n"
-        response += f"✅ **Available:** Yes\n"
-        response += f"📍 **Routes:** Pandharpur, Mangalwedha, Sangola, and nearby villages\n"
-        response += f"📝 **Note:** Students can register during admission or at admin office\n"
-        response += f"{'='*60}"
-        return response
-    
-    # Placement queries
-    elif intent == 'ask_placement':
-        response = f"💼 **Placement Information**\n{'='*60}\n\n"
-        response += f"📊 **Average Package:** ₹{college_data['average_package']} LPA\n"
-        response += f"🏆 **Highest Package:** ₹{college_data['highest_package']} LPA\n"
-        response += f"🏢 **Major Recruiters:** {', '.join(college_data['recruiters'])}\n\n"
-        response += f"📚 **Training:** Soft Skills, Aptitude, Technical Interview Prep, Resume Building\n"
-        response += f"🎯 **Internships:** Available for 3rd & 4th year students\n"
-        response += f"{'='*60}"
-        return response
-    
-    # Scholarship queries
-    elif intent == 'ask_scholarship':
-        response = f"🎓 **Scholarship Information**\n{'='*60}\n\n"
-        for scholarship in college_data['scholarships']:
-            response += f"• {scholarship}\n"
-        response += f"\n💰 **SC/ST:** Full tuition fee waiver under government scheme\n"
-        response += f"💵 **Fee Structure:**\n"
-        response += f"   Open: ₹{college_data['fee_structure']['open']:,}\n"
-        response += f"   OBC/EBC: ₹{college_data['fee_structure']['obc']:,}\n"
-        response += f"   TFWS/NT: ₹{college_data['fee_structure']['reserved']:,}\n"
-        response += f"   SC/ST: ₹{college_data['fee_structure']['sc_st']:,}\n"
-        response += f"{'='*60}"
-        return response
-    
-    # Document queries
-    elif intent == 'ask_documents':
-        response = f"📋 **Documents Required**\n{'='*60}\n\n"
-        documents = ["10th & 12th Marksheets", "Entrance Exam Scorecard", "CAP Allotment Letter", 
-                    "Caste Certificate (if applicable)", "Domicile Certificate", "Aadhaar Card", 
-                    "Passport-size Photos", "Medical Fitness Certificate", "Income Certificate"]
-        for i, doc in enumerate(documents, 1):
-            response += f"{i}. {doc}\n"
-        response += f"{'='*60}"
-        return response
-    
-    # Guidance queries
-    elif intent == 'ask_guidance':
-        response = f"💡 **Student Guidance**\n{'='*60}\n\n"
-        response += f"🤖 **For AI Career:** Choose Computer Science (CSE) or AI & Data Science\n"
-        response += f"🎯 **Best Placements:** Computer Science Engineering\n"
-        response += f"🔄 **Branch Change:** Allowed after 1st year based on merit and seat availability\n"
-        response += f"📊 **Placement Rates:** CSE > AI/DS > ENTC > MECH > CIVIL\n\n"
-        response += f"💡 **Tips:**\n"
-        response += f"   • Choose based on interest and career goals\n"
-        response += f"   • Consider placement trends and emerging technologies\n"
-        response += f"   • Mechanical and Civil have good core industry prospects\n"
-        response += f"{'='*60}"
-        return response
-    
-    else:
-        return "How can I help you with college information?"
-
 # --------- Rasa Chatbot minimal endpoint (MySQL-backed) ---------
 @app.route('/chatbot', methods=['GET'])
 def chatbot_health():
     # Allow simple GET probes to avoid 405 noise in console
     return jsonify({"ok": True, "endpoint": "/chatbot", "method": "POST"}), 200
 
+def _voice_reply(intent, response_text, data=None):
+    """Reply for the voice endpoint, with synthesized speech when available.
+
+    By default the audio is hex-encoded inside the JSON body. Clients that send
+    response_format=binary get the audio bytes as the body instead, with the
+    text reply in X-Chatbot-* headers; audio_codec=opus|mp3 compresses it.
+    If no audio could be synthesized the reply is always JSON.
+    """
+    reply = {
+        'intent': intent,
+        'response': response_text,
+        'data': data or {},
+        'audio_response': False
+    }
+    audio_data = voice_service.speak(response_text)
+    if not audio_data:
+        return jsonify(reply)
+
+    response_format = request.form.get('response_format') or request.args.get('response_format', 'json')
+    if response_format == 'binary':
+        codec = request.form.get('audio_codec') or request.args.get('audio_codec', 'wav')
+        body, mimetype = voice_service.encode(audio_data, codec)
+        response = app.response_class(body, mimetype=mimetype)
+        response.headers['X-Audio-Response'] = 'true'
+        response.headers['X-Chatbot-Intent'] = intent
+        # Headers are latin-1 only - the reply text has emoji and newlines
+        response.headers['X-Chatbot-Response'] = quote(response_text)
+        return response
+
+    reply['audio_response'] = True
+    reply['audio_data'] = audio_data.hex()  # Convert binary to hex string for JSON
+    return jsonify(reply)
+
 @app.route('/api/chatbot/voice', methods=['POST'])
 def chatbot_voice():
     """Handle voice messages from the chatbot with full speech-to-text processing"""
@@ -465,209 +279,41 @@ def chatbot_voice():
         user_id = request.form.get('user_id')
         student_id = request.form.get('student_id')
         
-        # Save the audio file temporarily
-        import tempfile
-        import os
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            audio_file.save(temp_file.name)
-            temp_audio_path = temp_file.name
-        
+        # Convert speech to text (in memory, no temp files)
         try:
-            # Convert speech to text
-            import speech_recognition as sr
-            from pydub import AudioSegment
-            
-            # Initialize recognizer
-            r = sr.Recognizer()
-            
-            # Convert audio to WAV format if needed
-            audio = AudioSegment.from_file(temp_audio_path)
-            audio = audio.set_frame_rate(16000).set_channels(1)
-            wav_path = temp_audio_path.replace('.wav', '_converted.wav')
-            audio.export(wav_path, format="wav")
-            
-            # Perform speech recognition
-            with sr.AudioFile(wav_path) as source:
-                audio_data = r.record(source)
-                try:
-                    # Use Google Speech Recognition (free, no API key required)
-                    text = r.recognize_google(audio_data, language='en-US')
-                    print(f"Recognized text: {text}")
-                except sr.UnknownValueError:
-                    response_text = 'Sorry, I could not understand your voice. Please try speaking more clearly.'
-                    # Generate audio response even for error cases
-                    try:
-                        import pyttsx3
-                        engine = pyttsx3.init('sapi5')  # Use Windows SAPI5 engine
-                        
-                        # Configure voice settings
-                        voices = engine.getProperty('voices')
-                        if voices:
-                            for voice in voices:
-                                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                                    engine.setProperty('voice', voice.id)
-                                    break
-                        
-                        engine.setProperty('rate', 150)
-                        engine.setProperty('volume', 0.8)
-                        
-                        # Generate audio file
-                        audio_response_path = temp_audio_path.replace('.wav', '_response.wav')
-                        engine.save_to_file(response_text, audio_response_path)
-                        engine.runAndWait()
-                        
-                        # Read the generated audio file
-                        with open(audio_response_path, 'rb') as audio_file:
-                            audio_data = audio_file.read()
-                        
-                        # Clean up
-                        os.unlink(audio_response_path)
-                        
-                        return jsonify({
-                            'intent': 'voice_error',
-                            'response': response_text,
-                            'data': {},
-                            'audio_response': True,
-                            'audio_data': audio_data.hex()
-                        })
-                    except Exception as e:
-                        print(f"Error generating audio for voice error: {e}")
-                        return jsonify({
-                            'intent': 'voice_error',
-                            'response': response_text,
-                            'data': {}
-                        })
-                except sr.RequestError as e:
-                    print(f"Speech recognition error: {e}")
-                    response_text = 'Sorry, there was an error with the speech recognition service. Please try again.'
-                    # Generate audio response for request errors too
-                    try:
-                        import pyttsx3
-                        engine = pyttsx3.init('sapi5')  # Use Windows SAPI5 engine
-                        
-                        voices = engine.getProperty('voices')
-                        if voices:
-                            for voice in voices:
-                                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                                    engine.setProperty('voice', voice.id)
-                                    break
-                        
-                        engine.setProperty('rate', 150)
-                        engine.setProperty('volume', 0.8)
-                        
-                        audio_response_path = temp_audio_path.replace('.wav', '_response.wav')
-                        engine.save_to_file(response_text, audio_response_path)
-                        engine.runAndWait()
-                        
-                        with open(audio_response_path, 'rb') as audio_file:
-                            audio_data = audio_file.read()
-                        
-                        os.unlink(audio_response_path)
-                        
-                        return jsonify({
-                            'intent': 'voice_error',
-                            'response': response_text,
-                            'data': {},
-                            'audio_response': True,
-                            'audio_data': audio_data.hex()
-                        })
-                    except Exception as e:
-                        print(f"Error generating audio for request error: {e}")
-                        return jsonify({
-                            'intent': 'voice_error',
-                            'response': response_text,
-                            'data': {}
-                        })
-            
-            # Process the recognized text through the chatbot
-            chatbot_payload = {
-                'message': text,
-                'user_id': user_id,
-                'student_id': student_id
-            }
-            
-            # Call the main chatbot route
-            from flask import g
-            with app.test_request_context('/chatbot', method='POST', json=chatbot_payload):
-                chatbot_response = chatbot_route()
-                chatbot_data = chatbot_response.get_json()
-            
-            # Generate speech response
-            response_text = chatbot_data.get('response', 'Sorry, I could not process your request.')
-            
-            # Convert text to speech
-            try:
-                import pyttsx3
-                engine = pyttsx3.init('sapi5')  # Use Windows SAPI5 engine
-                
-                # Configure voice settings
-                voices = engine.getProperty('voices')
-                if voices:
-                    # Try to use a female voice if available
-                    for voice in voices:
-                        if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                            engine.setProperty('voice', voice.id)
-                            break
-                
-                # Set speech rate and volume
-                engine.setProperty('rate', 150)  # Speed of speech
-                engine.setProperty('volume', 0.8)  # Volume level (0.0 to 1.0)
-                
-                # Generate audio file
-                audio_response_path = temp_audio_path.replace('.wav', '_response.wav')
-                engine.save_to_file(response_text, audio_response_path)
-                engine.runAndWait()
-                
-                # Read the generated audio file
-                with open(audio_response_path, 'rb') as audio_file:
-                    audio_data = audio_file.read()
-                
-                # Clean up temporary files
-                os.unlink(temp_audio_path)
-                os.unlink(wav_path)
-                os.unlink(audio_response_path)
-                
-                # Return response with audio data
-                return jsonify({
-                    'intent': chatbot_data.get('intent', 'voice_message'),
-                    'response': response_text,
-                    'data': chatbot_data.get('data', {}),
-                    'audio_response': True,
-                    'audio_data': audio_data.hex()  # Convert binary to hex string for JSON
-                })
-                
-            except Exception as e:
-                print(f"Error in text-to-speech: {e}")
-                # Clean up temporary files
-                os.unlink(temp_audio_path)
-                os.unlink(wav_path)
-                
-                # Return response without audio
-                return jsonify({
-                    'intent': chatbot_data.get('intent', 'voice_message'),
-                    'response': response_text,
-                    'data': chatbot_data.get('data', {}),
-                    'audio_response': False
-                })
-            
+            text = voice_service.transcribe(audio_file.stream)
+            print(f"Recognized text: {text}")
+        except SpeechNotUnderstood:
+            return _voice_reply('voice_error', VOICE_NOT_UNDERSTOOD)
+        except SpeechServiceUnavailable as e:
+            print(f"Speech recognition error: {e}")
+            return _voice_reply('voice_error', VOICE_SERVICE_ERROR)
         except Exception as e:
             print(f"Error in voice processing: {e}")
-            # Clean up temporary files
-            try:
-                os.unlink(temp_audio_path)
-                if 'wav_path' in locals():
-                    os.unlink(wav_path)
-                if 'audio_response_path' in locals():
-                    os.unlink(audio_response_path)
-            except:
-                pass
-            
             return jsonify({
                 'intent': 'voice_error',
-                'response': 'Sorry, there was an error processing your voice message. Please try again.',
+                'response': VOICE_PROCESSING_ERROR,
                 'data': {}
             })
         
+        # Process the recognized text through the chatbot
+        chatbot_payload = {
+            'message': text,
+            'user_id': user_id,
+            'student_id': student_id
+        }
+        with app.test_request_context('/chatbot', method='POST', json=chatbot_payload):
+            # chatbot_route may return (response, status), e.g. a 403 identity mismatch
+            chatbot_response = make_response(chatbot_route())
+            chatbot_data = chatbot_response.get_json()
+        if chatbot_response.status_code != 200:
+            return chatbot_response
+        
+        # Speak the chatbot's reply back
+        response_text = chatbot_data.get('response', VOICE_NO_RESPONSE)
+        return _voice_reply(chatbot_data.get('intent', 'voice_message'), response_text,
+                            chatbot_data.get('data', {}))
+        
     except Exception as e:
         print(f"Error processing voice message: {e}")
         return jsonify({'error': 'Failed to process voice message'}), 500
@@ -676,355 +322,277 @@ def chatbot_voice():
 def chatbot_route():
     payload = request.get_json(silent=True) or {}
     message = (payload.get('message') or '').strip()
-    student_id = payload.get('student_id')
-    user_id = payload.get('user_id')
     
-    # Determine user role
-    user_role = None
-    admin_user = None
-    if user_id:
-        try:
-            admin_user = db.session.get(User, int(user_id))
-            if admin_user:
-                user_role = admin_user.role
-        except:
-            pass
+    # Identity comes from the Bearer token; a body user_id/student_id must be the caller's own
+    try:
+        principal = caller_principal(payload.get('user_id'))
+    except IdentityMismatch:
+        return jsonify({'error': 'user_id does not match the authenticated user'}), 403
+    user_role = principal.role if principal else None
+    student_id = principal.student_id if principal else None
+    claimed_student_id = payload.get('student_id')
+    if claimed_student_id and str(claimed_student_id) != str(student_id):
+        return jsonify({'error': 'student_id does not match the authenticated user'}), 403
     
     if not message:
         return jsonify({'error': 'message is required'}), 400
 
-    # Use keyword-based intent detection for better control
+    # Keyword intent detection - one pass over the message with the compiled matcher
     msg = message.lower()
-    intent = 'unknown'
+    intent = intent_matcher.match(msg) or 'unknown'
     confidence = 0.0
 
-    # Enhanced keyword matching for all intents - order matters!
-    # Check specific intents first before general ones
-    
-    # Farewell intent (check first to avoid conflicts)
-    if any(phrase in msg for phrase in ['bye', 'goodbye', 'see you later', 'catch you later', 'talk to you soon', 'take care', 'see ya', 'good night', 'bye smartedu', 'thanks bye', 'ok bye', 'bye for now']):
-        intent = 'goodbye'
-    
-    # How are you intent
-    elif any(phrase in msg for phrase in ['how are you', 'how are you doing', 'how\'s it going', 'how\'s your day', 'how have you been', 'what\'s up smartedu', 'are you fine', 'you good']):
-        intent = 'ask_howareyou'
-    
-    # Who are you intent
-    elif any(phrase in msg for phrase in ['who are you', 'what are you', 'tell me about yourself', 'what\'s your name', 'introduce yourself', 'are you smartedu', 'who is smartedu', 'what is smartedu']):
-        intent = 'ask_whoareyou'
-    
-    # Are you bot intent
-    elif any(phrase in msg for phrase in ['are you a bot', 'are you a robot', 'are you real', 'are you human', 'are you alive', 'do you have feelings', 'are you ai', 'are you chatbot']):
-        intent = 'ask_areyoubot'
-    
-    # Creator intent
-    elif any(phrase in msg for phrase in ['who made you', 'who created you', 'who developed you', 'who built you', 'who designed you', 'tell me your developer name', 'who is your owner']):
-        intent = 'ask_creator'
-    
-    # Help intent
-    elif any(phrase in msg for phrase in ['can you help me', 'i need help', 'please help', 'what can you do', 'what services do you provide', 'how can you help me', 'help me smartedu', 'anyone here', 'are you there', 'are you online', 'smartedu can you assist me']):
-        intent = 'ask_help'
-    
-    # General greeting intent (check last to avoid conflicts)
-    elif any(phrase in msg for phrase in ['hi', 'hello', 'hey', 'heya', 'yo', 'hola', 'namaste', 'good morning', 'good afternoon', 'good evening', 'hello there', 'hi bot', 'hi smartedu', 'hello smartedu', 'hey smartedu', 'smartedu are you there']):
-        intent = 'greet'
-    elif any(word in msg for word in ['fee', 'fees', 'payment', 'due', 'balance', 'show my fees', 'fee details', 'fee status']):
-        intent = 'fee_query'
-    elif any(word in msg for word in ['attendance', 'present', 'absent', 'percentage', 'attend', 'show my attendance', 'attendance details']):
-        intent = 'attendance_query'
-    elif any(word in msg for word in ['event', 'events', 'upcoming', 'schedule', 'seminar', 'workshop', 'fest', 'summit', 'show events', 'list events']):
-        intent = 'event_query'
-    elif any(word in msg for word in ['announcement', 'announcements', 'notification', 'notifications', 'show announcements']):
-        intent = 'announcement_query'
-    elif any(word in msg for word in ['admission', 'admit', 'apply', 'application', 'eligibility', 'entrance', 'mht-cet', 'jee', 'seat', 'intake']):
-        intent = 'ask_admission'
-    elif any(word in msg for word in ['cutoff', 'merit', 'rank', 'percentile']):
-        intent = 'ask_cutoff'
-    elif any(word in msg for word in ['college', 'campus', 'about', 'info', 'information', 'skn', 'sinhgad', 'approved', 'affiliated', 'established']):
-        intent = 'ask_college_info'
-    elif any(word in msg for word in ['hostel', 'accommodation', 'boarding', 'room', 'mess', 'lodging']):
-        intent = 'ask_hostel'
-    elif any(word in msg for word in ['transport', 'bus', 'vehicle', 'commute', 'travel']):
-        intent = 'ask_transport'
-    elif any(word in msg for word in ['placement', 'recruiter', 'package', 'salary', 'company', 'career']):
-        intent = 'ask_placement'
-    elif any(word in msg for word in ['scholarship', 'financial aid', 'tfws', 'ebc', 'fee waiver']):
-        intent = 'ask_scholarship'
-    elif any(word in msg for word in ['document', 'certificate', 'marksheet', 'id proof', 'aadhaar', 'caste']):
-        intent = 'ask_documents'
-    elif any(word in msg for word in ['guidance', 'suggest', 'which branch', 'best branch', 'change branch']):
-        intent = 'ask_guidance'
-    else:
-        # For other queries, provide helpful guidance
-        if any(word in msg for word in ['profile', 'who am i', 'student id', 'roll number', 'department', 'class']):
-            return jsonify({'intent': 'student_info', 'response': 'Please visit your Profile page to view student details.', 'data': {}})
-        elif any(word in msg for word in ['mark', 'marks', 'score', 'result', 'grade', 'academic', 'performance']):
-            # Handle marks query with proper API call
-            # Check if admin is asking
-            is_admin = user_role == 'admin' or user_role == 'HOD'
-            
-            if not is_admin:
-                # For students, get their student_id
-                if not student_id:
-                    if user_id:
-                        student = Student.query.filter_by(user_id=int(user_id)).first()
-                        if student:
-                            student_id = student.student_id
-                if not student_id:
-                    return jsonify({'intent': 'marks_query', 'response': 'Please log in as a student to view marks details.', 'data': {}}), 200
-            
-            # Detect if asking for specific subject (all subjects from database)
-            subject_keywords = {
-                # Core Subjects
-                'data structure': ['data structure', 'ds', 'datal', 'structure'],
-                'computer network': ['computer network', 'cn', 'networks', 'computer networks'],
-                'database management systems': ['database', 'dbms', 'db management', 'database management'],
-                'operating system': ['operating system', 'os'],
-                'discrete mathematics': ['discrete math', 'discrete mathematics', 'dm'],
-                'web technologies': ['web technologies', 'wt', 'web tech'],
-                'software engineering': ['software engineering', 'se', 'software'],
-                'theory of computation': ['theory of computation', 'toc', 'toc theory'],
-                'computer organization': ['computer organization', 'co', 'org'],
-                # Advanced Subjects
-                'artificial intelligence': ['artificial intelligence', 'ai'],
-                'machine learning': ['machine learning', 'ml'],
-                'big data analytics': ['big data', 'bigdata', 'big data analytics', 'bda'],
-                'cloud computing': ['cloud computing', 'cloud', 'cc'],
-                'cyber security': ['cyber security', 'cybersecurity', 'security', 'cs'],
-                'blockchain technology': ['blockchain', 'blockchain technology', 'bt'],
-                # First Year Subjects
-                'engineering mathematics': ['engineering mathematics', 'math', 'mathematics'],
-                'engineering physics': ['engineering physics', 'physics', 'phy'],
-                'basic electrical engineering': ['basic electrical engineering', 'basic electrical', 'eee', 'electrical'],
-                'engineering chemistry': ['engineering chemistry', 'chemistry', 'chem'],
-                'engineering graphics': ['engineering graphics', 'graphics', 'mech']
-            }
-            
-            requested_subject = None
-            for subject, keywords in subject_keywords.items():
-                if any(kw in msg for kw in keywords):
-                    requested_subject = subject
-                    break
-            
-            # Admin handling - show all students or specific student's marks
-            if is_admin:
-                try:
-                    import requests
-                    # Use helper function to detect filters
-                    filters = detect_admin_filters(msg)
+    if intent == 'student_info':
+        return jsonify({'intent': 'student_info', 'response': 'Please visit your Profile page to view student details.', 'data': {}})
+    elif intent == 'help_query':
+        return jsonify({'intent': 'help_query', 'response': 'I can help with fees, attendance, and events. For other features, please explore the dashboard.', 'data': {}})
+    elif intent == 'marks_query':
+        # Handle marks query with proper API call
+        # Check if admin is asking
+        is_admin = user_role == 'admin' or user_role == 'HOD'
+        
+        if not is_admin:
+            if not student_id:
+                return jsonify({'intent': 'marks_query', 'response': 'Please log in as a student to view marks details.', 'data': {}}), 200
+        
+        # Detect if asking for specific subject (all subjects from database)
+        subject_keywords = {
+            # Core Subjects
+            'data structure': ['data structure', 'ds', 'datal', 'structure'],
+            'computer network': ['computer network', 'cn', 'networks', 'computer networks'],
+            'database management systems': ['database', 'dbms', 'db management', 'database management'],
+            'operating system': ['operating system', 'os'],
+            'discrete mathematics': ['discrete math', 'discrete mathematics', 'dm'],
+            'web technologies': ['web technologies', 'wt', 'web tech'],
+            'software engineering': ['software engineering', 'se', 'software'],
+            'theory of computation': ['theory of computation', 'toc', 'toc theory'],
+            'computer organization': ['computer organization', 'co', 'org'],
+            # Advanced Subjects
+            'artificial intelligence': ['artificial intelligence', 'ai'],
+            'machine learning': ['machine learning', 'ml'],
+            'big data analytics': ['big data', 'bigdata', 'big data analytics', 'bda'],
+            'cloud computing': ['cloud computing', 'cloud', 'cc'],
+            'cyber security': ['cyber security', 'cybersecurity', 'security', 'cs'],
+            'blockchain technology': ['blockchain', 'blockchain technology', 'bt'],
+            # First Year Subjects
+            'engineering mathematics': ['engineering mathematics', 'math', 'mathematics'],
+            'engineering physics': ['engineering physics', 'physics', 'phy'],
+            'basic electrical engineering': ['basic electrical engineering', 'basic electrical', 'eee', 'electrical'],
+            'engineering chemistry': ['engineering chemistry', 'chemistry', 'chem'],
+            'engineering graphics': ['engineering graphics', 'graphics', 'mech']
+        }
+        
+        requested_subject = None
+        for subject, keywords in subject_keywords.items():
+            if any(kw in msg for kw in keywords):
+                requested_subject = subject
+                break
+        
+        # Admin handling - show all students or specific student's marks
+        if is_admin:
+            try:
+                # Use helper function to detect filters
+                filters = detect_admin_filters(msg)
+                
+                # Check if user is asking for a specific subject (enhanced detection)
+                detected_subject = None
+                if requested_subject:
+                    detected_subject = requested_subject
+                else:
+                    # Try to match any subject name from the database
+                    all_subjects = Subject.query.all()
+                    for subject in all_subjects:
+                        subject_lower = subject.subject_name.lower()
+                        subject_code_lower = subject.subject_code.lower() if subject.subject_code else ''
+                        msg_lower = msg.lower()
+                        # Normalize both message and subject name for comparison (handle plurals)
+                        msg_normalized = msg_lower.replace('s ', ' ').replace('s', '')
+                        subject_normalized = subject_lower.replace('s ', ' ').replace('s', '')
+                        # Check multiple matching strategies
+                        if (subject_lower in msg_lower or 
+                            subject_lower + 's' in msg_lower or 
+                            msg_normalized in subject_normalized or
+                            subject_normalized in msg_normalized or
+                            subject_code_lower in msg_lower or
+                            msg_lower in subject_lower):
+                            detected_subject = subject.subject_name
+                            break
+                
+                # If subject is requested, filter results by subject
+                if detected_subject:
+                    # Get all students and filter by subject
+                    # For subject queries, get all students regardless of class
+                    all_students = Student.query.all()
                     
-                    # Check if user is asking for a specific subject (enhanced detection)
-                    detected_subject = None
-                    if requested_subject:
-                        detected_subject = requested_subject
-                    else:
-                        # Try to match any subject name from the database
-                        all_subjects = Subject.query.all()
-                        for subject in all_subjects:
-                            subject_lower = subject.subject_name.lower()
-                            subject_code_lower = subject.subject_code.lower() if subject.subject_code else ''
-                            msg_lower = msg.lower()
-                            # Normalize both message and subject name for comparison (handle plurals)
-                            msg_normalized = msg_lower.replace('s ', ' ').replace('s', '')
-                            subject_normalized = subject_lower.replace('s ', ' ').replace('s', '')
-                            # Check multiple matching strategies
-                            if (subject_lower in msg_lower or 
-                                subject_lower + 's' in msg_lower or 
-                                msg_normalized in subject_normalized or
-                                subject_normalized in msg_normalized or
-                                subject_code_lower in msg_lower or
-                                msg_lower in subject_lower):
-                                detected_subject = subject.subject_name
-                                break
+                    subject_text = f" in {detected_subject.upper()}"
+                    response_text = f"📊 **Students Academic Performance{subject_text}**\n"
+                    response_text += f"{'='*60}\n\n"
                     
-                    # If subject is requested, filter results by subject
-                    if detected_subject:
-                        # Get all students and filter by subject
-                        # For subject queries, get all students regardless of class
-                        all_students = Student.query.all()
-                        
-                        subject_text = f" in {detected_subject.upper()}"
-                        response_text = f"📊 **Students Academic Performance{subject_text}**\n"
+                    for student in all_students:
+                        student_marks = Mark.query.filter_by(student_id=student.student_id).all()
+                        if student_marks:
+                            # Track if we've already shown this student
+                            student_shown = False
+                            for mark in student_marks:
+                                subject = db.session.get(Subject, mark.subject_id)
+                                if subject:
+                                    # Normalize both detected subject and actual subject name for comparison
+                                    detected_normalized = detected_subject.lower().replace('s ', ' ').replace('s', '').strip()
+                                    actual_normalized = subject.subject_name.lower().replace('s ', ' ').replace('s', '').strip()
+                                    # Check if they match
+                                    if detected_normalized == actual_normalized or detected_subject.lower() in subject.subject_name.lower():
+                                        if not student_shown:
+                                            obtained = float(mark.obtained_marks)
+                                            total = float(mark.total_marks)
+                                            percentage = (obtained / total * 100) if total > 0 else 0
+                                            status_emoji = "✅" if percentage >= 35 else "❌"
+                                            response_text += f"📌 **{student.user.name}** (Roll: {student.roll_no})\n"
+                                            response_text += f"   └─ {subject.subject_name}: {obtained:.0f}/{total:.0f} ({percentage:.1f}%) {status_emoji}\n\n"
+                                            student_shown = True
+                                            break
+                    
+                    return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {}})
+                
+                if filters['target_student_id']:
+                    # Get student object for name
+                    student_obj = db.session.get(Student, filters['target_student_id'])
+                    student_name = student_obj.user.name if student_obj else 'Student'
+                    
+                    # Fetch specific student's marks
+                    marks_data = fetch_student_marks(filters['target_student_id'])
+                    if marks_data and len(marks_data) > 0:
+                        response_text = f"📊 **Academic Performance Report for {student_name}**\n"
                         response_text += f"{'='*60}\n\n"
+                        for i, mark in enumerate(marks_data[:10], 1):
+                            subject_name = mark.get('subject_name', f'Subject {i}')
+                            obtained = float(mark.get('obtained_marks', 0))
+                            total = float(mark.get('total_marks', 100))
+                            percentage = (obtained / total * 100) if total > 0 else 0
+                            status_emoji = "✅" if percentage >= 35 else "❌"
+                            status_text = "PASS" if percentage >= 35 else "FAIL"
+                            response_text += f"📌 **{subject_name}**\n"
+                            response_text += f"   └─ Marks: {obtained:.0f}/{total:.0f}  |  Percentage: {percentage:.1f}%  |  Status: {status_emoji} {status_text}\n\n"
+                        response_text += f"{'='*60}"
+                        return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {'marks': marks_data}})
+                    else:
+                        return jsonify({'intent': 'marks_query', 'response': f'No marks found for {student_name}.', 'data': {}})
+                else:
+                    # Admin wants all students' marks - query directly from database
+                    # Apply class filter if specified
+                    query = Student.query
+                    
+                    if filters['class_filter']:
+                        # Filter by class name (search in class.class_name)
+                        query = query.join(Class).filter(Class.class_name.ilike(f'%{filters["class_filter"]}%'))
+                    
+                    all_students = query.all()
+                    
+                    class_text = f" ({filters['class_filter']})" if filters['class_filter'] else ""
+                    response_text = f"📊 **Students Academic Performance{class_text}**\n"
+                    response_text += f"{'='*60}\n\n"
+                    response_text += f"Total Students: {len(all_students)}\n\n"
+                    
+                    for student in all_students[:20]:  # Show max 20 students
+                        student_marks = Mark.query.filter_by(student_id=student.student_id).all()
+                        if student_marks:
+                            marks_list = [m.to_dict() for m in student_marks]
+                            total_marks = sum(float(m.get('total_marks', 0)) for m in marks_list)
+                            total_obtained = sum(float(m.get('obtained_marks', 0)) for m in marks_list)
+                            if total_marks > 0:
+                                percentage = (total_obtained / total_marks * 100)
+                                response_text += f"📌 **{student.user.name}** (Roll: {student.roll_no})\n"
+                                response_text += f"   └─ Total: {total_obtained:.0f}/{total_marks:.0f} ({percentage:.1f}%)\n\n"
+                    
+                    return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {}})
+            except Exception as e:
+                print(f"Error in admin marks query: {e}")
+                return jsonify({'intent': 'marks_query', 'response': 'Unable to fetch marks details.', 'data': {}})
+        
+        # Student handling - use the same API endpoint that Student Services uses
+        try:
+            marks_data = fetch_student_marks(int(student_id))
+            if marks_data and len(marks_data) > 0:
+                # If specific subject requested, filter results
+                if requested_subject:
+                    matched_marks = []
+                    seen_subjects = set()  # Track unique subjects to avoid duplicates
+                    for mark in marks_data:
+                        mark_subject = mark.get('subject_name', '').lower()
+                        # Check if this matches our requested subject
+                        matches = requested_subject in mark_subject or any(kw in mark_subject for kw in subject_keywords[requested_subject])
                         
-                        for student in all_students:
-                            student_marks = Mark.query.filter_by(student_id=student.student_id).all()
-                            if student_marks:
-                                # Track if we've already shown this student
-                                student_shown = False
-                                for mark in student_marks:
-                                    subject = db.session.get(Subject, mark.subject_id)
-                                    if subject:
-                                        # Normalize both detected subject and actual subject name for comparison
-                                        detected_normalized = detected_subject.lower().replace('s ', ' ').replace('s', '').strip()
-                                        actual_normalized = subject.subject_name.lower().replace('s ', ' ').replace('s', '').strip()
-                                        # Check if they match
-                                        if detected_normalized == actual_normalized or detected_subject.lower() in subject.subject_name.lower():
-                                            if not student_shown:
-                                                obtained = float(mark.obtained_marks)
-                                                total = float(mark.total_marks)
-                                                percentage = (obtained / total * 100) if total > 0 else 0
-                                                status_emoji = "✅" if percentage >= 35 else "❌"
-                                                response_text += f"📌 **{student.user.name}** (Roll: {student.roll_no})\n"
-                                                response_text += f"   └─ {subject.subject_name}: {obtained:.0f}/{total:.0f} ({percentage:.1f}%) {status_emoji}\n\n"
-                                                student_shown = True
-                                                break
-                        
-                        return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {}})
+                        # Only add if it matches AND we haven't seen this exact subject name before
+                        if matches and mark_subject not in seen_subjects:
+                            matched_marks.append(mark)
+                            seen_subjects.add(mark_subject)
                     
-                    if filters['target_student_id']:
-                        # Get student object for name
-                        student_obj = db.session.get(Student, filters['target_student_id'])
-                        student_name = student_obj.user.name if student_obj else 'Student'
+                    if matched_marks:
+                        response_text = f"📊 **Subject: {requested_subject.title()}**\n"
+                        response_text += f"{'='*50}\n\n"
+                        for i, mark in enumerate(matched_marks, 1):
+                            subject_name = mark.get('subject_name', 'N/A')
+                            obtained = float(mark.get('obtained_marks', 0))
+                            total = float(mark.get('total_marks', 100))
+                            percentage = (obtained / total * 100) if total > 0 else 0
+                            status_emoji = "✅" if percentage >= 35 else "❌"
+                            status_text = "PASS" if percentage >= 35 else "FAIL"
+                            exam_date = mark.get('exam_date', 'N/A')
+                            
+                            response_text += f"📌 **Subject:**     {subject_name}\n"
+                            response_text += f"🎯 **Marks:**       {obtained:.0f}/{total:.0f} ({percentage:.1f}%)\n"
+                            response_text += f"📅 **Exam Date:**   {exam_date}\n"
+                            response_text += f"🔖 **Status:**      {status_emoji} {status_text}\n"
+                            if i < len(matched_marks):
+                                response_text += f"\n{'-'*50}\n\n"
                         
-                        # Fetch specific student's marks
-                        api_response = requests.get(f'http://127.0.0.1:5000/api/students/{filters["target_student_id"]}/marks', timeout=5)
-                        if api_response.status_code == 200:
-                            marks_data = api_response.json()
-                            if marks_data and len(marks_data) > 0:
-                                response_text = f"📊 **Academic Performance Report for {student_name}**\n"
-                                response_text += f"{'='*60}\n\n"
-                                for i, mark in enumerate(marks_data[:10], 1):
-                                    subject_name = mark.get('subject_name', f'Subject {i}')
-                                    obtained = float(mark.get('obtained_marks', 0))
-                                    total = float(mark.get('total_marks', 100))
-                                    percentage = (obtained / total * 100) if total > 0 else 0
-                                    status_emoji = "✅" if percentage >= 35 else "❌"
-                                    status_text = "PASS" if percentage >= 35 else "FAIL"
-                                    response_text += f"📌 **{subject_name}**\n"
-                                    response_text += f"   └─ Marks: {obtained:.0f}/{total:.0f}  |  Percentage: {percentage:.1f}%  |  Status: {status_emoji} {status_text}\n\n"
-                                response_text += f"{'='*60}"
-                                return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {'marks': marks_data}})
-                            else:
-                                return jsonify({'intent': 'marks_query', 'response': f'No marks found for {student_name}.', 'data': {}})
-                        else:
-                            return jsonify({'intent': 'marks_query', 'response': 'Unable to fetch marks details.', 'data': {}})
+                        response_text += f"{'='*50}"
+                        return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {'marks': matched_marks}})
                     else:
-                        # Admin wants all students' marks - query directly from database
-                        # Apply class filter if specified
-                        query = Student.query
-                        
-                        if filters['class_filter']:
-                            # Filter by class name (search in class.class_name)
-                            query = query.join(Class).filter(Class.class_name.ilike(f'%{filters["class_filter"]}%'))
-                        
-                        all_students = query.all()
-                        
-                        class_text = f" ({filters['class_filter']})" if filters['class_filter'] else ""
-                        response_text = f"📊 **Students Academic Performance{class_text}**\n"
-                        response_text += f"{'='*60}\n\n"
-                        response_text += f"Total Students: {len(all_students)}\n\n"
+                        return jsonify({'intent': 'marks_query', 'response': f'No marks found for {requested_subject}.', 'data': {}})
+                else:
+                    # Show all subjects with better formatting
+                    response_text = f"📊 **Academic Performance Report**\n"
+                    response_text += f"{'='*60}\n\n"
+                    total_marks = 0
+                    total_obtained = 0
+                    
+                    # Deduplicate subjects
+                    seen_subjects = set()
+                    unique_marks = []
+                    
+                    for mark in marks_data:
+                        subject_name = mark.get('subject_name', 'Unknown').lower()
+                        if subject_name not in seen_subjects:
+                            seen_subjects.add(subject_name)
+                            unique_marks.append(mark)
+                    
+                    # Display unique subjects
+                    for i, mark in enumerate(unique_marks[:10], 1):  # Show max 10 subjects
+                        subject_name = mark.get('subject_name', f'Subject {i}')
+                        obtained = float(mark.get('obtained_marks', 0))
+                        total = float(mark.get('total_marks', 100))
+                        percentage = (obtained / total * 100) if total > 0 else 0
+                        status_emoji = "✅" if percentage >= 35 else "❌"
+                        status_text = "PASS" if percentage >= 35 else "FAIL"
                         
-                        for student in all_students[:20]:  # Show max 20 students
-                            student_marks = Mark.query.filter_by(student_id=student.student_id).all()
-                            if student_marks:
-                                marks_list = [m.to_dict() for m in student_marks]
-                                total_marks = sum(float(m.get('total_marks', 0)) for m in marks_list)
-                                total_obtained = sum(float(m.get('obtained_marks', 0)) for m in marks_list)
-                                if total_marks > 0:
-                                    percentage = (total_obtained / total_marks * 100)
-                                    response_text += f"📌 **{student.user.name}** (Roll: {student.roll_no})\n"
-                                    response_text += f"   └─ Total: {total_obtained:.0f}/{total_marks:.0f} ({percentage:.1f}%)\n\n"
+                        # Format as table-like structure
+                        response_text += f"📌 **{subject_name}**\n"
+                        response_text += f"   └─ Marks: {obtained:.0f}/{total:.0f}  |  Percentage: {percentage:.1f}%  |  Status: {status_emoji} {status_text}\n\n"
                         
-                        return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {}})
-                except Exception as e:
-                    print(f"Error in admin marks query: {e}")
-                    return jsonify({'intent': 'marks_query', 'response': 'Unable to fetch marks details.', 'data': {}})
-            
-            # Student handling - use the same API endpoint that Student Services uses
-            try:
-                import requests
-                api_response = requests.get(f'http://127.0.0.1:5000/api/students/{student_id}/marks', timeout=5)
-                if api_response.status_code == 200:
-                    marks_data = api_response.json()
-                    if marks_data and len(marks_data) > 0:
-                        # If specific subject requested, filter results
-                        if requested_subject:
-                            matched_marks = []
-                            seen_subjects = set()  # Track unique subjects to avoid duplicates
-                            for mark in marks_data:
-                                mark_subject = mark.get('subject_name', '').lower()
-                                # Check if this matches our requested subject
-                                matches = requested_subject in mark_subject or any(kw in mark_subject for kw in subject_keywords[requested_subject])
-                                
-                                # Only add if it matches AND we haven't seen this exact subject name before
-                                if matches and mark_subject not in seen_subjects:
-                                    matched_marks.append(mark)
-                                    seen_subjects.add(mark_subject)
-                            
-                            if matched_marks:
-                                response_text = f"📊 **Subject: {requested_subject.title()}**\n"
-                                response_text += f"{'='*50}\n\n"
-                                for i, mark in enumerate(matched_marks, 1):
-                                    subject_name = mark.get('subject_name', 'N/A')
-                                    obtained = float(mark.get('obtained_marks', 0))
-                                    total = float(mark.get('total_marks', 100))
-                                    percentage = (obtained / total * 100) if total > 0 else 0
-                                    status_emoji = "✅" if percentage >= 35 else "❌"
-                                    status_text = "PASS" if percentage >= 35 else "FAIL"
-                                    exam_date = mark.get('exam_date', 'N/A')
-                                    
-                                    response_text += f"📌 **Subject:**     {subject_name}\n"
-                                    response_text += f"🎯 **Marks:**       {obtained:.0f}/{total:.0f} ({percentage:.1f}%)\n"
-                                    response_text += f"📅 **Exam Date:**   {exam_date}\n"
-                                    response_text += f"🔖 **Status:**      {status_emoji} {status_text}\n"
-                                    if i < len(matched_marks):
-                                        response_text += f"\n{'-'*50}\n\n"
-                                
-                                response_text += f"{'='*50}"
-                                return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {'marks': matched_marks}})
-                            else:
-                                return jsonify({'intent': 'marks_query', 'response': f'No marks found for {requested_subject}.', 'data': {}})
-                        else:
-                            # Show all subjects with better formatting
-                            response_text = f"📊 **Academic Performance Report**\n"
-                            response_text += f"{'='*60}\n\n"
-                            total_marks = 0
-                            total_obtained = 0
-                            
-                            # Deduplicate subjects
-                            seen_subjects = set()
-                            unique_marks = []
-                            
-                            for mark in marks_data:
-                                subject_name = mark.get('subject_name', 'Unknown').lower()
-                                if subject_name not in seen_subjects:
-                                    seen_subjects.add(subject_name)
-                                    unique_marks.append(mark)
-                            
-                            # Display unique subjects
-                            for i, mark in enumerate(unique_marks[:10], 1):  # Show max 10 subjects
-                                subject_name = mark.get('subject_name', f'Subject {i}')
-                                obtained = float(mark.get('obtained_marks', 0))
-                                total = float(mark.get('total_marks', 100))
-                                percentage = (obtained / total * 100) if total > 0 else 0
-                                status_emoji = "✅" if percentage >= 35 else "❌"
-                                status_text = "PASS" if percentage >= 35 else "FAIL"
-                                
-                                # Format as table-like structure
-                                response_text += f"📌 **{subject_name}**\n"
-                                response_text += f"   └─ Marks: {obtained:.0f}/{total:.0f}  |  Percentage: {percentage:.1f}%  |  Status: {status_emoji} {status_text}\n\n"
-                                
-                                total_obtained += obtained
-                                total_marks += total
-                            
-                            if total_marks > 0:
-                                overall_percentage = (total_obtained / total_marks * 100)
-                                response_text += f"{'='*60}\n"
-                                response_text += f"📈 **Overall Performance:** {total_obtained:.1f}/{total_marks:.1f} ({overall_percentage:.1f}%)\n"
-                                response_text += f"{'='*60}"
-                            
-                            return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {'marks': marks_data}})
-                    else:
-                        return jsonify({'intent': 'marks_query', 'response': 'No marks details found for your account.', 'data': {}})
-                else:
-                    return jsonify({'intent': 'marks_query', 'response': 'Unable to fetch marks details at the moment.', 'data': {}})
-            except Exception as e:
-                return jsonify({'intent': 'marks_query', 'response': 'Unable to fetch marks details at the moment.', 'data': {}})
-        elif any(word in msg for word in ['help', 'what can you do', 'features', 'how to use', 'assistance']):
-            return jsonify({'intent': 'help_query', 'response': 'I can help with fees, attendance, and events. For other features, please explore the dashboard.', 'data': {}})
-        else:
-            intent = 'unknown'
+                        total_obtained += obtained
+                        total_marks += total
+                    
+                    if total_marks > 0:
+                        overall_percentage = (total_obtained / total_marks * 100)
+                        response_text += f"{'='*60}\n"
+                        response_text += f"📈 **Overall Performance:** {total_obtained:.1f}/{total_marks:.1f} ({overall_percentage:.1f}%)\n"
+                        response_text += f"{'='*60}"
+                    
+                    return jsonify({'intent': 'marks_query', 'response': response_text, 'data': {'marks': marks_data}})
+            else:
+                return jsonify({'intent': 'marks_query', 'response': 'No marks details found for your account.', 'data': {}})
+        except Exception as e:
+            return jsonify({'intent': 'marks_query', 'response': 'Unable to fetch marks details at the moment.', 'data': {}})
 
     data = {}
     if intent == 'greet':
@@ -1146,20 +714,12 @@ def chatbot_route():
         is_admin_fee = user_role == 'admin' or user_role == 'HOD'
         
         if not is_admin_fee:
-            # For students, get their student_id
-            if not student_id:
-                # fallback: derive student_id from user_id if provided
-                if user_id:
-                    student = Student.query.filter_by(user_id=int(user_id)).first()
-                    if student:
-                        student_id = student.student_id
             if not student_id:
                 return jsonify({'intent': 'fee_query', 'response': 'Please log in as a student to view fee details.', 'data': {}}), 200
         
         # Admin handling for fees
         if is_admin_fee:
             try:
-                import requests
                 # Use helper function to detect filters
                 filters = detect_admin_filters(msg)
                 
@@ -1169,26 +729,24 @@ def chatbot_route():
                     student_name = student_obj.user.name if student_obj else 'Student'
                     
                     # Fetch specific student's fees
-                    api_response = requests.get(f'http://127.0.0.1:5000/api/students/{filters["target_student_id"]}/fees', timeout=5)
-                    if api_response.status_code == 200:
-                        fee_data = api_response.json()
-                        if fee_data and 'total_amount' in fee_data:
-                            total = fee_data.get('total_amount', 0)
-                            paid = fee_data.get('paid_amount', 0)
-                            due = fee_data.get('due_amount', 0)
-                            
-                            response_text = f"💳 **Fee Payment Details for {student_name}**\n"
-                            response_text += f"{'='*50}\n"
-                            response_text += f"\n📌 **Total Fee:**      ₹{total:,.2f}\n"
-                            response_text += f"✅ **Paid Amount:**   ₹{paid:,.2f}\n"
-                            response_text += f"⏳ **Due Amount:**    ₹{due:,.2f}\n"
-                            response_text += f"\n📋 **Status:**         {fee_data.get('payment_status', 'N/A')}"
-                            if fee_data.get('last_payment_date'):
-                                response_text += f"\n📅 **Last Payment:**   {fee_data.get('last_payment_date')}"
-                            response_text += f"\n{'='*50}"
-                            return jsonify({'intent': 'fee_query', 'response': response_text, 'data': fee_data})
-                        else:
-                            return jsonify({'intent': 'fee_query', 'response': f'No fee details found for {student_name}.', 'data': {}})
+                    fee_data = fetch_student_fees(filters['target_student_id'])
+                    if fee_data and 'total_amount' in fee_data:
+                        total = fee_data.get('total_amount', 0)
+                        paid = fee_data.get('paid_amount', 0)
+                        due = fee_data.get('due_amount', 0)
+                        
+                        response_text = f"💳 **Fee Payment Details for {student_name}**\n"
+                        response_text += f"{'='*50}\n"
+                        response_text += f"\n📌 **Total Fee:**      ₹{total:,.2f}\n"
+                        response_text += f"✅ **Paid Amount:**   ₹{paid:,.2f}\n"
+                        response_text += f"⏳ **Due Amount:**    ₹{due:,.2f}\n"
+                        response_text += f"\n📋 **Status:**         {fee_data.get('payment_status', 'N/A')}"
+                        if fee_data.get('last_payment_date'):
+                            response_text += f"\n📅 **Last Payment:**   {fee_data.get('last_payment_date')}"
+                        response_text += f"\n{'='*50}"
+                        return jsonify({'intent': 'fee_query', 'response': response_text, 'data': fee_data})
+                    else:
+                        return jsonify({'intent': 'fee_query', 'response': f'No fee details found for {student_name}.', 'data': {}})
                 else:
                     # Admin wants all students' fees - query directly from database
                     # Apply class filter if specified
@@ -1219,31 +777,25 @@ def chatbot_route():
         
         # Student handling
         try:
-            import requests
-            api_response = requests.get(f'http://127.0.0.1:5000/api/students/{student_id}/fees', timeout=5)
-            if api_response.status_code == 200:
-                fee_data = api_response.json()
-                if fee_data and 'total_amount' in fee_data:
-                    # Format currency with thousands separator
-                    total = fee_data.get('total_amount', 0)
-                    paid = fee_data.get('paid_amount', 0)
-                    due = fee_data.get('due_amount', 0)
-                    
-                    response_text = f"💳 **Fee Payment Details**\n"
-                    response_text += f"{'='*50}\n"
-                    response_text += f"\n📌 **Total Fee:**      ₹{total:,.2f}\n"
-                    response_text += f"✅ **Paid Amount:**   ₹{paid:,.2f}\n"
-                    response_text += f"⏳ **Due Amount:**    ₹{due:,.2f}\n"
-                    response_text += f"\n📋 **Status:**         {fee_data.get('payment_status', 'N/A')}"
-                    if fee_data.get('last_payment_date'):
-                        response_text += f"\n📅 **Last Payment:**   {fee_data.get('last_payment_date')}"
-                    response_text += f"\n{'='*50}"
-                    data = fee_data
-                else:
-                    response_text = "No fee details found for your account."
-                    data = {}
+            fee_data = fetch_student_fees(int(student_id))
+            if fee_data and 'total_amount' in fee_data:
+                # Format currency with thousands separator
+                total = fee_data.get('total_amount', 0)
+                paid = fee_data.get('paid_amount', 0)
+                due = fee_data.get('due_amount', 0)
+                
+                response_text = f"💳 **Fee Payment Details**\n"
+                response_text += f"{'='*50}\n"
+                response_text += f"\n📌 **Total Fee:**      ₹{total:,.2f}\n"
+                response_text += f"✅ **Paid Amount:**   ₹{paid:,.2f}\n"
+                response_text += f"⏳ **Due Amount:**    ₹{due:,.2f}\n"
+                response_text += f"\n📋 **Status:**         {fee_data.get('payment_status', 'N/A')}"
+                if fee_data.get('last_payment_date'):
+                    response_text += f"\n📅 **Last Payment:**   {fee_data.get('last_payment_date')}"
+                response_text += f"\n{'='*50}"
+                data = fee_data
             else:
-                response_text = "Unable to fetch fee details at the moment."
+                response_text = "No fee details found for your account."
                 data = {}
         except Exception as e:
             response_text = "Unable to fetch fee details at the moment."
@@ -1253,12 +805,6 @@ def chatbot_route():
         is_admin_attendance = user_role == 'admin' or user_role == 'HOD'
         
         if not is_admin_attendance:
-            if not student_id:
-                user_id = payload.get('user_id')
-                if user_id:
-                    student = Student.query.filter_by(user_id=int(user_id)).first()
-                    if student:
-                        student_id = student.student_id
             if not student_id:
                 return jsonify({'intent': 'attendance_query', 'response': 'Please log in as a student to view attendance details.', 'data': {}}), 200
         
@@ -1281,7 +827,6 @@ def chatbot_route():
         # Admin handling for attendance
         if is_admin_attendance:
             try:
-                import requests
                 # Use helper function to detect filters
                 filters = detect_admin_filters(msg)
                 
@@ -1291,29 +836,27 @@ def chatbot_route():
                     student_name = student_obj.user.name if student_obj else 'Student'
                     
                     # Fetch specific student's attendance
-                    api_response = requests.get(f'http://127.0.0.1:5000/api/students/{filters["target_student_id"]}/attendance-summary', timeout=5)
-                    if api_response.status_code == 200:
-                        attendance_data = api_response.json()
-                        if attendance_data and len(attendance_data) > 0:
-                            total_present = sum(record.get('present_count', 0) for record in attendance_data)
-                            total_classes = sum(record.get('total_classes', 0) for record in attendance_data)
-                            attendance_percentage = (total_present / total_classes * 100) if total_classes > 0 else 0
-                            
-                            response_text = f"📈 **Attendance for {student_name}**\n"
-                            response_text += f"{'='*50}\n\n"
-                            response_text += f"📊 **Overall:** {attendance_percentage:.1f}% ({total_present}/{total_classes})\n\n"
-                            
-                            for record in attendance_data[:5]:
-                                subject_name = record.get('subject_name', 'N/A')
-                                attended = record.get('present_count', 0)
-                                total = record.get('total_classes', 0)
-                                percentage = (attended / total * 100) if total > 0 else 0
-                                response_text += f"📌 **{subject_name}:** {attended}/{total} ({percentage:.1f}%)\n"
-                            
-                            response_text += f"\n{'='*50}"
-                            return jsonify({'intent': 'attendance_query', 'response': response_text, 'data': {'attendance': attendance_data}})
-                        else:
-                            return jsonify({'intent': 'attendance_query', 'response': f'No attendance found for {student_name}.', 'data': {}})
+                    attendance_data = fetch_attendance_summary(filters['target_student_id'])
+                    if attendance_data and len(attendance_data) > 0:
+                        total_present = sum(record.get('present_count', 0) for record in attendance_data)
+                        total_classes = sum(record.get('total_classes', 0) for record in attendance_data)
+                        attendance_percentage = (total_present / total_classes * 100) if total_classes > 0 else 0
+                        
+                        response_text = f"📈 **Attendance for {student_name}**\n"
+                        response_text += f"{'='*50}\n\n"
+                        response_text += f"📊 **Overall:** {attendance_percentage:.1f}% ({total_present}/{total_classes})\n\n"
+                        
+                        for record in attendance_data[:5]:
+                            subject_name = record.get('subject_name', 'N/A')
+                            attended = record.get('present_count', 0)
+                            total = record.get('total_classes', 0)
+                            percentage = (attended / total * 100) if total > 0 else 0
+                            response_text += f"📌 **{subject_name}:** {attended}/{total} ({percentage:.1f}%)\n"
+                        
+                        response_text += f"\n{'='*50}"
+                        return jsonify({'intent': 'attendance_query', 'response': response_text, 'data': {'attendance': attendance_data}})
+                    else:
+                        return jsonify({'intent': 'attendance_query', 'response': f'No attendance found for {student_name}.', 'data': {}})
                 else:
                     # Admin wants all students' attendance summary - query directly from database
                     # Apply class filter if specified
@@ -1346,102 +889,96 @@ def chatbot_route():
         
         # Use the same API endpoint that Student Services uses
         try:
-            import requests
-            api_response = requests.get(f'http://127.0.0.1:5000/api/students/{student_id}/attendance-summary', timeout=5)
-            if api_response.status_code == 200:
-                attendance_data = api_response.json()
-                if attendance_data and len(attendance_data) > 0:
-                    # If specific subject requested, filter results
-                    if requested_subject:
-                        matched_attendance = []
-                        seen_subjects = set()  # Track unique subjects to avoid duplicates
-                        for record in attendance_data:
-                            subject_name = record.get('subject_name', '').lower()
-                            # Check if this matches our requested subject
-                            matches = requested_subject in subject_name or any(kw in subject_name for kw in subject_keywords[requested_subject])
-                            
-                            # Only add if it matches AND we haven't seen this exact subject name before
-                            if matches and subject_name not in seen_subjects:
-                                matched_attendance.append(record)
-                                seen_subjects.add(subject_name)
+            attendance_data = fetch_attendance_summary(int(student_id))
+            if attendance_data and len(attendance_data) > 0:
+                # If specific subject requested, filter results
+                if requested_subject:
+                    matched_attendance = []
+                    seen_subjects = set()  # Track unique subjects to avoid duplicates
+                    for record in attendance_data:
+                        subject_name = record.get('subject_name', '').lower()
+                        # Check if this matches our requested subject
+                        matches = requested_subject in subject_name or any(kw in subject_name for kw in subject_keywords[requested_subject])
                         
-                        if matched_attendance:
-                            response_text = f"📈 **Attendance: {requested_subject.title()}**\n"
-                            response_text += f"{'='*50}\n\n"
-                            for record in matched_attendance:
-                                subject_name = record.get('subject_name', 'N/A')
-                                attended = record.get('present_count', 0)
-                                absent = record.get('absent_count', 0)
-                                total = record.get('total_classes', 0)
-                                percentage = (attended / total * 100) if total > 0 else 0
-                                status_emoji = "✅" if percentage >= 75 else "⚠️" if percentage >= 60 else "❌"
-                                status_text = "Good" if percentage >= 75 else "Moderate" if percentage >= 60 else "Low"
-                                
-                                response_text += f"📌 **Subject:**     {subject_name}\n"
-                                response_text += f"📊 **Classes:**     {total} (Present: {attended} | Absent: {absent})\n"
-                                response_text += f"📈 **Percentage:**  {percentage:.1f}%\n"
-                                response_text += f"🔖 **Status:**      {status_emoji} {status_text} Attendance\n"
-                            
-                            response_text += f"\n{'='*50}"
-                            data = {'attendance': matched_attendance}
-                        else:
-                            response_text = f"No attendance found for {requested_subject}."
-                            data = {}
-                    else:
-                        # Calculate overall attendance from summary data
-                        total_present = sum(record.get('present_count', 0) for record in attendance_data)
-                        total_classes = sum(record.get('total_classes', 0) for record in attendance_data)
-                        attendance_percentage = (total_present / total_classes * 100) if total_classes > 0 else 0
-                        
-                        # Format as clean report
-                        response_text = f"📈 **Attendance Summary Report**\n"
-                        response_text += f"{'='*60}\n\n"
-                        response_text += f"📊 **Overall Statistics:**\n"
-                        response_text += f"   └─ Total Classes:   {total_classes}\n"
-                        response_text += f"   └─ Present:         {total_present}\n"
-                        response_text += f"   └─ Absent:          {total_classes - total_present}\n"
-                        response_text += f"   └─ Overall:          {attendance_percentage:.1f}%\n\n"
-                        
-                        # Add subject-wise breakdown (deduplicate subjects)
-                        response_text += f"📚 **Subject-wise Attendance:**\n\n"
-                        seen_subjects = set()
-                        unique_attendance = []
-                        
-                        # Deduplicate subjects - keep only first occurrence
-                        for record in attendance_data:
-                            subject_name = record.get('subject_name', 'Unknown').lower()
-                            if subject_name not in seen_subjects:
-                                seen_subjects.add(subject_name)
-                                unique_attendance.append(record)
-                        
-                        # Display unique subjects
-                        for i, record in enumerate(unique_attendance[:8], 1):  # Show max 8 subjects
-                            subject_name = record.get('subject_name', f'Subject {i}')
+                        # Only add if it matches AND we haven't seen this exact subject name before
+                        if matches and subject_name not in seen_subjects:
+                            matched_attendance.append(record)
+                            seen_subjects.add(subject_name)
+                    
+                    if matched_attendance:
+                        response_text = f"📈 **Attendance: {requested_subject.title()}**\n"
+                        response_text += f"{'='*50}\n\n"
+                        for record in matched_attendance:
+                            subject_name = record.get('subject_name', 'N/A')
                             attended = record.get('present_count', 0)
+                            absent = record.get('absent_count', 0)
                             total = record.get('total_classes', 0)
                             percentage = (attended / total * 100) if total > 0 else 0
                             status_emoji = "✅" if percentage >= 75 else "⚠️" if percentage >= 60 else "❌"
                             status_text = "Good" if percentage >= 75 else "Moderate" if percentage >= 60 else "Low"
                             
-                            response_text += f"📌 **{subject_name}**\n"
-                            response_text += f"   └─ {attended}/{total} ({percentage:.1f}%)  |  Status: {status_emoji} {status_text}\n\n"
-                        
-                        if len(unique_attendance) > 8:
-                            response_text += f"... and {len(unique_attendance) - 8} more subjects\n\n"
+                            response_text += f"📌 **Subject:**     {subject_name}\n"
+                            response_text += f"📊 **Classes:**     {total} (Present: {attended} | Absent: {absent})\n"
+                            response_text += f"📈 **Percentage:**  {percentage:.1f}%\n"
+                            response_text += f"🔖 **Status:**      {status_emoji} {status_text} Attendance\n"
                         
-                        # Overall status
-                        status_emoji = "✅" if attendance_percentage >= 75 else "⚠️" if attendance_percentage >= 60 else "❌"
-                        status_text = "Good" if attendance_percentage >= 75 else "Moderate" if attendance_percentage >= 60 else "Low - Please improve"
-                        response_text += f"{'='*60}\n"
-                        response_text += f"🔖 **Overall Status:** {status_emoji} {status_text} Attendance\n"
-                        response_text += f"{'='*60}"
-                        
-                        data = {'attendance_summary': attendance_data, 'overall_percentage': attendance_percentage}
+                        response_text += f"\n{'='*50}"
+                        data = {'attendance': matched_attendance}
+                    else:
+                        response_text = f"No attendance found for {requested_subject}."
+                        data = {}
                 else:
-                    response_text = "No attendance details found for your account."
-                    data = {}
+                    # Calculate overall attendance from summary data
+                    total_present = sum(record.get('present_count', 0) for record in attendance_data)
+                    total_classes = sum(record.get('total_classes', 0) for record in attendance_data)
+                    attendance_percentage = (total_present / total_classes * 100) if total_classes > 0 else 0
+                    
+                    # Format as clean report
+                    response_text = f"📈 **Attendance Summary Report**\n"
+                    response_text += f"{'='*60}\n\n"
+                    response_text += f"📊 **Overall Statistics:**\n"
+                    response_text += f"   └─ Total Classes:   {total_classes}\n"
+                    response_text += f"   └─ Present:         {total_present}\n"
+                    response_text += f"   └─ Absent:          {total_classes - total_present}\n"
+                    response_text += f"   └─ Overall:          {attendance_percentage:.1f}%\n\n"
+                    
+                    # Add subject-wise breakdown (deduplicate subjects)
+                    response_text += f"📚 **Subject-wise Attendance:**\n\n"
+                    seen_subjects = set()
+                    unique_attendance = []
+                    
+                    # Deduplicate subjects - keep only first occurrence
+                    for record in attendance_data:
+                        subject_name = record.get('subject_name', 'Unknown').lower()
+                        if subject_name not in seen_subjects:
+                            seen_subjects.add(subject_name)
+                            unique_attendance.append(record)
+                    
+                    # Display unique subjects
+                    for i, record in enumerate(unique_attendance[:8], 1):  # Show max 8 subjects
+                        subject_name = record.get('subject_name', f'Subject {i}')
+                        attended = record.get('present_count', 0)
+                        total = record.get('total_classes', 0)
+                        percentage = (attended / total * 100) if total > 0 else 0
+                        status_emoji = "✅" if percentage >= 75 else "⚠️" if percentage >= 60 else "❌"
+                        status_text = "Good" if percentage >= 75 else "Moderate" if percentage >= 60 else "Low"
+                        
+                        response_text += f"📌 **{subject_name}**\n"
+                        response_text += f"   └─ {attended}/{total} ({percentage:.1f}%)  |  Status: {status_emoji} {status_text}\n\n"
+                    
+                    if len(unique_attendance) > 8:
+                        response_text += f"... and {len(unique_attendance) - 8} more subjects\n\n"
+                    
+                    # Overall status
+                    status_emoji = "✅" if attendance_percentage >= 75 else "⚠️" if attendance_percentage >= 60 else "❌"
+                    status_text = "Good" if attendance_percentage >= 75 else "Moderate" if attendance_percentage >= 60 else "Low - Please improve"
+                    response_text += f"{'='*60}\n"
+                    response_text += f"🔖 **Overall Status:** {status_emoji} {status_text} Attendance\n"
+                    response_text += f"{'='*60}"
+                    
+                    data = {'attendance_summary': attendance_data, 'overall_percentage': attendance_percentage}
             else:
-                response_text = "Unable to fetch attendance details at the moment."
+                response_text = "No attendance details found for your account."
                 data = {}
         except Exception as e:
             response_text = "Unable to fetch attendance details at the moment."
@@ -1500,41 +1037,34 @@ def chatbot_route():
     elif intent == 'announcement_query':
         # Get announcements from notifications table
         try:
-            user_id = payload.get('user_id')
-            if not user_id:
+            if not principal:
                 return jsonify({'intent': 'announcement_query', 'response': 'Please log in to view announcements.', 'data': {}})
             
-            import requests
-            api_response = requests.get(f'http://127.0.0.1:5000/api/users/{user_id}/notifications', timeout=5)
-            if api_response.status_code == 200:
-                notifications = api_response.json()
-                if notifications and len(notifications) > 0:
-                    response_text = f"📢 **Announcements ({len(notifications)} total)**\n"
-                    response_text += f"{'='*60}\n\n"
-                    for i, notif in enumerate(notifications[:10], 1):  # Show max 10 announcements
-                        notif_type = notif.get('type', 'info')
-                        type_emoji = {'success': '✅', 'warning': '⚠️', 'error': '❌', 'info': 'ℹ️'}.get(notif_type, 'ℹ️')
-                        is_read = '✓ Read' if notif.get('is_read', False) else '🆕 NEW'
-                        
-                        title = notif.get('title', 'Untitled')
-                        msg = notif.get('message', '')
-                        if len(msg) > 150:
-                            msg = msg[:150] + '...'
-                        date = notif.get('created_at', 'N/A')
-                        
-                        response_text += f"{type_emoji} **{title}** [{is_read}]\n"
-                        response_text += f"   └─ 📝 Message:  {msg}\n"
-                        response_text += f"   └─ 🕐 Date:     {date}\n"
-                        if i < len(notifications[:10]):
-                            response_text += "\n"
+            notifications = fetch_user_notifications(principal.user_id)
+            if notifications and len(notifications) > 0:
+                response_text = f"📢 **Announcements ({len(notifications)} total)**\n"
+                response_text += f"{'='*60}\n\n"
+                for i, notif in enumerate(notifications[:10], 1):  # Show max 10 announcements
+                    notif_type = notif.get('type', 'info')
+                    type_emoji = {'success': '✅', 'warning': '⚠️', 'error': '❌', 'info': 'ℹ️'}.get(notif_type, 'ℹ️')
+                    is_read = '✓ Read' if notif.get('is_read', False) else '🆕 NEW'
                     
-                    response_text += f"\n{'='*60}"
-                    data = {'notifications': notifications}
-                else:
-                    response_text = "No announcements found."
-                    data = {}
+                    title = notif.get('title', 'Untitled')
+                    msg = notif.get('message', '')
+                    if len(msg) > 150:
+                        msg = msg[:150] + '...'
+                    date = notif.get('created_at', 'N/A')
+                    
+                    response_text += f"{type_emoji} **{title}** [{is_read}]\n"
+                    response_text += f"   └─ 📝 Message:  {msg}\n"
+                    response_text += f"   └─ 🕐 Date:     {date}\n"
+                    if i < len(notifications[:10]):
+                        response_text += "\n"
+                
+                response_text += f"\n{'='*60}"
+                data = {'notifications': notifications}
             else:
-                response_text = "Unable to fetch announcements at the moment."
+                response_text = "No announcements found."
                 data = {}
         except Exception as e:
             response_text = "Unable to fetch announcements at the moment."
@@ -1767,10 +1297,38 @@ def format_students_table(students):
 def home():
     return jsonify({'message': 'SmartEdu Chatbot API is running!'})
 
+@app.route('/api/health/db-pool', methods=['GET'])
+def get_db_pool_stats():
+    """Live connection pool usage, for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW"""
+    pool = db.engine.pool
+    stats = {'pool_class': type(pool).__name__, 'status': pool.status()}
+    # Only QueuePool (MySQL) tracks these; SQLite pools don't
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            stats[name] = counter()
+    if 'size' in stats:
+        stats['max_overflow'] = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).get('max_overflow')
+    return jsonify(stats)
+
+@app.route('/api/health/chat-writer', methods=['GET'])
+def get_chat_writer_stats():
+    """Write-behind chat queue depth and throughput, for sizing CHAT_WRITE_*"""
+    return jsonify(chat_log.metrics())
+
+@app.route('/api/health/rasa', methods=['GET'])
+def get_rasa_stats():
+    """Rasa NLU circuit breaker state and parse latency"""
+    return jsonify(rasa_service.stats())
+
 @app.route('/api/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    limit, after = page_args()
+    try:
+        users, next_cursor = keyset_page(User.query, ((User.user_id, False),), limit, after)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return _paged_response([user.to_dict() for user in users], next_cursor)
 
 @app.route('/api/users', methods=['POST'])
 def create_user():
@@ -1786,6 +1344,7 @@ def create_user():
     return jsonify(user.to_dict()), 201
 
 @app.route('/chat', methods=['POST'])
+@login_required
 def chat():
     """
     Process user message with Dialogflow intent detection and sentiment analysis
@@ -1799,19 +1358,18 @@ def chat():
             return jsonify({'error': 'Message is required'}), 400
         
         user_message = data['message']
-        user_id = data.get('user_id', 1)  # Default user if not provided
         language_code = data.get('language_code', 'en')  # Default to English
         
-        # Get user details to determine role
-        # Use SQLAlchemy 2.0 style Session.get
-        user = db.session.get(User, user_id)
-        user_role = user.role if user else 'student'
+        # The turn is stored for the token's user; a body user_id must be the caller's own
+        principal = caller_principal(data.get('user_id'))
+        user_id = principal.user_id
+        user_role = principal.role
         
         # Analyze sentiment of user message
         sentiment_data = analyze_sentiment(user_message)
         
         # Get project_id and session_id from request or use defaults
-        project_id = data.get('project_id', dialogflow_service.project_id)
+        project_id = data.get('project_id')
         session_id = data.get('session_id', f'smartedu-session-{user_id}')
         
         # Use Rasa NLU for intent detection
@@ -1832,11 +1390,11 @@ def chat():
         # Enhance response with role-based data based on intent
         data_response = None
         if 'marks' in dialogflow_result['intent'].lower():
-            data_response = get_marks_data(user_id, user_role, user)
+            data_response = get_marks_data(user_id, user_role, principal)
         elif 'attendance' in dialogflow_result['intent'].lower():
-            data_response = get_attendance_data(user_id, user_role, user)
+            data_response = get_attendance_data(user_id, user_role, principal)
         elif 'fees' in dialogflow_result['intent'].lower():
-            data_response = get_fees_data(user_id, user_role, user)
+            data_response = get_fees_data(user_id, user_role, principal)
         elif 'student' in dialogflow_result['intent'].lower():
             data_response = get_students_data(user_role)
         
@@ -1844,21 +1402,22 @@ def chat():
         empathetic_prefix = get_empathetic_prefix(sentiment_data)
         final_response = empathetic_prefix + educational_response['response']
         
-        # Create chat message record
-        chat_message = ChatMessage(
+        # Persisted in batches by the write-behind queue; the id is assigned on flush,
+        # so message_id is null (see API_DOCUMENTATION.md)
+        chat_message = chat_log.submit(
             user_id=user_id,
             message=user_message,
             response=final_response,
             intent=dialogflow_result['intent'],
-            confidence=dialogflow_result['confidence']
+            confidence=dialogflow_result['confidence'],
+            sentiment_polarity=sentiment_data['polarity'],
+            sentiment_label=sentiment_data['sentiment'],
+            has_empathetic_prefix=bool(empathetic_prefix)
         )
         
-        db.session.add(chat_message)
-        db.session.commit()
-        
         # Prepare comprehensive response for frontend
         response_data = {
-            'message_id': chat_message.id,
+            'message_id': None,
             'response': final_response,
             'intent': dialogflow_result['intent'],
             'confidence': dialogflow_result['confidence'],
@@ -1867,7 +1426,7 @@ def chat():
             'action': dialogflow_result.get('action', ''),
             'all_required_params_present': dialogflow_result.get('all_required_params_present', False),
             'query_text': dialogflow_result.get('query_text', user_message),
-            'timestamp': chat_message.timestamp.isoformat(),
+            'timestamp': chat_message['timestamp'].isoformat(),
             'session_id': session_id,
             'project_id': project_id,
             'sentiment': {
@@ -1883,6 +1442,8 @@ def chat():
         
         return jsonify(response_data), 200
         
+    except IdentityMismatch:
+        return jsonify({'error': 'user_id does not match the authenticated user'}), 403
     except Exception as e:
         return jsonify({'error': f'Chat processing failed: {str(e)}'}), 500
 
@@ -1895,7 +1456,7 @@ def get_events():
         # Get query parameters
         active_only = request.args.get('active_only', 'true').lower() == 'true'
         event_type = request.args.get('type')
-        limit = request.args.get('limit', type=int)
+        limit, after = page_args()
         
         # Build query
         query = Event.query
@@ -1910,15 +1471,12 @@ def get_events():
             query = query.filter(Event.event_type == event_type)
         
         # Order by event date
-        query = query.order_by(Event.event_date.asc())
+        events, next_cursor = keyset_page(query, ((Event.event_date, False), (Event.event_id, False)), limit, after)
         
-        if limit:
-            query = query.limit(limit)
-        
-        events = query.all()
-        
-        return jsonify([event.to_dict() for event in events]), 200
+        return _paged_response([event.to_dict() for event in events], next_cursor)
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch events: {str(e)}'}), 500
 
@@ -1943,11 +1501,16 @@ def create_announcement():
             except ValueError:
                 return jsonify({'error': 'Invalid expires_at format. Use ISO format.'}), 400
         
-        # Create announcement
+        # class/dept/student announcements must name an existing class/dept/student
+        target, target_id = validate_audience(data.get('target'), data.get('target_id'))
+        
+        # Create announcement (stored once; target/target_id pick the audience)
         announcement = Announcement(
             title=data['title'],
             message=data['message'],
             priority=priority,
+            target=target,
+            target_id=target_id,
             expires_at=expires_at
         )
         
@@ -1956,6 +1519,8 @@ def create_announcement():
         
         return jsonify(announcement.to_dict()), 201
         
+    except InvalidAudience as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to create announcement: {str(e)}'}), 500
 
@@ -1971,12 +1536,15 @@ def get_announcements():
             if not data or not data.get('title') or not data.get('body'):
                 return jsonify({'error': 'Title and body are required'}), 400
             
+            target, target_id = validate_audience(data.get('target_audience'), data.get('target_id'))
+            
             # Create announcement
             announcement = Announcement(
                 title=data.get('title'),
                 message=data.get('body'),  # Use 'body' from frontend
                 priority=data.get('type', 'normal'),  # Use 'type' from frontend
-                target=data.get('target_audience', 'all'),
+                target=target,
+                target_id=target_id,
                 is_active=True,
                 created_at=datetime.utcnow()
             )
@@ -1986,6 +1554,8 @@ def get_announcements():
             
             return jsonify(announcement.to_dict()), 201
             
+        except InvalidAudience as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             db.session.rollback()
             return jsonify({'error': f'Failed to create announcement: {str(e)}'}), 500
@@ -1994,6 +1564,7 @@ def get_announcements():
         try:
             active_only = request.args.get('active_only', 'true').lower() == 'true'
             priority = request.args.get('priority')
+            limit, after = page_args()
             
             query = Announcement.query
             
@@ -2008,19 +1579,68 @@ def get_announcements():
             if priority:
                 query = query.filter(Announcement.priority == priority)
             
-            query = query.order_by(Announcement.created_at.desc())
-            
-            announcements = query.all()
+            announcements, next_cursor = keyset_page(
+                query, ((Announcement.created_at, True), (Announcement.announcement_id, True)), limit, after)
             
-            return jsonify([announcement.to_dict() for announcement in announcements]), 200
+            return _paged_response([announcement.to_dict() for announcement in announcements], next_cursor)
             
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
         except Exception as e:
             return jsonify({'error': f'Failed to fetch announcements: {str(e)}'}), 500
 
+@app.route('/api/announcements/feed', methods=['GET'])
+@login_required
+def get_announcement_feed():
+    """Announcements addressed to the current user (all / their class / dept / them), with read state"""
+    try:
+        unread_only = request.args.get('unread_only', 'false').lower() == 'true'
+        limit, after = page_args(default_limit=DEFAULT_PAGE_SIZE)
+        return _paged_response(*fetch_feed(current_principal(), limit, after, unread_only))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch announcements: {str(e)}'}), 500
+
+@app.route('/api/announcements/unread-count', methods=['GET'])
+@login_required
+def get_unread_announcements_count():
+    try:
+        return jsonify({'unread_count': unread_announcement_count(current_principal())}), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to get unread count: {str(e)}'}), 500
+
+@app.route('/api/announcements/<int:announcement_id>/read', methods=['PUT'])
+@login_required
+def mark_announcement_as_read(announcement_id):
+    try:
+        if not mark_announcement_read(current_principal(), announcement_id):
+            return jsonify({'error': 'Announcement not found'}), 404
+        return jsonify({'message': 'Announcement marked as read'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to mark announcement as read: {str(e)}'}), 500
+
+@app.route('/api/announcements/read-all', methods=['PUT'])
+@login_required
+def mark_all_announcements_as_read():
+    try:
+        watermark = mark_all_announcements_read(current_principal())
+        return jsonify({'message': 'All announcements marked as read', 'last_seen_id': watermark}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to mark announcements as read: {str(e)}'}), 500
+
 @app.route('/api/chat/<int:user_id>', methods=['GET'])
 def get_user_chats(user_id):
-    chats = ChatMessage.query.filter_by(user_id=user_id).order_by(ChatMessage.timestamp.desc()).all()
-    return jsonify([chat.to_dict() for chat in chats])
+    # Newest first; the whole history unless the client pages with ?limit=
+    limit, after = page_args()
+    try:
+        chats, next_cursor = keyset_page(ChatMessage.query.filter_by(user_id=user_id),
+                                         ((ChatMessage.timestamp, True), (ChatMessage.id, True)), limit, after)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return _paged_response([chat.to_dict() for chat in chats], next_cursor)
 
 # ==================== NEW API ENDPOINTS ====================
 
@@ -2073,7 +1693,7 @@ def get_students():
     try:
         class_id = request.args.get('class_id', type=int)
         roll_no = request.args.get('roll_no')
-        limit = request.args.get('limit', type=int)
+        limit, after = page_args()
         query = Student.query.filter_by(is_active=True)
         
         if class_id:
@@ -2081,12 +1701,10 @@ def get_students():
         if roll_no:
             query = query.filter_by(roll_no=roll_no)
 
-        # Apply limit if provided to avoid returning very large result sets
-        if limit and limit > 0:
-            query = query.limit(limit)
-        
-        students = query.all()
-        return jsonify([student.to_dict() for student in students]), 200
+        students, next_cursor = keyset_page(query, ((Student.student_id, False),), limit, after)
+        return _paged_response([student.to_dict() for student in students], next_cursor)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch students: {str(e)}'}), 500
 
@@ -2123,6 +1741,8 @@ def create_student():
         
         db.session.add(student)
         db.session.commit()
+        # The user now has a student_id
+        invalidate_principal(student.user_id)
         
         return jsonify(student.to_dict()), 201
     except Exception as e:
@@ -2158,24 +1778,8 @@ def get_student_marks(student_id):
         student = Student.query.get_or_404(student_id)
         subject_id = request.args.get('subject_id', type=int)
         
-        query = Mark.query.filter_by(student_id=student_id)
-        
-        if subject_id:
-            query = query.filter_by(subject_id=subject_id)
-        
-        marks = query.all()
-        
-        # Enhance marks data with subject information
-        marks_data = []
-        for mark in marks:
-            mark_dict = mark.to_dict()
-            # Add subject information
-            subject = db.session.get(Subject, mark.subject_id)
-            if subject:
-                mark_dict['subject_name'] = subject.subject_name
-                mark_dict['subject_code'] = subject.subject_code
-                mark_dict['credits'] = subject.credits
-            marks_data.append(mark_dict)
+        # Marks come back with subject information already attached
+        marks_data = fetch_student_marks(student_id, subject_id)
         
         return jsonify(marks_data), 200
     except Exception as e:
@@ -2402,25 +2006,7 @@ def get_student_attendance_summary(student_id):
     try:
         student = Student.query.get_or_404(student_id)
         
-        summaries = Attendance.query.filter_by(student_id=student_id).all()
-        
-        # Get subject details for each summary
-        summary_list = []
-        for summary in summaries:
-            subject = db.session.get(Subject, summary.subject_id)
-            if subject:
-                summary_list.append({
-                    'attendance_id': summary.attendance_id,
-                    'subject_id': subject.subject_id,
-                    'subject_name': subject.subject_name,
-                    'subject_code': subject.subject_code,
-                    'present_count': summary.present_count,
-                    'absent_count': summary.absent_count,
-                    'late_count': summary.late_count,
-                    'total_classes': summary.total_classes,
-                    'attendance_percentage': float(summary.attendance_percentage),
-                    'academic_year': summary.academic_year
-                })
+        summary_list = fetch_attendance_summary(student_id)
         
         return jsonify(summary_list), 200
     except Exception as e:
@@ -2432,10 +2018,11 @@ def get_student_fees(student_id):
     try:
         student = Student.query.get_or_404(student_id)
         
-        if not student.fees:
+        fee_data = fetch_student_fees(student_id)
+        if not fee_data:
             return jsonify({'error': 'No fees record found for this student'}), 404
         
-        return jsonify(student.fees.to_dict()), 200
+        return jsonify(fee_data), 200
     except Exception as e:
         return jsonify({'error': f'Failed to fetch fees: {str(e)}'}), 500
 
@@ -2476,83 +2063,72 @@ def get_user_notifications(user_id):
     try:
         user = User.query.get_or_404(user_id)
         unread_only = request.args.get('unread_only', 'false').lower() == 'true'
+        # Everything unless the client pages with ?limit=
+        limit, after = page_args()
         
-        query = Notification.query.filter_by(user_id=user_id)
-        
-        if unread_only:
-            query = query.filter_by(is_read=False)
-        
-        notifications = query.order_by(Notification.created_at.desc()).all()
-        return jsonify([notif.to_dict() for notif in notifications]), 200
+        return _paged_response(*fetch_user_notifications_page(user_id, unread_only, limit, after))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch notifications: {str(e)}'}), 500
 
 @app.route('/api/notifications', methods=['GET'])
+@login_required
 def get_notifications():
     """Get notifications for current user (requires authentication)"""
     try:
-        # In production, verify JWT token here
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Authorization token required'}), 401
-        
-        token = auth_header.split(' ')[1]
-        # For now, extract user_id from token (in production, verify JWT)
-        if token.startswith('token-'):
-            user_id = int(token.split('-')[1])
-            user = db.session.get(User, user_id)
-            
-            if not user:
-                return jsonify({'error': 'User not found'}), 404
-            
-            unread_only = request.args.get('unread_only', 'false').lower() == 'true'
-            
-            query = Notification.query.filter_by(user_id=user_id)
-            
-            if unread_only:
-                query = query.filter_by(is_read=False)
-            
-            notifications = query.order_by(Notification.created_at.desc()).all()
-            return jsonify([notif.to_dict() for notif in notifications]), 200
-        else:
-            return jsonify({'error': 'Invalid token'}), 401
-            
+        unread_only = request.args.get('unread_only', 'false').lower() == 'true'
+        # Everything unless the client pages with ?limit= (NotificationCenter reads one list)
+        limit, after = page_args()
+        return _paged_response(*fetch_user_notifications_page(current_principal().user_id, unread_only,
+                                                              limit, after))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch notifications: {str(e)}'}), 500
 
 @app.route('/api/notifications/unread-count', methods=['GET'])
+@login_required
 def get_unread_notifications_count():
     """Get unread notifications count for current user"""
     try:
-        # In production, verify JWT token here
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Authorization token required'}), 401
-        
-        token = auth_header.split(' ')[1]
-        # For now, extract user_id from token (in production, verify JWT)
-        if token.startswith('token-'):
-            user_id = int(token.split('-')[1])
-            user = db.session.get(User, user_id)
-            
-            if not user:
-                return jsonify({'error': 'User not found'}), 404
-            
-            unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
-            return jsonify({'unread_count': unread_count}), 200
-        else:
-            return jsonify({'error': 'Invalid token'}), 401
-            
+        unread_count = get_unread_count(current_principal().user_id)
+        return jsonify({'unread_count': unread_count}), 200
     except Exception as e:
         return jsonify({'error': f'Failed to fetch unread count: {str(e)}'}), 500
 
+@app.route('/api/notifications/stream-ticket', methods=['POST'])
+@login_required
+def notifications_stream_ticket():
+    """Short-lived ticket for opening the notification stream (?ticket=)"""
+    return jsonify({'ticket': issue_stream_ticket(app, current_principal().user_id),
+                    'expires_in': app.config['STREAM_TICKET_MAX_AGE']}), 200
+
+@app.route('/api/notifications/stream', methods=['GET'])
+@accepts_stream_ticket
+@login_required
+def notifications_stream():
+    """Server-sent events: new notifications, announcements and unread-count deltas"""
+    user_id = current_principal().user_id
+    unread_count = get_unread_count(user_id)
+    events = notification_bus.subscribe(user_id)
+    # No DB work happens inside the stream, so the connection goes back to the pool now
+    db.session.remove()
+    response = app.response_class(event_stream(user_id, events, unread_count), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
 def mark_notification_read(notification_id):
     """Mark a notification as read"""
     try:
         notification = Notification.query.get_or_404(notification_id)
+        was_unread = not notification.is_read
         notification.is_read = True
         db.session.commit()
+        if was_unread:
+            notification_bus.publish(notification.user_id, 'unread_count', {'delta': -1})
         
         return jsonify(notification.to_dict()), 200
     except Exception as e:
@@ -2587,65 +2163,12 @@ def get_dashboard_stats():
 def get_class_marks():
     """Get marks data grouped by class for student services"""
     try:
-        # Get all students with their class information
-        students = Student.query.join(Class).join(User).all()
-        
-        # Group students by class
-        class_data = {}
-        for student in students:
-            class_name = student.class_.class_name
-            if class_name not in class_data:
-                class_data[class_name] = {
-                    'class_name': class_name,
-                    'students': []
-                }
-            
-            # Get marks for this student
-            marks = Mark.query.filter_by(student_id=student.student_id).all()
-            
-            # Get subjects for this class (to ensure unique subject names)
-            subjects = Subject.query.filter_by(class_id=student.class_id).limit(5).all()
-            
-            # Organize marks by subject
-            student_marks = {
-                'roll_number': student.roll_no,
-                'name': student.user.name,
-                'sub1': 0, 'sub2': 0, 'sub3': 0, 'sub4': 0, 'sub5': 0,
-                'total': 0,
-                'percentage': 0.0
-            }
-            
-            # Create a map of subject_id -> marks for quick lookup
-            marks_map = {mark.subject_id: mark.obtained_marks for mark in marks}
-            
-            # Map marks to unique subjects
-            for idx, subject in enumerate(subjects[:5]):
-                subject_num = idx + 1
-                student_marks[f'sub{subject_num}_name'] = subject.subject_name
-                student_marks[f'sub{subject_num}'] = marks_map.get(subject.subject_id, 0)
-            
-            # Fill remaining subjects if less than 5
-            for idx in range(len(subjects), 5):
-                subject_num = idx + 1
-                student_marks[f'sub{subject_num}_name'] = f'Subject {subject_num}'
-                student_marks[f'sub{subject_num}'] = 0
-            
-            # Calculate total and percentage
-            student_marks['total'] = sum([
-                student_marks['sub1'], student_marks['sub2'], 
-                student_marks['sub3'], student_marks['sub4'], 
-                student_marks['sub5']
-            ])
-            
-            # Calculate percentage (max marks per subject is 35)
-            num_subjects = min(len(subjects), 5)
-            max_total = num_subjects * 35
-            if max_total > 0:
-                student_marks['percentage'] = round((student_marks['total'] / max_total) * 100, 1)
-            
-            class_data[class_name]['students'].append(student_marks)
+        class_id = request.args.get('class_id', type=int)
+        limit, after = page_args()
         
-        return jsonify(list(class_data.values())), 200
+        return _paged_response(*fetch_class_marks(class_id, limit, after))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch marks data: {str(e)}'}), 500
 
@@ -2653,60 +2176,12 @@ def get_class_marks():
 def get_class_attendance():
     """Get attendance data grouped by class for student services"""
     try:
-        # Get all students with their class information
-        students = Student.query.join(Class).join(User).all()
+        class_id = request.args.get('class_id', type=int)
+        limit, after = page_args()
         
-        # Group students by class
-        class_data = {}
-        for student in students:
-            class_name = student.class_.class_name
-            if class_name not in class_data:
-                class_data[class_name] = {
-                    'class_name': class_name,
-                    'students': []
-                }
-            
-            # Get attendance for this student
-            attendance_records = Attendance.query.filter_by(student_id=student.student_id).all()
-            
-            # Organize attendance by subject
-            student_attendance = {
-                'roll_number': student.roll_no,
-                'name': student.user.name,
-                'sub1': 0, 'sub2': 0, 'sub3': 0, 'sub4': 0, 'sub5': 0,
-                'total': 0,
-                'total_percentage': 0.0,
-                'is_defaulter': False
-            }
-            
-            # Map attendance to subjects (assuming 5 subjects max)
-            subject_count = 0
-            total_present = 0
-            
-            for attendance in attendance_records:
-                if subject_count < 5:
-                    present = attendance.present_count
-                    student_attendance[f'sub{subject_count + 1}'] = present
-                    
-                    # Get subject name from database
-                    subject = db.session.get(Subject, attendance.subject_id)
-                    if subject:
-                        student_attendance[f'sub{subject_count + 1}_name'] = subject.subject_name
-                    
-                    total_present += present
-                    subject_count += 1
-            
-            student_attendance['total'] = total_present
-            
-            # Calculate total percentage and defaulter status (assuming 50 total lectures per subject)
-            max_total = subject_count * 50
-            if max_total > 0:
-                total_percentage = (total_present / max_total) * 100
-                student_attendance['total_percentage'] = round(total_percentage, 1)
-                student_attendance['is_defaulter'] = total_percentage < 75.0
-            class_data[class_name]['students'].append(student_attendance)
-        
-        return jsonify(list(class_data.values())), 200
+        return _paged_response(*fetch_class_attendance(class_id, limit, after))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch attendance data: {str(e)}'}), 500
 
@@ -2714,41 +2189,12 @@ def get_class_attendance():
 def get_class_fees():
     """Get fees data grouped by class for student services"""
     try:
-        # Get all students with their class information
-        students = Student.query.join(Class).join(User).all()
-        
-        # Group students by class
-        class_data = {}
-        for student in students:
-            class_name = student.class_.class_name
-            if class_name not in class_data:
-                class_data[class_name] = {
-                    'class_name': class_name,
-                    'students': []
-                }
-            
-            # Get fees for this student
-            fees = Fee.query.filter_by(student_id=student.student_id).first()
-            
-            # Organize fees with paid, remaining, and total
-            student_fees = {
-                'roll_number': student.roll_no,
-                'name': student.user.name,
-                'total_fees': 0,
-                'paid_fees': 0,
-                'remaining_fees': 0,
-                'payment_status': 'Unpaid'
-            }
-            
-            if fees:
-                student_fees['total_fees'] = float(fees.total_amount)
-                student_fees['paid_fees'] = float(fees.paid_amount)
-                student_fees['remaining_fees'] = float(fees.due_amount)
-                student_fees['payment_status'] = fees.payment_status
-            
-            class_data[class_name]['students'].append(student_fees)
+        class_id = request.args.get('class_id', type=int)
+        limit, after = page_args()
         
-        return jsonify(list(class_data.values())), 200
+        return _paged_response(*fetch_class_fees(class_id, limit, after))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch fees data: {str(e)}'}), 500
 
@@ -2771,28 +2217,11 @@ def get_student_services_events():
         return jsonify({'error': f'Failed to fetch events: {str(e)}'}), 500
 
 @app.route('/api/student-services/notifications', methods=['GET'])
+@login_required
 def get_student_services_notifications():
     """Get notifications for student services"""
     try:
-        # In production, verify JWT token here
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Authorization token required'}), 401
-        
-        token = auth_header.split(' ')[1]
-        # For now, extract user_id from token (in production, verify JWT)
-        if token.startswith('token-'):
-            user_id = int(token.split('-')[1])
-            user = db.session.get(User, user_id)
-            
-            if not user:
-                return jsonify({'error': 'User not found'}), 404
-            
-            notifications = Notification.query.filter_by(user_id=user_id).order_by(Notification.created_at.desc()).all()
-            return jsonify([notif.to_dict() for notif in notifications]), 200
-        else:
-            return jsonify({'error': 'Invalid token'}), 401
-            
+        return jsonify(fetch_user_notifications(current_principal().user_id)), 200
     except Exception as e:
         return jsonify({'error': f'Failed to fetch notifications: {str(e)}'}), 500
 
@@ -3118,6 +2547,8 @@ def delete_event(event_id):
         if not event:
             return jsonify({'error': 'Event not found'}), 404
         
+        # event_waitlist.event_id has no ON DELETE CASCADE; the queue goes in the same transaction
+        clear_waitlist(event_id)
         db.session.delete(event)
         db.session.commit()
         
@@ -3132,149 +2563,109 @@ def delete_event(event_id):
 def get_all_events():
     """Get all events with registration counts"""
     try:
-        events = Event.query.filter_by(is_active=True).order_by(Event.event_date.desc()).all()
+        limit, after = page_args()
+        events, next_cursor = keyset_page(Event.query.filter_by(is_active=True),
+                                          ((Event.event_date, True), (Event.event_id, True)), limit, after)
+        
+        # Students also get their 'Registered' flags, from the cached registered-ids set
+        principal = current_principal()
+        registered = registered_event_ids(principal.student_id) if principal and principal.student_id else None
         
-        # Get registration counts for each event
+        # Registration counts come from the maintained events.current_participants counter
         events_data = []
         for event in events:
             event_dict = event.to_dict()
+            if registered is not None:
+                event_dict['is_registered'] = event.event_id in registered
             events_data.append(event_dict)
         
-        return jsonify({'success': True, 'data': events_data}), 200
+        return _paged_response({'success': True, 'data': events_data}, next_cursor)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch events: {str(e)}'}), 500
 
 @app.route('/api/events/<int:event_id>/register', methods=['POST'])
+@login_required
 def register_for_event(event_id):
-    """Register a student for an event"""
+    """Register the authenticated student for an event"""
     try:
-        # Get current user from token (you'll need to implement this based on your auth system)
-        # For now, assuming user_id is passed in the request
-        data = request.get_json()
-        user_id = data.get('user_id') or request.headers.get('user_id')
-        
-        if not user_id:
-            return jsonify({'error': 'User ID is required'}), 400
-        
-        # Get student by user_id
-        student = Student.query.filter_by(user_id=user_id).first()
-        if not student:
-            return jsonify({'error': 'Student not found'}), 404
-        
-        # Check if event exists
-        event = db.session.get(Event, event_id)
-        if not event:
-            return jsonify({'error': 'Event not found'}), 404
-        
-        # Check if already registered
-        existing_registration = EventRegistration.query.filter_by(
-            event_id=event_id,
-            student_id=student.student_id
-        ).first()
-        
-        if existing_registration:
-            return jsonify({'error': 'Already registered for this event'}), 400
-        
-        # Check if event has reached max participants
-        if event.max_participants:
-            registration_count = EventRegistration.query.filter_by(event_id=event_id).count()
-            if registration_count >= event.max_participants:
-                return jsonify({'error': 'Event is full'}), 400
-        
-        # Create registration
-        registration = EventRegistration(
-            event_id=event_id,
-            student_id=student.student_id,
-            registered_at=datetime.utcnow()
-        )
-        
-        db.session.add(registration)
+        data = request.get_json(silent=True) or {}
+        principal = caller_principal(data.get('user_id') or request.headers.get('user_id'))
+        if not principal.student_id:
+            return jsonify({'error': 'Only students can register for events'}), 403
         
-        # Update event current participants
-        event.current_participants = EventRegistration.query.filter_by(event_id=event_id).count() + 1
-        
-        db.session.commit()
+        # Reserve a seat with a conditional UPDATE and insert the registration atomically
+        try:
+            registration = register_student(event_id, principal.student_id)
+        except EventFull:
+            if data.get('waitlist') is False:
+                raise
+            # Queue the student instead of leaving the client to retry
+            position = join_waitlist(event_id, principal.student_id)
+            if position is not None:
+                return jsonify({
+                    'success': True,
+                    'waitlisted': True,
+                    'position': position,
+                    'message': f'Event is full - you are #{position} on the waitlist'
+                }), 202
+            # A seat opened up in the meantime
+            registration = register_student(event_id, principal.student_id)
         
         return jsonify({'success': True, 'data': registration.to_dict()}), 201
         
+    except IdentityMismatch:
+        return jsonify({'error': 'user_id does not match the authenticated user'}), 403
+    except RegistrationError as e:
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to register for event: {str(e)}'}), 500
 
 @app.route('/api/events/<int:event_id>/register', methods=['DELETE'])
+@login_required
 def cancel_event_registration(event_id):
-    """Cancel event registration"""
+    """Cancel the authenticated student's event registration"""
     try:
-        data = request.get_json()
-        user_id = data.get('user_id') or request.headers.get('user_id')
-        
-        if not user_id:
-            return jsonify({'error': 'User ID is required'}), 400
-        
-        # Get student by user_id
-        student = Student.query.filter_by(user_id=user_id).first()
-        if not student:
-            return jsonify({'error': 'Student not found'}), 404
-        
-        # Find registration
-        registration = EventRegistration.query.filter_by(
-            event_id=event_id,
-            student_id=student.student_id
-        ).first()
-        
-        if not registration:
-            return jsonify({'error': 'Registration not found'}), 404
-        
-        # Delete registration
-        db.session.delete(registration)
+        data = request.get_json(silent=True) or {}
+        principal = caller_principal(data.get('user_id') or request.headers.get('user_id'))
+        if not principal.student_id:
+            return jsonify({'error': 'Only students can register for events'}), 403
         
-        # Update event current participants
-        event = db.session.get(Event, event_id)
-        if event:
-            event.current_participants = EventRegistration.query.filter_by(event_id=event_id).count()
-        
-        db.session.commit()
+        # Delete the registration; its seat goes to the head of the waitlist, if any
+        try:
+            cancel_registration(event_id, principal.student_id)
+        except RegistrationNotFound:
+            if not leave_waitlist(event_id, principal.student_id):
+                raise
+            return jsonify({'success': True, 'message': 'Removed from the waitlist'}), 200
         
         return jsonify({'success': True, 'message': 'Registration cancelled successfully'}), 200
         
+    except IdentityMismatch:
+        return jsonify({'error': 'user_id does not match the authenticated user'}), 403
+    except RegistrationError as e:
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to cancel registration: {str(e)}'}), 500
 
 @app.route('/api/events/my-registrations', methods=['GET'])
+@login_required
 def get_my_registrations():
     """Get current user's event registrations"""
     try:
-        user_id = request.headers.get('user_id') or request.args.get('user_id')
-        
-        if not user_id:
-            return jsonify({'error': 'User ID is required'}), 400
-        
-        # Get student by user_id
-        student = Student.query.filter_by(user_id=user_id).first()
-        if not student:
+        upcoming_only = request.args.get('upcoming_only', 'false').lower() == 'true'
+        student_id = caller_principal(request.headers.get('user_id') or request.args.get('user_id')).student_id
+        if not student_id:
             return jsonify({'success': True, 'data': []}), 200
         
-        # Get all registrations for this student
-        registrations = EventRegistration.query.filter_by(student_id=student.student_id).all()
-        
-        # Get event details for each registration
-        registrations_data = []
-        for registration in registrations:
-            event = db.session.get(Event, registration.event_id)
-            if event:
-                registrations_data.append({
-                    'id': registration.registration_id,
-                    'event_id': registration.event_id,
-                    'title': event.title,
-                    'event_date': event.event_date.isoformat(),
-                    'event_time': event.event_time.isoformat() if event.event_time else None,
-                    'location': event.location,
-                    'registered_at': registration.registered_at.isoformat()
-                })
-        
-        return jsonify({'success': True, 'data': registrations_data}), 200
+        # Registrations joined to their events in one query, by event date
+        return jsonify({'success': True, 'data': fetch_student_registrations(student_id, upcoming_only)}), 200
         
+    except IdentityMismatch:
+        return jsonify({'error': 'user_id does not match the authenticated user'}), 403
     except Exception as e:
         return jsonify({'error': f'Failed to fetch registrations: {str(e)}'}), 500
 
@@ -3321,6 +2712,7 @@ def delete_notification(notification_id):
         if not announcement:
             return jsonify({'error': 'Notification not found'}), 404
         
+        forget_announcement(notification_id)
         db.session.delete(announcement)
         db.session.commit()
         
@@ -3493,6 +2885,7 @@ def update_hod_student(branch, year, roll_no):
             student.admission_year = data['admission_year']
         
         db.session.commit()
+        invalidate_principal(user.user_id)
         
         return jsonify({
             'roll_no': student.roll_no,
@@ -3527,6 +2920,7 @@ def delete_hod_student(branch, year, roll_no):
         User.query.filter_by(user_id=user_id).delete()
         
         db.session.commit()
+        invalidate_principal(user_id)
         
         return jsonify({'message': 'Student deleted successfully'}), 200
         
@@ -3545,10 +2939,13 @@ def extract_text_from_file(file):
     filename = secure_filename(file.filename)
     ext = filename.rsplit('.', 1)[1].lower()
     try:
+        # The document parsers are imported on first use so workers that never serve uploads skip them
         if ext == "pdf":
+            import PyPDF2
             reader = PyPDF2.PdfReader(file)
             return "\n".join([page.extract_text() or "" for page in reader.pages])
         elif ext in ["docx", "doc"]:
+            import docx
             document = docx.Document(file)
             return "\n".join([p.text for p in document.paragraphs])
         elif ext == "txt":
@@ -3653,336 +3050,47 @@ def ai_health():
     return jsonify({"ok": True}), 200
 
 # ============ ADMISSION INFO API ============
+# Content comes from data/admission_content.json (see admission_content.py).
+# Bodies are serialized once; clients and CDNs revalidate with If-None-Match.
+ADMISSION_CACHE_MAX_AGE = int(os.getenv('ADMISSION_CACHE_MAX_AGE', '3600'))
+
+def _static_content_response(payload):
+    """Cacheable JSON response from a pre-serialized (body, etag) pair"""
+    body, etag = payload
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = ADMISSION_CACHE_MAX_AGE
+    return response.make_conditional(request)
+
 @app.route('/api/admission/info', methods=['GET'])
 def get_admission_info():
     """Get SKNSCOE admission information"""
-    info = {
-        "college_name": "SKN Sinhgad College of Engineering (SKNSCOE), Korti, Pandharpur",
-        "established_year": 2010,
-        "affiliation": "Punyashlok Ahilyadevi Holkar Solapur University",
-        "approval": "AICTE, New Delhi",
-        "institute_type": "Private Unaided",
-        "address": "Gat No. 664, Korti, Pandharpur, Solapur, Maharashtra 413304",
-        "campus_area_acres": 20,
-        "contact": {
-            "website": "https://www.sinhgad.edu/sinhgad-engineering-institutes/sknscoe-pandharpur/",
-            "email": "principal.sknsce@sinhgad.edu",
-            "phone": "+91-9822053108"
-        },
-        "branches": [
-            {
-                "name": "Computer Science and Engineering",
-                "code": "CSE",
-                "intake": 120,
-                "description": "Cutting-edge curriculum in software development, AI/ML, and computer systems"
-            },
-            {
-                "name": "Artificial Intelligence and Data Science",
-                "code": "AI_DS",
-                "intake": 60,
-                "description": "Focus on AI algorithms, machine learning, and big data analytics"
-            },
-            {
-                "name": "Electrical Engineering",
-                "code": "EE",
-                "intake": 60,
-                "description": "Power systems, electrical machines, and control systems"
-            },
-            {
-                "name": "Civil Engineering",
-                "code": "CE",
-                "intake": 60,
-                "description": "Structural engineering, construction management, and infrastructure"
-            },
-            {
-                "name": "Electronics and Telecommunication Engineering",
-                "code": "ENTC",
-                "intake": 60,
-                "description": "Communication systems, signal processing, and embedded systems"
-            },
-            {
-                "name": "Mechanical Engineering",
-                "code": "MECH",
-                "intake": 90,
-                "description": "Thermodynamics, manufacturing processes, and machine design"
-            }
-        ],
-        "admissionProcess": [
-            {
-                "step": "1",
-                "title": "Check Eligibility",
-                "description": "Passed 10+2 with Physics, Chemistry, Mathematics with minimum 45% marks (40% for reserved categories)",
-                "deadline": "Before application deadline"
-            },
-            {
-                "step": "2",
-                "title": "Register for Entrance Exam",
-                "description": "MHT-CET or JEE Main",
-                "deadline": "As per exam schedule"
-            },
-            {
-                "step": "3",
-                "title": "CAP Round Counselling",
-                "description": "Participate in Maharashtra CAP (Centralized Admission Process) - 80% seats",
-                "deadline": "After MHT-CET results"
-            },
-            {
-                "step": "4",
-                "title": "Document Verification",
-                "description": "Submit all required documents for verification",
-                "deadline": "As per counselling schedule"
-            },
-            {
-                "step": "5",
-                "title": "Fee Payment",
-                "description": "Pay admission fee and complete enrollment",
-                "deadline": "Within specified timeframe"
-            }
-        ],
-        "requiredDocuments": [
-            "10th Marksheet",
-            "12th Marksheet",
-            "Entrance Exam Scorecard (MHT-CET/JEE Main)",
-            "CET Allotment Letter",
-            "Caste Certificate (if applicable)",
-            "Domicile Certificate",
-            "Aadhaar Card",
-            "Passport-size Photos (4 copies)",
-            "Medical Fitness Certificate",
-            "Income Certificate (for fee concessions)",
-            "Transfer Certificate",
-            "Migration Certificate (if applicable)"
-        ],
-        "cutoffData": {
-            "CSE": {
-                "mht_cet_percentile": "84.48",
-                "jee_main_rank": "201109"
-            },
-            "AI_DS": {
-                "mht_cet_percentile": "82.76"
-            },
-            "ENTC": {
-                "mht_cet_percentile": "76.33"
-            },
-            "MECH": {
-                "mht_cet_percentile": "72.38"
-            },
-            "CE": {
-                "mht_cet_percentile": "73.20"
-            }
-        },
-        "hostelFacility": {
-            "available": True,
-            "totalCapacity": 2400,
-            "boysCapacity": 1600,
-            "girlsCapacity": 800,
-            "roomType": "3-4 students per room with bed, table, chair, cupboard",
-            "annualFees": 18000,
-            "messFees": 24000,
-            "combinedFees": 36000,
-            "facilities": [
-                "24x7 Security",
-                "Wi-Fi Internet",
-                "RO Drinking Water",
-                "Laundry",
-                "Recreation Room",
-                "Hot Water Supply",
-                "Medical Aid"
-            ]
-        },
-        "transportFacility": {
-            "available": True,
-            "details": "College provides bus facility from nearby towns and villages including Pandharpur, Mangalwedha, and Sangola."
-        },
-        "facilities": [
-            "Library and Digital Learning Center",
-            "Wi-Fi Campus",
-            "Canteen and Mess",
-            "Gymnasium",
-            "Computer Labs",
-            "Language Lab",
-            "Bank/ATM",
-            "Sports Complex",
-            "Anti-ragging Cell",
-            "Student Clubs and NSS"
-        ],
-        "placement": {
-            "averagePackage": 3.2,
-            "highestPackage": 8.0,
-            "topRecruiters": ["TCS", "Infosys", "Wipro", "Capgemini", "Tech Mahindra", "Cognizant", "Persistent Systems"]
-        },
-        "scholarships": [
-            "EBC (Economically Backward Class) Scholarship",
-            "Government of India Post-Matric Scholarship for SC/ST",
-            "Minority Scholarship",
-            "TFWS (Tuition Fee Waiver Scheme)"
-        ]
-    }
-    return jsonify({'success': True, 'data': info}), 200
+    return _static_content_response(admission_content.payload('admission_info'))
 
 @app.route('/api/admission/fees', methods=['GET'])
 def get_admission_fees():
     """Get SKNSCOE fee structure"""
-    fees = {
-        "feeStructure": {
-            "CSE": {
-                "branch": "Computer Science and Engineering (CSE)",
-                "tuitionFee": 96000,
-                "developmentFee": 10000,
-                "libraryFee": 2000,
-                "laboratoryFee": 3000,
-                "examinationFee": 2000,
-                "sportsFee": 1000,
-                "total": 122000
-            },
-            "AI_DS": {
-                "branch": "Artificial Intelligence and Data Science (AI & DS)",
-                "tuitionFee": 96000,
-                "developmentFee": 10000,
-                "libraryFee": 2000,
-                "laboratoryFee": 3000,
-                "examinationFee": 2000,
-                "sportsFee": 1000,
-                "total": 122000
-            },
-            "EE": {
-                "branch": "Electrical Engineering",
-                "tuitionFee": 90000,
-                "developmentFee": 10000,
-                "libraryFee": 2000,
-                "laboratoryFee": 3000,
-                "examinationFee": 2000,
-                "sportsFee": 1000,
-                "total": 118000
-            },
-            "CE": {
-                "branch": "Civil Engineering",
-                "tuitionFee": 85000,
-                "developmentFee": 10000,
-                "libraryFee": 2000,
-                "laboratoryFee": 3000,
-                "examinationFee": 2000,
-                "sportsFee": 1000,
-                "total": 108000
-            },
-            "ENTC": {
-                "branch": "Electronics and Telecommunication Engineering",
-                "tuitionFee": 90000,
-                "developmentFee": 10000,
-                "libraryFee": 2000,
-                "laboratoryFee": 3000,
-                "examinationFee": 2000,
-                "sportsFee": 1000,
-                "total": 118000
-            },
-            "MECH": {
-                "branch": "Mechanical Engineering",
-                "tuitionFee": 85000,
-                "developmentFee": 10000,
-                "libraryFee": 2000,
-                "laboratoryFee": 3000,
-                "examinationFee": 2000,
-                "sportsFee": 1000,
-                "total": 108000
-            }
-        },
-        "categoryConcessions": {
-            "open": {
-                "tuitionFee": 96000,
-                "concession": 0
-            },
-            "obc_ebc_sebc": {
-                "tuitionFee": 54261,
-                "concession": 41739
-            },
-            "nt_sbc_tfws_girls": {
-                "tuitionFee": 12522,
-                "concession": 83478
-            },
-            "sc_st": {
-                "tuitionFee": 0,
-                "concession": 96000
-            }
-        },
-        "hostelFees": {
-            "annualHostel": 18000,
-            "messFees": 24000,
-            "combinedFees": 36000,
-            "cautionDeposit": 2000
-        }
-    }
-    return jsonify({'success': True, 'data': fees}), 200
+    return _static_content_response(admission_content.payload('admission_fees'))
 
 @app.route('/api/admission/contacts', methods=['GET'])
 def get_admission_contacts():
     """Get SKNSCOE contact information"""
-    contacts = {
-        "admissionOffice": {
-            "phone": "+91-9822053108",
-            "email": "principal.sknsce@sinhgad.edu",
-            "address": "Gat No. 664, Korti, Pandharpur, Solapur, Maharashtra 413304",
-            "workingHours": "Monday to Saturday, 9:00 AM - 5:00 PM"
-        },
-        "website": "https://www.sinhgad.edu/sinhgad-engineering-institutes/sknscoe-pandharpur/",
-        "branchCoordinators": {
-            "CSE": {
-                "name": "Prof. [HOD Name]",
-                "phone": "+91-9822053108",
-                "email": "hod.cs@sinhgad.edu"
-            },
-            "AI_DS": {
-                "name": "Prof. [HOD Name]",
-                "phone": "+91-9822053108",
-                "email": "hod.aids@sinhgad.edu"
-            },
-            "EE": {
-                "name": "Prof. [HOD Name]",
-                "phone": "+91-9822053108",
-                "email": "hod.ee@sinhgad.edu"
-            }
-        }
-    }
-    return jsonify({'success': True, 'data': contacts}), 200
+    return _static_content_response(admission_content.payload('admission_contacts'))
 
 @app.route('/api/admission/fees/calculate', methods=['GET'])
 def calculate_fees():
-    """Calculate total fees based on selections"""
+    """Calculate total fees based on selections (looked up in the precomputed fee matrix)"""
     branch = request.args.get('branch', 'CSE')
     include_hostel = request.args.get('includeHostel', 'false').lower() == 'true'
     include_transport = request.args.get('includeTransport', 'false').lower() == 'true'
-    
-    # Fee structure
-    fee_structure = {
-        "CSE": 122000,
-        "AI_DS": 122000,
-        "EE": 118000,
-        "CE": 108000,
-        "ENTC": 118000,
-        "MECH": 108000
-    }
-    
-    base_fee = fee_structure.get(branch, 122000)
-    hostel_fee = 36000 if include_hostel else 0
-    transport_fee = 5000 if include_transport else 0
-    
-    total = base_fee + hostel_fee + transport_fee
-    
-    calculation = {
-        "baseFees": base_fee,
-        "hostelFees": hostel_fee,
-        "transportFees": transport_fee,
-        "breakdown": {
-            "tuitionFee": base_fee * 0.8,
-            "developmentFee": base_fee * 0.08,
-            "libraryFee": 2000,
-            "laboratoryFee": 3000,
-            "examinationFee": 2000,
-            "sportsFee": 1000
-        },
-        "totalFees": total
-    }
-    
-    return jsonify({'success': True, 'calculation': calculation}), 200
+    return _static_content_response(
+        admission_content.fee_calculation_payload(branch, include_hostel, include_transport))
+
+@app.route('/api/admission/fees/matrix', methods=['GET'])
+def get_fee_matrix():
+    """Every branch x hostel x transport fee calculation in one response"""
+    return _static_content_response(admission_content.fee_matrix_payload())
 
 # ============ PROFILE UPDATE API ============
 @app.route('/api/users/<int:user_id>', methods=['PUT'])
@@ -4009,6 +3117,7 @@ def update_user_profile(user_id):
             user.password = data['password']
         
         db.session.commit()
+        invalidate_principal(user_id)
         
         return jsonify({'success': True, 'message': 'Profile updated successfully', 'user': user.to_dict()}), 200
         
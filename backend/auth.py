@@ -0,0 +1,186 @@
+"""
+Request authentication and cached principal resolution.
+
+Login issues a token signed with SECRET_KEY. A before_request hook verifies
+the Bearer token once per request and resolves the user to a Principal
+(role, student_id, class_id, dept_id, profile fields) through a bounded TTL cache, so
+authenticated routes and the chatbot skip the per-request User/Student
+lookups. Routes that change any of those fields must call
+invalidate_principal(user_id).
+"""
+import os
+from dataclasses import dataclass
+from functools import wraps
+from typing import Optional
+
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from models import db, User, Student, Class
+from ttl_cache import TTLCache
+
+TOKEN_SALT = 'smartedu-auth'
+# Stream tickets are signed separately, so a ticket is never accepted as a Bearer token
+STREAM_TICKET_SALT = 'smartedu-stream-ticket'
+# Placeholder keys from config.py / env.example that must never sign tokens in production
+INSECURE_SECRET_KEYS = {'dev-secret-key-change-in-production', 'your-secret-key-here'}
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    name: str
+    email: str
+    role: str
+    contact_no: Optional[str]
+    student_id: Optional[int]
+    class_id: Optional[int]
+    dept_id: Optional[int]
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'name': self.name,
+            'email': self.email,
+            'role': self.role,
+            'contact_no': self.contact_no
+        }
+
+
+# user_id -> Principal
+principal_cache = TTLCache(
+    maxsize=int(os.getenv('AUTH_CACHE_SIZE', '1024')),
+    ttl_seconds=float(os.getenv('AUTH_CACHE_TTL_SECONDS', '300'))
+)
+
+
+def resolve_principal(user_id: int) -> Optional[Principal]:
+    """Principal for a user id, from the cache or one joined query"""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    row = (
+        db.session.query(User.user_id, User.name, User.email, User.role, User.contact_no,
+                         Student.student_id, Student.class_id, Class.dept_id)
+        .outerjoin(Student, Student.user_id == User.user_id)
+        .outerjoin(Class, Class.class_id == Student.class_id)
+        .filter(User.user_id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    principal = Principal(*row)
+    principal_cache.put(principal.user_id, principal)
+    return principal
+
+
+def invalidate_principal(user_id):
+    """Drop a cached principal after its user or student record changed"""
+    if user_id is not None:
+        principal_cache.invalidate(int(user_id))
+
+
+# ---------- Tokens ----------
+def _insecure_secret_key(app) -> bool:
+    return not app.config.get('SECRET_KEY') or app.config['SECRET_KEY'] in INSECURE_SECRET_KEYS
+
+
+def _serializer(app, salt: str = TOKEN_SALT) -> URLSafeTimedSerializer:
+    # A placeholder key is public, so anyone could mint tokens with it; only debug/test runs may use one
+    if _insecure_secret_key(app) and not (app.debug or app.testing):
+        raise RuntimeError('Refusing to sign tokens: SECRET_KEY is unset or left at its default')
+    return URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=salt)
+
+
+def issue_token(app, user_id: int) -> str:
+    return _serializer(app).dumps({'uid': user_id})
+
+
+def issue_stream_ticket(app, user_id: int) -> str:
+    """Short-lived credential for EventSource URLs, which cannot carry an Authorization header"""
+    return _serializer(app, STREAM_TICKET_SALT).dumps({'uid': user_id})
+
+
+def _resolve_token(app, token: str, salt: str = TOKEN_SALT, max_age_key: str = 'AUTH_TOKEN_MAX_AGE'):
+    """Set g.principal (or g.auth_error) from a token"""
+    try:
+        claims = _serializer(app, salt).loads(token, max_age=app.config[max_age_key])
+        user_id = int(claims['uid'])
+    except (BadSignature, KeyError, TypeError, ValueError):
+        g.auth_error = ({'error': 'Invalid token'}, 401)
+        return
+    g.principal = resolve_principal(user_id)
+    if g.principal is None:
+        g.auth_error = ({'error': 'User not found'}, 404)
+
+
+def _authenticate(app):
+    """before_request hook: resolve the Bearer token, if any"""
+    g.principal = None
+    g.auth_error = None
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return
+    _resolve_token(app, auth_header.split(' ', 1)[1])
+
+
+def accepts_stream_ticket(view):
+    """Also accept ?ticket= from issue_stream_ticket - for EventSource, which cannot send headers.
+    The URL ends up in access logs, so it carries a ticket that expires within
+    STREAM_TICKET_MAX_AGE seconds, never the long-lived Bearer token.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        ticket = request.args.get('ticket')
+        if ticket and g.get('principal') is None and not g.get('auth_error'):
+            _resolve_token(current_app, ticket, STREAM_TICKET_SALT, 'STREAM_TICKET_MAX_AGE')
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def login_required(view):
+    """Reject the request unless the hook resolved a principal"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if g.get('auth_error'):
+            body, status = g.auth_error
+            return jsonify(body), status
+        if g.get('principal') is None:
+            return jsonify({'error': 'Authorization token required'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def current_principal() -> Optional[Principal]:
+    return g.get('principal')
+
+
+class IdentityMismatch(Exception):
+    """A request body named a user other than the authenticated caller"""
+
+
+def caller_principal(claimed_user_id=None) -> Optional[Principal]:
+    """The token's principal (None for guests). Older clients still send their
+    user_id in the body; it is only accepted when it is the caller's own.
+    """
+    principal = current_principal()
+    if claimed_user_id in (None, '', 0, '0'):
+        return principal
+    try:
+        claimed_user_id = int(claimed_user_id)
+    except (TypeError, ValueError):
+        raise IdentityMismatch()
+    if principal is None or principal.user_id != claimed_user_id:
+        raise IdentityMismatch()
+    return principal
+
+
+def init_app(app):
+    if _insecure_secret_key(app):
+        if not (app.debug or app.testing):
+            raise RuntimeError('SECRET_KEY is unset or left at its default - tokens could be forged. '
+                               'Set SECRET_KEY in the environment.')
+        print("⚠️  SECRET_KEY is the development default - issued tokens can be forged")
+    app.config.setdefault('AUTH_TOKEN_MAX_AGE', int(os.getenv('AUTH_TOKEN_MAX_AGE', str(7 * 24 * 3600))))
+    app.config.setdefault('STREAM_TICKET_MAX_AGE', int(os.getenv('STREAM_TICKET_MAX_AGE', '60')))
+    app.before_request(lambda: _authenticate(app))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the /chatbot endpoint
+Run against a live server (python app.py) and compare p50/p99 between builds
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://127.0.0.1:5000"
+
+# Data-backed intents - these are the turns that used to loop back over HTTP
+MESSAGES = [
+    "show my fee details",
+    "what is my attendance",
+    "attendance in data structure",
+    "show my marks",
+    "marks in operating system",
+    "show announcements",
+]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_turn(session, message, user_id, student_id):
+    payload = {'message': message, 'user_id': user_id, 'student_id': student_id}
+    start = time.perf_counter()
+    response = session.post(f"{BASE_URL}/chatbot", json=payload, timeout=30)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return message, elapsed_ms, response.status_code
+
+
+def benchmark_chatbot(requests_per_message, concurrency, user_id, student_id):
+    """Fire each message N times with the given concurrency and report latency percentiles"""
+    print("📊 Benchmarking /chatbot")
+    print("=" * 60)
+    print(f"Requests per message: {requests_per_message}  |  Concurrency: {concurrency}\n")
+
+    session = requests.Session()
+    jobs = [m for m in MESSAGES for _ in range(requests_per_message)]
+    results = {message: [] for message in MESSAGES}
+    errors = 0
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(run_turn, session, m, user_id, student_id) for m in jobs]
+        for future in futures:
+            message, elapsed_ms, status = future.result()
+            if status != 200:
+                errors += 1
+            results[message].append(elapsed_ms)
+    wall_seconds = time.perf_counter() - wall_start
+
+    all_samples = []
+    for message, samples in results.items():
+        all_samples.extend(samples)
+        print(f"   {message:<32} p50: {percentile(samples, 50):7.1f} ms   p99: {percentile(samples, 99):7.1f} ms")
+
+    print("\n" + "=" * 60)
+    print(f"Overall  p50: {percentile(all_samples, 50):.1f} ms  |  p99: {percentile(all_samples, 99):.1f} ms  |  "
+          f"mean: {statistics.mean(all_samples):.1f} ms")
+    print(f"Throughput: {len(all_samples) / wall_seconds:.1f} req/s  |  Non-200 responses: {errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=50, help='requests per message')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--user-id', type=int, default=2)
+    parser.add_argument('--student-id', type=int, default=1)
+    args = parser.parse_args()
+    benchmark_chatbot(args.requests, args.concurrency, args.user_id, args.student_id)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Worker startup benchmark: import time and resident memory of the app
+Imports the app module in a fresh interpreter under `python -X importtime`,
+the same work every gunicorn worker does on boot, and reports the total import
+time, peak RSS and the slowest top-level imports. A second run also imports the
+heavy optional stacks the routes now load on first use (document parsers,
+TextBlob, the voice libraries), which is what each worker used to pay at
+startup. Modules that are not installed are skipped.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Imported on first use by the routes that need them
+DEFERRED_MODULES = ['PyPDF2', 'docx', 'textblob', 'speech_recognition', 'pydub', 'pyttsx3']
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+PROBE = """
+import importlib, resource, sys
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+loaded = [name for name in %r if name in sys.modules]
+print('RSS_KB', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'LOADED', ','.join(loaded))
+""" % (DEFERRED_MODULES,)
+
+
+def measure(module, extra_modules):
+    """Import module (+ extra_modules) in a new interpreter.
+    Returns (total import us, peak RSS kB, deferred modules loaded, top-level imports by cost).
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE, module, *extra_modules],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            imports.append((int(match.group(2)), match.group(4)))
+    summary = re.search(r"RSS_KB (\d+) LOADED (\S*)", result.stdout)
+    if summary is None:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    loaded = [name for name in summary.group(2).split(',') if name]
+    return sum(us for us, _ in imports), int(summary.group(1)), loaded, sorted(imports, reverse=True)
+
+
+def benchmark_imports(module, top):
+    print("🚀 Worker import benchmark")
+    print("=" * 60)
+    baseline_us, baseline_kb, _, _ = measure('json', [])
+    lazy_us, lazy_kb, still_loaded, lazy_imports = measure(module, [])
+    eager_us, eager_kb, loaded, _ = measure(module, DEFERRED_MODULES)
+
+    print(f"{'':<28} {'import ms':>10} {'RSS MB':>9}")
+    print(f"{'bare interpreter':<28} {baseline_us / 1000:>10.1f} {baseline_kb / 1024:>9.1f}")
+    print(f"{module + ' (deferred imports)':<28} {lazy_us / 1000:>10.1f} {lazy_kb / 1024:>9.1f}")
+    print(f"{module + ' + heavy stacks':<28} {eager_us / 1000:>10.1f} {eager_kb / 1024:>9.1f}")
+    print(f"Saved per worker: {(eager_us - lazy_us) / 1000:.1f} ms, {(eager_kb - lazy_kb) / 1024:.1f} MB "
+          f"(installed here: {', '.join(loaded) or 'none'})")
+
+    eager = [name for name in DEFERRED_MODULES if name in still_loaded]
+    if eager:
+        print(f"⚠️  Still imported at startup: {', '.join(eager)}")
+
+    print(f"\nSlowest top-level imports of {module}:")
+    for us, name in lazy_imports[:top]:
+        print(f"  {us / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='app', help='module a worker imports on boot')
+    parser.add_argument('--top', type=int, default=10, help='how many top-level imports to list')
+    args = parser.parse_args()
+    benchmark_imports(args.module, args.top)
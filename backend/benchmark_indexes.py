@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN and timing report for the hot query shapes, with and without the
+migrate_indexes.py indexes
+Seeds a scratch database with a synthetic college (10k students by default),
+times each route's query with the indexes dropped, creates them, and times
+again. Point --database-url at an EMPTY scratch schema - never production.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, func, or_, select
+
+from models import db, User, Department, Class, Subject, Student, Mark, Attendance, Event, \
+    Announcement, ChatMessage, Notification
+from migrate_indexes import hot_query_indexes
+
+SUBJECTS_PER_CLASS = 5
+NOTIFICATIONS_PER_USER = 20
+CHAT_MESSAGES_PER_USER = 10
+BATCH = 5000
+
+
+def insert_batched(conn, table, rows):
+    for start in range(0, len(rows), BATCH):
+        conn.execute(table.insert(), rows[start:start + BATCH])
+
+
+def seed(engine, students):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise SystemExit("Refusing to seed: the users table is not empty. Use an empty scratch database.")
+        conn.execute(Department.__table__.insert(), [{'dept_id': 1, 'dept_name': 'CSE', 'dept_code': 'CSE'}])
+        years = ['FY', 'SY', 'TY', 'BE']
+        conn.execute(Class.__table__.insert(), [
+            {'class_id': i + 1, 'dept_id': 1, 'class_name': f'{year}-CSE', 'class_code': f'{year}CSE'}
+            for i, year in enumerate(years)
+        ])
+        conn.execute(Subject.__table__.insert(), [
+            {'subject_id': c * SUBJECTS_PER_CLASS + s + 1, 'class_id': c + 1,
+             'subject_name': f'Subject {s + 1}', 'subject_code': f'S{c}{s}'}
+            for c in range(len(years)) for s in range(SUBJECTS_PER_CLASS)
+        ])
+        insert_batched(conn, User.__table__, [
+            {'user_id': n, 'name': f'Student {n}', 'email': f's{n}@example.edu', 'password': 'x',
+             'role': 'student', 'is_active': True, 'created_at': now, 'updated_at': now}
+            for n in range(1, students + 1)
+        ])
+        insert_batched(conn, Student.__table__, [
+            {'student_id': n, 'user_id': n, 'roll_no': f'R{n:06d}', 'class_id': n % len(years) + 1,
+             'admission_year': 2024}
+            for n in range(1, students + 1)
+        ])
+        per_subject = []
+        for n in range(1, students + 1):
+            class_index = n % len(years)
+            for s in range(SUBJECTS_PER_CLASS):
+                per_subject.append((n, class_index * SUBJECTS_PER_CLASS + s + 1))
+        insert_batched(conn, Mark.__table__, [
+            {'student_id': n, 'subject_id': sub, 'total_marks': 35, 'obtained_marks': random.randint(10, 35)}
+            for n, sub in per_subject
+        ])
+        insert_batched(conn, Attendance.__table__, [
+            {'student_id': n, 'subject_id': sub, 'present_count': random.randint(20, 50), 'absent_count': 5,
+             'late_count': 0, 'total_classes': 50, 'attendance_percentage': 80.0, 'academic_year': '2024'}
+            for n, sub in per_subject
+        ])
+        insert_batched(conn, Notification.__table__, [
+            {'user_id': n, 'title': 'Notice', 'message': 'Body', 'type': 'info',
+             'is_read': random.random() < 0.7, 'created_at': now - timedelta(minutes=random.randint(0, 100000))}
+            for n in range(1, students + 1) for _ in range(NOTIFICATIONS_PER_USER)
+        ])
+        insert_batched(conn, ChatMessage.__table__, [
+            {'user_id': n, 'message': 'hello', 'response': 'hi',
+             'timestamp': now - timedelta(minutes=random.randint(0, 100000))}
+            for n in range(1, students + 1) for _ in range(CHAT_MESSAGES_PER_USER)
+        ])
+        insert_batched(conn, Event.__table__, [
+            {'title': f'Event {n}', 'event_date': date.today() + timedelta(days=random.randint(-365, 365)),
+             'is_active': random.random() < 0.8, 'created_at': now}
+            for n in range(students // 5)
+        ])
+        insert_batched(conn, Announcement.__table__, [
+            {'title': f'Announcement {n}', 'message': 'Body', 'is_active': random.random() < 0.5,
+             'created_at': now - timedelta(days=random.randint(0, 365)),
+             'expires_at': now + timedelta(days=random.randint(-200, 200)) if random.random() < 0.5 else None}
+            for n in range(students // 5)
+        ])
+
+
+def route_queries(students):
+    """(label, route, query factory) - each factory draws fresh parameters"""
+    notifications, marks, attendance = Notification.__table__, Mark.__table__, Attendance.__table__
+    chats, events, announcements = ChatMessage.__table__, Event.__table__, Announcement.__table__
+    user = lambda: random.randint(1, students)
+    return [
+        ('unread notifications', '/api/notifications?unread_only=true', lambda: (
+            select(notifications).where(notifications.c.user_id == user(), notifications.c.is_read == False)
+            .order_by(notifications.c.created_at.desc()))),
+        ('notification list', '/api/notifications', lambda: (
+            select(notifications).where(notifications.c.user_id == user())
+            .order_by(notifications.c.created_at.desc()))),
+        ('mark lookup', '/api/students/<id>/marks (POST duplicate check)', lambda: (
+            select(marks).where(marks.c.student_id == user(), marks.c.subject_id == random.randint(1, 20)))),
+        ('attendance summary', '/api/students/<id>/attendance-summary', lambda: (
+            select(attendance).where(attendance.c.student_id == user()).order_by(attendance.c.attendance_id))),
+        ('chat history', '/api/chat/<user_id>', lambda: (
+            select(chats).where(chats.c.user_id == user()).order_by(chats.c.timestamp.desc()))),
+        ('upcoming events', '/api/events, chatbot event_query', lambda: (
+            select(events).where(events.c.is_active == True, events.c.event_date >= date.today())
+            .order_by(events.c.event_date).limit(5))),
+        ('active announcements', '/api/announcements', lambda: (
+            select(announcements).where(
+                announcements.c.is_active == True,
+                or_(announcements.c.expires_at.is_(None), announcements.c.expires_at > datetime.utcnow()))
+            .order_by(announcements.c.created_at.desc()))),
+    ]
+
+
+def explain(conn, query):
+    compiled = str(query.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    return [tuple(row) for row in conn.exec_driver_sql(prefix + compiled).fetchall()]
+
+
+def time_queries(engine, queries, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for label, _, factory in queries:
+            samples = []
+            for _ in range(repeat):
+                query = factory()
+                start = time.perf_counter()
+                conn.execute(query).fetchall()
+                samples.append((time.perf_counter() - start) * 1000)
+            results[label] = (statistics.median(samples), explain(conn, factory()))
+    return results
+
+
+def benchmark_indexes(database_url, students, repeat):
+    engine = create_engine(database_url)
+    print("🗂️  Hot query index benchmark")
+    print("=" * 60)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}  |  Students: {students}\n")
+
+    db.metadata.create_all(engine)
+    indexes = hot_query_indexes()
+    for index in indexes:
+        index.drop(bind=engine, checkfirst=True)
+    seed_start = time.perf_counter()
+    seed(engine, students)
+    print(f"Seeded in {time.perf_counter() - seed_start:.1f}s\n")
+
+    queries = route_queries(students)
+    before = time_queries(engine, queries, repeat)
+    for index in indexes:
+        index.create(bind=engine, checkfirst=True)
+    after = time_queries(engine, queries, repeat)
+
+    for label, route, _ in queries:
+        before_ms, before_plan = before[label]
+        after_ms, after_plan = after[label]
+        print(f"▶ {label}  ({route})")
+        print(f"   median: {before_ms:8.3f} ms -> {after_ms:8.3f} ms   ({before_ms / max(after_ms, 1e-6):.1f}x)")
+        print(f"   plan before: {before_plan}")
+        print(f"   plan after:  {after_plan}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=None,
+                        help='empty scratch database (default: a temporary SQLite file)')
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50, help='timed runs per query')
+    args = parser.parse_args()
+    url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'index_benchmark.db')
+    benchmark_indexes(url, args.students, args.repeat)
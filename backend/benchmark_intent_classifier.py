@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Accuracy and latency of the embedded intent classifier against the Rasa server
+Trains the embedded model from data/nlu.yml and the keyword intent table (as
+intent_classifier.py does), then classifies a held-out set of labelled
+paraphrases - including messages outside every trained intent, which should
+come back as help_request - with the embedded model and, if it is reachable,
+the Rasa server at RASA_SERVER_URL. Reports accuracy, 10-fold cross-validated
+accuracy on the training examples, and per-message latency.
+"""
+
+import argparse
+import time
+
+from intent_classifier import FALLBACK_INTENT, IntentClassifier, load_training_examples
+from rasa_service import RasaService
+
+# Paraphrases not in nlu.yml: (message, expected intent)
+EVALUATION_SET = [
+    ("hii", 'greet'), ("hello there", 'greet'), ("hey bot", 'greet'), ("good afternoon", 'greet'),
+    ("what are my fees", 'fee_query'), ("pending fee amount", 'fee_query'), ("fee status please", 'fee_query'),
+    ("how much fee do i owe", 'fee_query'), ("my attendence", 'attendance_query'),
+    ("show attendance percentage", 'attendance_query'), ("attendance for this month", 'attendance_query'),
+    ("what's my attendance like", 'attendance_query'), ("events next week", 'event_query'),
+    ("show upcoming events", 'event_query'), ("any college events", 'event_query'),
+    ("list all events", 'event_query'), ("bye then", 'goodbye'), ("my marks", 'marks_query'),
+    ("exam result", 'marks_query'), ("who created this bot", 'ask_creator'), ("tell me a joke", FALLBACK_INTENT),
+    ("what is the weather", FALLBACK_INTENT),
+]
+
+
+def cross_validate(examples, folds=10):
+    """Accuracy on each example when trained on the folds that do not contain it"""
+    correct = 0
+    for fold in range(folds):
+        held_out = examples[fold::folds]
+        model = IntentClassifier.train([example for index, example in enumerate(examples) if index % folds != fold])
+        predictions = model.predict_batch([text for text, _ in held_out])
+        correct += sum(predicted == intent for (predicted, _), (_, intent) in zip(predictions, held_out))
+    return correct / len(examples)
+
+
+def evaluate(classify, rounds):
+    """(accuracy, mean µs per message) of classify(message) -> intent over EVALUATION_SET"""
+    predictions = [classify(message) for message, _ in EVALUATION_SET]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message, _ in EVALUATION_SET:
+            classify(message)
+    elapsed = time.perf_counter() - start
+    accuracy = sum(predicted == expected for predicted, (_, expected) in zip(predictions, EVALUATION_SET))
+    return accuracy / len(EVALUATION_SET), elapsed / (rounds * len(EVALUATION_SET)) * 1e6, predictions
+
+
+def benchmark_intent_classifier(rounds, server_rounds):
+    examples = load_training_examples()
+    print("🧠 Embedded intent classifier vs Rasa server")
+    print("=" * 60)
+    start = time.perf_counter()
+    model = IntentClassifier.train(examples)
+    train_ms = (time.perf_counter() - start) * 1000
+    print(f"Training: {len(examples)} examples, {len(model.labels)} intents in {train_ms:.1f} ms  |  "
+          f"10-fold accuracy: {cross_validate(examples):.0%}")
+    print(f"Evaluation set: {len(EVALUATION_SET)} held-out messages\n")
+
+    results = {'embedded': evaluate(lambda message: model.predict(message)[0], rounds)}
+    rasa = RasaService()
+    try:
+        rasa._parse('hello')
+    except Exception as e:
+        print(f"⚠️  Rasa server at {rasa.base_url} not reachable ({e.__class__.__name__}) - embedded only\n")
+    else:
+        results['rasa'] = evaluate(lambda message: (rasa._parse(message).get('intent') or {}).get('name'),
+                                   server_rounds)
+
+    print(f"{'backend':<10} {'accuracy':>9} {'µs/message':>12}")
+    for name, (accuracy, us, _) in results.items():
+        print(f"{name:<10} {accuracy:>9.0%} {us:>12.1f}")
+    if 'rasa' in results:
+        print(f"Speedup: {results['rasa'][1] / results['embedded'][1]:.0f}x")
+
+    misses = [(name, message, predicted, expected) for name, (_, _, predictions) in results.items()
+              for predicted, (message, expected) in zip(predictions, EVALUATION_SET) if predicted != expected]
+    print(f"\nMisclassified: {len(misses)}")
+    for name, message, predicted, expected in misses:
+        print(f"  {name:<9} {message!r}: {predicted} (expected {expected})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=200, help='passes over the evaluation set (embedded)')
+    parser.add_argument('--server-rounds', type=int, default=3, help='passes over the evaluation set (Rasa server)')
+    args = parser.parse_args()
+    benchmark_intent_classifier(args.rounds, args.server_rounds)
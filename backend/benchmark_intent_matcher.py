@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the chatbot intent matcher
+Replays the messages stored in the chat_messages table through the old chained
+substring scan and the compiled matcher, and reports time per message and any
+messages where the two disagree
+"""
+
+import argparse
+import time
+
+from app import app
+from models import ChatMessage
+from intent_matcher import intent_matcher
+
+# Used when the chat_messages table is empty (fresh dev database)
+SAMPLE_MESSAGES = [
+    "hi", "hello there", "good morning", "show my fee details", "what is my attendance",
+    "attendance in data structures", "show my marks", "marks in operating system",
+    "list upcoming events", "show announcements", "what is the admission process",
+    "what is the cutoff for cse", "tell me about the hostel", "is there a college bus",
+    "placement record and average package", "scholarship for obc students",
+    "documents required for admission", "which branch is best for ai", "who made you",
+    "are you a bot", "can you help me", "this is it", "thanks bye", "how are you doing",
+]
+
+
+# Frozen copy of the keyword lists app.py's /chatbot chain checked before the
+# compiled matcher; do not sync it with INTENT_TABLE, it is the baseline
+LEGACY_KEYWORDS = [
+    ('goodbye', ['bye', 'goodbye', 'see you later', 'catch you later', 'talk to you soon', 'take care', 'see ya',
+                 'good night', 'bye smartedu', 'thanks bye', 'ok bye', 'bye for now']),
+    ('ask_howareyou', ['how are you', 'how are you doing', 'how\'s it going', 'how\'s your day', 'how have you been',
+                       'what\'s up smartedu', 'are you fine', 'you good']),
+    ('ask_whoareyou', ['who are you', 'what are you', 'tell me about yourself', 'what\'s your name',
+                       'introduce yourself', 'are you smartedu', 'who is smartedu', 'what is smartedu']),
+    ('ask_areyoubot', ['are you a bot', 'are you a robot', 'are you real', 'are you human', 'are you alive',
+                       'do you have feelings', 'are you ai', 'are you chatbot']),
+    ('ask_creator', ['who made you', 'who created you', 'who developed you', 'who built you', 'who designed you',
+                     'tell me your developer name', 'who is your owner']),
+    ('ask_help', ['can you help me', 'i need help', 'please help', 'what can you do', 'what services do you provide',
+                  'how can you help me', 'help me smartedu', 'anyone here', 'are you there', 'are you online',
+                  'smartedu can you assist me']),
+    ('greet', ['hi', 'hello', 'hey', 'heya', 'yo', 'hola', 'namaste', 'good morning', 'good afternoon',
+               'good evening', 'hello there', 'hi bot', 'hi smartedu', 'hello smartedu', 'hey smartedu',
+               'smartedu are you there']),
+    ('fee_query', ['fee', 'fees', 'payment', 'due', 'balance', 'show my fees', 'fee details', 'fee status']),
+    ('attendance_query', ['attendance', 'present', 'absent', 'percentage', 'attend', 'show my attendance',
+                          'attendance details']),
+    ('event_query', ['event', 'events', 'upcoming', 'schedule', 'seminar', 'workshop', 'fest', 'summit',
+                     'show events', 'list events']),
+    ('announcement_query', ['announcement', 'announcements', 'notification', 'notifications', 'show announcements']),
+    ('ask_admission', ['admission', 'admit', 'apply', 'application', 'eligibility', 'entrance', 'mht-cet', 'jee',
+                       'seat', 'intake']),
+    ('ask_cutoff', ['cutoff', 'merit', 'rank', 'percentile']),
+    ('ask_college_info', ['college', 'campus', 'about', 'info', 'information', 'skn', 'sinhgad', 'approved',
+                          'affiliated', 'established']),
+    ('ask_hostel', ['hostel', 'accommodation', 'boarding', 'room', 'mess', 'lodging']),
+    ('ask_transport', ['transport', 'bus', 'vehicle', 'commute', 'travel']),
+    ('ask_placement', ['placement', 'recruiter', 'package', 'salary', 'company', 'career']),
+    ('ask_scholarship', ['scholarship', 'financial aid', 'tfws', 'ebc', 'fee waiver']),
+    ('ask_documents', ['document', 'certificate', 'marksheet', 'id proof', 'aadhaar', 'caste']),
+    ('ask_guidance', ['guidance', 'suggest', 'which branch', 'best branch', 'change branch']),
+    ('student_info', ['profile', 'who am i', 'student id', 'roll number', 'department', 'class']),
+    ('marks_query', ['mark', 'marks', 'score', 'result', 'grade', 'academic', 'performance']),
+    ('help_query', ['help', 'what can you do', 'features', 'how to use', 'assistance']),
+]
+
+
+def legacy_match(msg):
+    """The pre-compiled behaviour: first intent with any phrase as a substring"""
+    for intent, phrases in LEGACY_KEYWORDS:
+        if any(phrase in msg for phrase in phrases):
+            return intent
+    return None
+
+
+def load_corpus(limit):
+    with app.app_context():
+        rows = ChatMessage.query.with_entities(ChatMessage.message).limit(limit).all()
+    messages = [row.message for row in rows if row.message]
+    if not messages:
+        print("chat_messages is empty - using the built-in sample corpus")
+        messages = SAMPLE_MESSAGES
+    return messages
+
+
+def time_per_message(func, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            func(message.lower())
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(messages)) * 1e6
+
+
+def benchmark_intent_matcher(limit, rounds):
+    messages = load_corpus(limit)
+    print("⏱️  Intent matcher microbenchmark")
+    print("=" * 60)
+    print(f"Corpus: {len(messages)} messages  |  Rounds: {rounds}\n")
+
+    legacy_us = time_per_message(legacy_match, messages, rounds)
+    compiled_us = time_per_message(intent_matcher.match, messages, rounds)
+    print(f"   Chained substring scan: {legacy_us:8.2f} µs/message")
+    print(f"   Compiled matcher:       {compiled_us:8.2f} µs/message")
+    print(f"   Speed-up:               {legacy_us / compiled_us:8.2f}x\n")
+
+    disagreements = []
+    for message in messages:
+        old, new = legacy_match(message.lower()), intent_matcher.match(message)
+        if old != new:
+            disagreements.append((message, old, new))
+    print(f"Messages classified differently: {len(disagreements)}")
+    for message, old, new in disagreements[:25]:
+        print(f"   '{message[:50]}': {old} -> {new}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=10000, help='max messages to load from chat_messages')
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+    benchmark_intent_matcher(args.limit, args.rounds)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Flash-crowd benchmark for event registration
+Creates a capacity-limited event and a batch of students, releases all
+registration requests at once from a thread pool through the real
+POST /api/events/<id>/register route, and checks that no seats were oversold,
+that current_participants matches the registration rows, and reports latency
+percentiles. --legacy replays the old count-then-insert logic for comparison.
+Writes its own rows (removed afterwards); use a scratch DATABASE_URL - MySQL
+for meaningful latency numbers. SQLite serializes all writers, so there tail
+latency is bounded by its 5 s busy timeout and requests beyond it fail with
+"database is locked".
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from app import app, db
+from auth import issue_token
+from models import User, Department, Class, Student, Event, EventRegistration
+
+
+def legacy_register(event_id, student_id):
+    """The old route body: COUNT, INSERT, COUNT again"""
+    with app.app_context():
+        try:
+            event = db.session.get(Event, event_id)
+            if event.max_participants:
+                if EventRegistration.query.filter_by(event_id=event_id).count() >= event.max_participants:
+                    return 400, None
+            db.session.add(EventRegistration(event_id=event_id, student_id=student_id, registered_at=datetime.utcnow()))
+            event.current_participants = EventRegistration.query.filter_by(event_id=event_id).count() + 1
+            db.session.commit()
+            return 201, None
+        except Exception as e:
+            db.session.rollback()
+            return 500, str(e)
+
+
+def create_fixture(requests, capacity):
+    tag = uuid.uuid4().hex[:8]
+    with app.app_context():
+        db.create_all()
+        department = Department(dept_name=f'Bench {tag}', dept_code=f'B{tag}')
+        db.session.add(department)
+        db.session.flush()
+        school_class = Class(dept_id=department.dept_id, class_name=f'Bench {tag}', class_code=f'B{tag}')
+        event = Event(title=f'Benchmark hackathon {tag}', event_date=date.today() + timedelta(days=30),
+                      event_type='hackathon', max_participants=capacity, current_participants=0)
+        db.session.add_all([school_class, event])
+        db.session.flush()
+        users = [User(name=f'Bench {n}', email=f'bench-{tag}-{n}@example.edu', password='x', role='student')
+                 for n in range(requests)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all([Student(user_id=user.user_id, roll_no=f'B{tag}{n:05d}', class_id=school_class.class_id,
+                                    admission_year=date.today().year) for n, user in enumerate(users)])
+        db.session.commit()
+        return event.event_id, department.dept_id, school_class.class_id, [user.user_id for user in users]
+
+
+def remove_fixture(event_id, dept_id, class_id, user_ids):
+    with app.app_context():
+        student_ids = [row.student_id for row in Student.query.filter(Student.user_id.in_(user_ids))]
+        EventRegistration.query.filter_by(event_id=event_id).delete()
+        Student.query.filter(Student.student_id.in_(student_ids)).delete(synchronize_session=False)
+        User.query.filter(User.user_id.in_(user_ids)).delete(synchronize_session=False)
+        Event.query.filter_by(event_id=event_id).delete()
+        Class.query.filter_by(class_id=class_id).delete()
+        Department.query.filter_by(dept_id=dept_id).delete()
+        db.session.commit()
+
+
+def run(requests, capacity, concurrency, legacy):
+    print("🎟️  Event registration flash-crowd benchmark")
+    print("=" * 60)
+    event_id, dept_id, class_id, user_ids = create_fixture(requests, capacity)
+    with app.app_context():
+        student_by_user = dict(db.session.query(Student.user_id, Student.student_id)
+                               .filter(Student.user_id.in_(user_ids)).all())
+    print(f"Mode: {'legacy count-then-insert' if legacy else 'conditional UPDATE'}  |  "
+          f"requests: {requests}  |  seats: {capacity}  |  threads: {concurrency}\n")
+
+    tokens = {user_id: issue_token(app, user_id) for user_id in user_ids}
+    start_gate = threading.Barrier(concurrency)
+
+    def register(user_id):
+        if user_id in first_wave:
+            start_gate.wait()
+        started = time.perf_counter()
+        if legacy:
+            status, error = legacy_register(event_id, student_by_user[user_id])
+        else:
+            response = app.test_client().post(f'/api/events/{event_id}/register',
+                                              headers={'Authorization': f'Bearer {tokens[user_id]}'})
+            status, error = response.status_code, response.get_json().get('error')
+        return status, error, (time.perf_counter() - started) * 1000
+
+    # The first `concurrency` requests are released together; the rest queue behind them
+    first_wave = set(user_ids[:concurrency])
+    try:
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(register, user_ids))
+        wall = time.perf_counter() - wall_start
+
+        with app.app_context():
+            rows = EventRegistration.query.filter_by(event_id=event_id).count()
+            counter = db.session.get(Event, event_id).current_participants
+
+        statuses = [status for status, _, _ in results]
+        errors = [error for status, error, _ in results if status not in (201, 400)]
+        latencies = sorted(ms for _, _, ms in results)
+        p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+        print(f"Accepted (201): {statuses.count(201)}   Full (400): {statuses.count(400)}   "
+              f"Errors: {len(errors)}")
+        if errors:
+            print(f"First error: {errors[0][:160]}")
+        print(f"Registration rows: {rows}   current_participants: {counter}   seats: {capacity}")
+        print(f"Oversold: {max(0, rows - capacity)}   Counter drift: {abs((counter or 0) - rows)}")
+        print(f"Latency ms  p50: {p(0.50):.1f}  p95: {p(0.95):.1f}  p99: {p(0.99):.1f}  "
+              f"max: {latencies[-1]:.1f}  mean: {statistics.mean(latencies):.1f}")
+        print(f"Throughput: {requests / wall:.0f} requests/s over {wall:.2f}s")
+    finally:
+        remove_fixture(event_id, dept_id, class_id, user_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000, help='students registering at once')
+    parser.add_argument('--capacity', type=int, default=100, help='max_participants of the event')
+    parser.add_argument('--concurrency', type=int, default=100, help='worker threads')
+    parser.add_argument('--legacy', action='store_true', help='replay the old count-then-insert logic')
+    args = parser.parse_args()
+    run(args.requests, args.capacity, min(args.concurrency, args.requests), args.legacy)
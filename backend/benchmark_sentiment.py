@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Compatibility and speed benchmark for the lexicon sentiment scorer
+Scores the messages stored in the chat_messages table (or a built-in sample of
+chat turns) with the lexicon engine and with TextBlob, and reports time per
+message, the polarity gap, label agreement and the worst disagreements.
+Exits non-zero when fewer than --min-agreement of the messages are within
+--tolerance of TextBlob's polarity or get the same label. Deliberate
+differences (the lexicon engine negates "wasn't good", TextBlob does not) show
+up in the disagreement list. Needs TextBlob installed.
+"""
+
+import argparse
+import sys
+import time
+
+from sentiment import LexiconSentiment, TextBlobSentiment
+
+# Used when the chat_messages table is empty (fresh dev database)
+SAMPLE_MESSAGES = [
+    "hi", "hello there", "good morning", "thanks, that was really helpful!", "you are awesome :)",
+    "show my fee details", "what is my attendance", "my attendance is very low, I am worried",
+    "I am really upset, my fees are terrible", "why are my marks so bad", "this is not a good result",
+    "the results are not bad at all", "I failed in data structures :(", "I passed with great marks!!",
+    "the hostel food is horrible", "the campus is beautiful and the staff are friendly",
+    "the bus was late again, very annoying", "I never get a reply from the office",
+    "no one is helping me with the scholarship", "is there a college bus", "list upcoming events",
+    "the workshop was amazing, thank you", "I'm so stressed about the exams", "this is it",
+    "the app keeps crashing, it's useless", "what is the cutoff for cse", "I love the new library",
+    "the placement drive was disappointing", "can you help me please", "not happy with the canteen",
+    "absolutely terrible experience with the admission process", "good job on the fest!",
+    "I'm confused about my timetable", "the lab equipment is old and broken", "nice, thanks bye",
+    "really not good", "that wasn't good", "my marks are okay i guess", "fees are too high for poor students",
+    "the teachers are very supportive", "I hate waiting in long queues (!)",
+]
+
+
+def load_corpus(limit):
+    from app import app
+    from models import ChatMessage
+
+    with app.app_context():
+        rows = ChatMessage.query.with_entities(ChatMessage.message).limit(limit).all()
+    messages = [row.message for row in rows if row.message]
+    if not messages:
+        print("chat_messages is empty - using the built-in sample corpus")
+        messages = SAMPLE_MESSAGES
+    return messages
+
+
+def time_per_message(engine, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        engine.polarities(messages)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(messages)) * 1e6
+
+
+def benchmark_sentiment(messages, rounds, tolerance, min_agreement):
+    print("⏱️  Sentiment engine benchmark")
+    print("=" * 60)
+    print(f"Corpus: {len(messages)} messages  |  Rounds: {rounds}\n")
+
+    start = time.perf_counter()
+    lexicon = LexiconSentiment()
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    reference = TextBlobSentiment()
+    reference.polarities(['warm up'])
+    reference_load_ms = (time.perf_counter() - start) * 1000
+
+    lexicon_us = time_per_message(lexicon, messages, rounds)
+    reference_us = time_per_message(reference, messages, rounds)
+    print(f"{'engine':<10} {'load ms':>10} {'µs/message':>12}")
+    print(f"{'lexicon':<10} {load_ms:>10.1f} {lexicon_us:>12.1f}")
+    print(f"{'textblob':<10} {reference_load_ms:>10.1f} {reference_us:>12.1f}")
+    print(f"Speedup: {reference_us / lexicon_us:.1f}x\n")
+
+    ours = lexicon.score_batch(messages)
+    theirs = reference.score_batch(messages)
+    gaps = sorted(((abs(a['polarity'] - b['polarity']), message, a, b)
+                   for message, a, b in zip(messages, ours, theirs)), key=lambda gap: -gap[0])
+    agreement = sum(a['sentiment'] == b['sentiment'] for a, b in zip(ours, theirs)) / len(messages)
+    within = sum(gap <= tolerance for gap, *_ in gaps)
+    print(f"Polarity gap  mean: {sum(gap for gap, *_ in gaps) / len(gaps):.4f}  max: {gaps[0][0]:.4f}  "
+          f"within ±{tolerance}: {within}/{len(gaps)}")
+    print(f"Label agreement: {agreement:.1%}")
+    for gap, message, a, b in gaps:
+        if gap <= tolerance and a['sentiment'] == b['sentiment']:
+            break
+        print(f"  Δ{gap:.3f}  lexicon {a['polarity']:+.3f} {a['sentiment']:<8}  "
+              f"textblob {b['polarity']:+.3f} {b['sentiment']:<8}  {message[:60]!r}")
+
+    passed = within / len(gaps) >= min_agreement and agreement >= min_agreement
+    print(f"\n{'✅ Within tolerance' if passed else '❌ Outside tolerance'}")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--limit', type=int, default=5000, help='chat messages to load from the database')
+    parser.add_argument('--rounds', type=int, default=50, help='passes over the corpus per engine')
+    parser.add_argument('--tolerance', type=float, default=0.05, help='max allowed polarity difference')
+    parser.add_argument('--min-agreement', type=float, default=0.95,
+                        help='min fraction of messages within tolerance and with matching labels')
+    parser.add_argument('--sample', action='store_true', help='use the built-in corpus, not the database')
+    args = parser.parse_args()
+    corpus = SAMPLE_MESSAGES if args.sample else load_corpus(args.limit)
+    sys.exit(0 if benchmark_sentiment(corpus, args.rounds, args.tolerance, args.min_agreement) else 1)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Compile data/sentiment_lexicon.json for the lexicon sentiment scorer
+Reads the pattern lexicon bundled with TextBlob (en-sentiment.xml, with the
+derived "-ly" adverbs TextBlob adds on load) and writes one flat entry per
+word form - [polarity, intensity, is_modifier] - plus the emoticon table, so
+sentiment.py can score chat messages without importing TextBlob or NLTK.
+Only needs TextBlob when the lexicon is rebuilt.
+"""
+
+import argparse
+import json
+import os
+
+from sentiment import LEXICON_PATH
+
+
+def build_lexicon(path):
+    from textblob import en
+    from textblob._text import EMOTICONS
+
+    en.sentiment.load()
+    words = {}
+    for form, senses in dict.items(en.sentiment):
+        polarity, _, intensity = senses[None]
+        words[form] = [round(polarity, 4), round(intensity, 4), int('RB' in senses)]
+    emoticons = {emoticon.lower(): polarity for (_, polarity), faces in EMOTICONS.items() for emoticon in faces}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'source': 'pattern en-sentiment.xml (TextBlob)', 'words': words, 'emoticons': emoticons},
+                  f, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return len(words), len(emoticons)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=LEXICON_PATH, help='where to write the compiled lexicon')
+    args = parser.parse_args()
+    print("📚 Compiling sentiment lexicon")
+    print("=" * 60)
+    word_count, emoticon_count = build_lexicon(args.output)
+    print(f"✅ {word_count} words and {emoticon_count} emoticons written to {args.output}")
@@ -0,0 +1,162 @@
+"""
+Write-behind persistence for chat turns.
+
+/chat used to INSERT its ChatMessage and commit before replying. Turns are
+now queued to a background thread that inserts them in batches - every
+CHAT_WRITE_BATCH_SIZE rows or CHAT_WRITE_FLUSH_MS milliseconds, whichever
+comes first - as one executemany per batch. If a batch insert fails, its
+rows are retried one at a time, so a bad row only loses itself.
+
+Rows get their ids when the batch is written, so /chat replies with
+message_id null; the turn shows up in GET /api/chat/<user_id> once flushed.
+
+The queue is bounded. When it is full a request waits up to
+CHAT_WRITE_ENQUEUE_TIMEOUT_MS for room and then writes its own row
+synchronously, so overload slows requests down instead of losing history.
+The queue is drained when the process exits. metrics() reports depth,
+throughput and how often that backpressure kicked in.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from models import db, ChatMessage
+
+# Every queued row carries exactly these keys so a batch is one executemany
+CHAT_ROW_FIELDS = ('user_id', 'message', 'response', 'intent', 'confidence', 'sentiment_polarity',
+                   'sentiment_label', 'has_empathetic_prefix', 'timestamp')
+
+
+class ChatWriteBehind:
+    def __init__(self):
+        self._app = None
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=1000)
+        self.batch_size = 50
+        self.flush_interval = 0.2
+        self.enqueue_timeout = 0.05
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0, 'written': 0, 'batches': 0, 'batch_retries': 0, 'failed': 0, 'sync_writes': 0,
+            'max_depth': 0, 'last_batch_size': 0, 'last_flush_ms': 0.0
+        }
+
+    def init_app(self, app):
+        self._app = app
+        self._queue = queue.Queue(maxsize=int(os.getenv('CHAT_WRITE_QUEUE_SIZE', '1000')))
+        self.batch_size = int(os.getenv('CHAT_WRITE_BATCH_SIZE', '50'))
+        self.flush_interval = int(os.getenv('CHAT_WRITE_FLUSH_MS', '200')) / 1000
+        self.enqueue_timeout = int(os.getenv('CHAT_WRITE_ENQUEUE_TIMEOUT_MS', '50')) / 1000
+        atexit.register(self.shutdown)
+
+    def submit(self, **fields):
+        """Queue one chat turn for insertion; returns the row as queued"""
+        row = {name: fields.get(name) for name in CHAT_ROW_FIELDS}
+        row['timestamp'] = row['timestamp'] or datetime.utcnow()
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Backpressure: the writer is behind, so this request pays for its own insert
+            self._count('sync_writes')
+            self._write([row])
+            return row
+        self._count('enqueued')
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats['max_depth'] = max(self._stats['max_depth'], depth)
+        return row
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'batch_size': self.batch_size,
+            'flush_interval_ms': int(self.flush_interval * 1000),
+            'running': self._thread is not None and self._thread.is_alive()
+        })
+        return stats
+
+    def shutdown(self, timeout: float = 10.0):
+        """Let the writer drain everything still queued, then stop it"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_started(self):
+        # Started on first use, so forking servers start it in each worker
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='chat-write-behind', daemon=True)
+                self._thread.start()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        with self._app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(ChatMessage.__table__.insert(), rows)
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        written = len(rows)
+        try:
+            self._insert(rows)
+        except Exception as e:
+            if len(rows) == 1:
+                print(f"Error writing chat message for user {rows[0]['user_id']}: {e}")
+                self._count('failed')
+                return
+            # One bad row (e.g. an unknown user_id) must not take the whole batch with it
+            print(f"Batch of {len(rows)} chat messages failed ({e}); retrying row by row")
+            self._count('batch_retries')
+            written = 0
+            for row in rows:
+                try:
+                    self._insert([row])
+                    written += 1
+                except Exception as row_error:
+                    print(f"Error writing chat message for user {row['user_id']}: {row_error}")
+                    self._count('failed')
+        with self._stats_lock:
+            self._stats['written'] += written
+            self._stats['batches'] += 1
+            self._stats['last_batch_size'] = len(rows)
+            self._stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+
+chat_log = ChatWriteBehind()
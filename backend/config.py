@@ -14,6 +14,38 @@ def _build_mysql_uri_from_env() -> str:
     return ''
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _build_engine_options_from_env(uri: str) -> dict:
+    """Connection pool settings for server databases.
+    Defaults keep connections younger than MySQL's wait_timeout and ping them
+    on checkout, so a pooled connection the server dropped overnight is
+    replaced instead of failing the request.
+    """
+    if uri.startswith('sqlite'):
+        # SQLite uses a file/thread pool that takes none of these arguments
+        return {}
+    options = {
+        'pool_size': _env_int('DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 280),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+    }
+    # Per-statement cap for SELECTs (MySQL MAX_EXECUTION_TIME, in ms); 0 disables it
+    statement_timeout_ms = _env_int('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout_ms > 0 and uri.startswith('mysql+pymysql'):
+        options['connect_args'] = {
+            'init_command': f'SET SESSION MAX_EXECUTION_TIME={statement_timeout_ms}'
+        }
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     # Priority: DATABASE_URL -> MYSQL_* -> fallback sqlite (dev-friendly)
@@ -21,6 +53,7 @@ class Config:
     if not _db_url:
         _db_url = 'sqlite:///instance/smartedu.db'
     SQLALCHEMY_DATABASE_URI = _db_url
+    SQLALCHEMY_ENGINE_OPTIONS = _build_engine_options_from_env(_db_url)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 
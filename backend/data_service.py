@@ -0,0 +1,297 @@
+"""
+In-process student data queries shared by the REST handlers and the chatbot.
+
+The chatbot used to fetch this data by calling its own server over HTTP, which
+holds one worker while it waits on another. These helpers return the same
+JSON-ready structures the REST endpoints serve, without the round trip.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from datetime import date
+
+from models import db, User, Class, Subject, Student, Mark, Attendance, Fee, Notification, Event, EventRegistration
+from pagination import keyset_page
+
+# Newest first; notification_id breaks ties between rows created in the same instant
+NOTIFICATION_ORDER = ((Notification.created_at, True), (Notification.notification_id, True))
+# Class roll-ups page through students by id
+ROSTER_ORDER = ((Student.student_id, False),)
+
+
+def fetch_student_marks(student_id: int, subject_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Marks for a student with subject name, code and credits attached"""
+    query = (
+        db.session.query(Mark, Subject)
+        .outerjoin(Subject, Subject.subject_id == Mark.subject_id)
+        .filter(Mark.student_id == student_id)
+    )
+    if subject_id:
+        query = query.filter(Mark.subject_id == subject_id)
+
+    marks_data = []
+    for mark, subject in query.order_by(Mark.mark_id).all():
+        mark_dict = mark.to_dict()
+        if subject:
+            mark_dict['subject_name'] = subject.subject_name
+            mark_dict['subject_code'] = subject.subject_code
+            mark_dict['credits'] = subject.credits
+        marks_data.append(mark_dict)
+    return marks_data
+
+
+def fetch_student_fees(student_id: int) -> Optional[Dict[str, Any]]:
+    """Fee record for a student, or None if there is none"""
+    fee = Fee.query.filter_by(student_id=student_id).first()
+    return fee.to_dict() if fee else None
+
+
+def fetch_attendance_summary(student_id: int) -> List[Dict[str, Any]]:
+    """Aggregated per-subject attendance counts for a student"""
+    rows = (
+        db.session.query(Attendance, Subject)
+        .join(Subject, Subject.subject_id == Attendance.subject_id)
+        .filter(Attendance.student_id == student_id)
+        .order_by(Attendance.attendance_id)
+        .all()
+    )
+    return [
+        {
+            'attendance_id': summary.attendance_id,
+            'subject_id': subject.subject_id,
+            'subject_name': subject.subject_name,
+            'subject_code': subject.subject_code,
+            'present_count': summary.present_count,
+            'absent_count': summary.absent_count,
+            'late_count': summary.late_count,
+            'total_classes': summary.total_classes,
+            'attendance_percentage': float(summary.attendance_percentage),
+            'academic_year': summary.academic_year
+        }
+        for summary, subject in rows
+    ]
+
+
+def fetch_user_notifications(user_id: int, unread_only: bool = False) -> List[Dict[str, Any]]:
+    """Notifications for a user, newest first"""
+    query = Notification.query.filter_by(user_id=user_id)
+    if unread_only:
+        query = query.filter_by(is_read=False)
+    notifications = query.order_by(Notification.created_at.desc()).all()
+    return [notif.to_dict() for notif in notifications]
+
+
+def fetch_user_notifications_page(user_id: int, unread_only: bool = False, limit: Optional[int] = None,
+                                  after: Optional[str] = None):
+    """One keyset page of a user's notifications, newest first. Returns (notifications, next cursor)."""
+    query = Notification.query.filter_by(user_id=user_id)
+    if unread_only:
+        query = query.filter_by(is_read=False)
+    notifications, next_cursor = keyset_page(query, NOTIFICATION_ORDER, limit, after)
+    return [notif.to_dict() for notif in notifications], next_cursor
+
+
+def fetch_student_registrations(student_id: int, upcoming_only: bool = False) -> List[Dict[str, Any]]:
+    """A student's event registrations with event details, by event date, in one joined query"""
+    query = (
+        db.session.query(EventRegistration.registration_id, EventRegistration.event_id,
+                         EventRegistration.registered_at, Event.title, Event.event_date,
+                         Event.event_time, Event.location)
+        .join(Event, Event.event_id == EventRegistration.event_id)
+        .filter(EventRegistration.student_id == student_id)
+    )
+    if upcoming_only:
+        query = query.filter(Event.event_date >= date.today())
+    rows = query.order_by(Event.event_date, Event.event_id).all()
+    return [
+        {
+            'id': row.registration_id,
+            'event_id': row.event_id,
+            'title': row.title,
+            'event_date': row.event_date.isoformat(),
+            'event_time': row.event_time.isoformat() if row.event_time else None,
+            'location': row.location,
+            'registered_at': row.registered_at.isoformat()
+        }
+        for row in rows
+    ]
+
+
+# ---------- Class-level roll-ups for Student Services ----------
+def _fetch_roster(class_id: Optional[int] = None, limit: Optional[int] = None,
+                  after: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """One keyset page of students with their name and class, ordered by student_id.
+    Returns (roster, next cursor).
+    """
+    query = (
+        db.session.query(Student.student_id, Student.roll_no, Student.class_id,
+                         User.name, Class.class_name)
+        .join(Class, Class.class_id == Student.class_id)
+        .join(User, User.user_id == Student.user_id)
+    )
+    if class_id:
+        query = query.filter(Student.class_id == class_id)
+    return keyset_page(query, ROSTER_ORDER, limit, after)
+
+
+def _scope_to_page(query, student_column, roster: List[Any], class_id: Optional[int] = None):
+    """Restrict a child-table query to the student id range (and class) of a roster page"""
+    query = query.filter(student_column.between(roster[0].student_id, roster[-1].student_id))
+    if class_id:
+        query = query.join(Student, Student.student_id == student_column).filter(Student.class_id == class_id)
+    return query
+
+
+def _group_by_class(roster: List[Any], build_row) -> List[Dict[str, Any]]:
+    """Group per-student rows under their class, keeping first-seen class order"""
+    class_data: Dict[str, Dict[str, Any]] = {}
+    for student in roster:
+        if student.class_name not in class_data:
+            class_data[student.class_name] = {
+                'class_name': student.class_name,
+                'students': []
+            }
+        class_data[student.class_name]['students'].append(build_row(student))
+    return list(class_data.values())
+
+
+def fetch_class_marks(class_id: Optional[int] = None, limit: Optional[int] = None,
+                      after: Optional[str] = None):
+    """Marks pivoted into sub1..sub5 columns per student, grouped by class.
+
+    Runs three queries per page (roster, subjects, marks) regardless of how
+    many students are on it. Returns (class groups, next cursor).
+    """
+    roster, next_cursor = _fetch_roster(class_id, limit, after)
+    if not roster:
+        return [], None
+    class_ids = {student.class_id for student in roster}
+
+    # First five subjects of each class define its sub1..sub5 columns
+    class_subjects: Dict[int, List[Any]] = {cid: [] for cid in class_ids}
+    subject_rows = (
+        db.session.query(Subject.subject_id, Subject.class_id, Subject.subject_name)
+        .filter(Subject.class_id.in_(class_ids))
+        .order_by(Subject.subject_id)
+        .all()
+    )
+    for subject in subject_rows:
+        if len(class_subjects[subject.class_id]) < 5:
+            class_subjects[subject.class_id].append(subject)
+
+    marks_map: Dict[Any, int] = {}
+    mark_rows = _scope_to_page(
+        db.session.query(Mark.student_id, Mark.subject_id, Mark.obtained_marks),
+        Mark.student_id, roster, class_id
+    ).order_by(Mark.mark_id).all()
+    for mark in mark_rows:
+        marks_map[(mark.student_id, mark.subject_id)] = mark.obtained_marks
+
+    def build_row(student):
+        subjects = class_subjects[student.class_id]
+        student_marks = {
+            'roll_number': student.roll_no,
+            'name': student.name,
+            'sub1': 0, 'sub2': 0, 'sub3': 0, 'sub4': 0, 'sub5': 0,
+            'total': 0,
+            'percentage': 0.0
+        }
+        for idx, subject in enumerate(subjects):
+            student_marks[f'sub{idx + 1}_name'] = subject.subject_name
+            student_marks[f'sub{idx + 1}'] = marks_map.get((student.student_id, subject.subject_id), 0)
+        for idx in range(len(subjects), 5):
+            student_marks[f'sub{idx + 1}_name'] = f'Subject {idx + 1}'
+            student_marks[f'sub{idx + 1}'] = 0
+
+        student_marks['total'] = sum(student_marks[f'sub{n}'] for n in range(1, 6))
+        # Max marks per subject is 35
+        max_total = len(subjects) * 35
+        if max_total > 0:
+            student_marks['percentage'] = round((student_marks['total'] / max_total) * 100, 1)
+        return student_marks
+
+    return _group_by_class(roster, build_row), next_cursor
+
+
+def fetch_class_attendance(class_id: Optional[int] = None, limit: Optional[int] = None,
+                           after: Optional[str] = None):
+    """Attendance present counts in sub1..sub5 columns per student, grouped by class.
+
+    Returns (class groups, next cursor).
+    """
+    roster, next_cursor = _fetch_roster(class_id, limit, after)
+    if not roster:
+        return [], None
+
+    # First five attendance rows of each student, with subject names joined in
+    student_records: Dict[int, List[Any]] = {}
+    attendance_rows = _scope_to_page(
+        db.session.query(Attendance.student_id, Attendance.present_count, Subject.subject_name)
+        .outerjoin(Subject, Subject.subject_id == Attendance.subject_id),
+        Attendance.student_id, roster, class_id
+    ).order_by(Attendance.attendance_id).all()
+    for record in attendance_rows:
+        records = student_records.setdefault(record.student_id, [])
+        if len(records) < 5:
+            records.append(record)
+
+    def build_row(student):
+        student_attendance = {
+            'roll_number': student.roll_no,
+            'name': student.name,
+            'sub1': 0, 'sub2': 0, 'sub3': 0, 'sub4': 0, 'sub5': 0,
+            'total': 0,
+            'total_percentage': 0.0,
+            'is_defaulter': False
+        }
+        records = student_records.get(student.student_id, [])
+        total_present = 0
+        for idx, record in enumerate(records):
+            student_attendance[f'sub{idx + 1}'] = record.present_count
+            if record.subject_name is not None:
+                student_attendance[f'sub{idx + 1}_name'] = record.subject_name
+            total_present += record.present_count
+        student_attendance['total'] = total_present
+
+        # Assumes 50 lectures per subject
+        max_total = len(records) * 50
+        if max_total > 0:
+            total_percentage = (total_present / max_total) * 100
+            student_attendance['total_percentage'] = round(total_percentage, 1)
+            student_attendance['is_defaulter'] = total_percentage < 75.0
+        return student_attendance
+
+    return _group_by_class(roster, build_row), next_cursor
+
+
+def fetch_class_fees(class_id: Optional[int] = None, limit: Optional[int] = None,
+                     after: Optional[str] = None):
+    """Fee totals per student, grouped by class. Returns (class groups, next cursor)."""
+    roster, next_cursor = _fetch_roster(class_id, limit, after)
+    if not roster:
+        return [], None
+
+    fee_rows = _scope_to_page(
+        db.session.query(Fee.student_id, Fee.total_amount, Fee.paid_amount,
+                         Fee.due_amount, Fee.payment_status),
+        Fee.student_id, roster, class_id
+    ).all()
+    fees_by_student = {fee.student_id: fee for fee in fee_rows}
+
+    def build_row(student):
+        student_fees = {
+            'roll_number': student.roll_no,
+            'name': student.name,
+            'total_fees': 0,
+            'paid_fees': 0,
+            'remaining_fees': 0,
+            'payment_status': 'Unpaid'
+        }
+        fees = fees_by_student.get(student.student_id)
+        if fees:
+            student_fees['total_fees'] = float(fees.total_amount)
+            student_fees['paid_fees'] = float(fees.paid_amount)
+            student_fees['remaining_fees'] = float(fees.due_amount)
+            student_fees['payment_status'] = fees.payment_status
+        return student_fees
+
+    return _group_by_class(roster, build_row), next_cursor
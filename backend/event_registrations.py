@@ -0,0 +1,279 @@
+"""
+Seat reservation for event registration.
+
+Registering used to COUNT the event's registrations, insert, and COUNT again,
+so concurrent requests could all pass the capacity check and oversell the
+event. A registration now reserves its seat with one conditional UPDATE:
+
+    UPDATE events SET current_participants = current_participants + 1
+    WHERE event_id = :id AND (max_participants IS NULL OR current_participants < max_participants)
+
+The UPDATE both checks and takes the seat, and the row lock it holds until
+commit serializes registrations for the same event. events.current_participants
+is the source of truth for seats taken. A plain read rejects requests for an
+event that is already full before they contend for the lock.
+
+The unique (event_id, student_id) index rejects duplicate registrations. A
+duplicate rolls back the transaction, and the seat with it. The seat is
+reserved before the registration row is inserted. Inserting first would take
+a shared lock on the event row through the foreign key, and concurrent
+registrations could then deadlock when each upgrades to the UPDATE's
+exclusive lock.
+
+Students who find an event full join its waitlist, an ordered queue per
+event, instead of retrying. A cancellation hands its seat straight to the
+head of the queue in the same transaction, so the seat never appears free to
+anyone else, and the promoted student is notified. A queued student who
+already holds a seat is dropped from the queue and the next one promoted.
+Every path that touches the waitlist locks the event row first
+(event -> registrations -> waitlist), so cancellations, registrations and
+enqueues on one event never deadlock.
+
+The set of event ids each student is registered for is cached per process
+(invalidated on every change this module commits) so event listings can mark
+'Registered' without a query per request.
+"""
+import os
+from datetime import datetime
+from typing import FrozenSet, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Event, EventRegistration, EventWaitlist, Student, Notification
+from ttl_cache import TTLCache
+
+events = Event.__table__
+registrations = EventRegistration.__table__
+waitlist = EventWaitlist.__table__
+
+# student_id -> frozenset of registered event ids
+registered_events_cache = TTLCache(
+    maxsize=int(os.getenv('REGISTERED_EVENTS_CACHE_SIZE', '4096')),
+    ttl_seconds=float(os.getenv('REGISTERED_EVENTS_CACHE_TTL_SECONDS', '60'))
+)
+
+
+class RegistrationError(Exception):
+    """A registration request that cannot be honoured; carries the HTTP status"""
+    status = 400
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class EventNotFound(RegistrationError):
+    status = 404
+
+
+class EventFull(RegistrationError):
+    pass
+
+
+class AlreadyRegistered(RegistrationError):
+    pass
+
+
+class RegistrationNotFound(RegistrationError):
+    status = 404
+
+
+def registered_event_ids(student_id: int) -> FrozenSet[int]:
+    """Ids of the events a student holds a seat for, from the cache or one index scan"""
+    event_ids = registered_events_cache.get(student_id)
+    if event_ids is None:
+        event_ids = frozenset(db.session.execute(
+            select(registrations.c.event_id).where(registrations.c.student_id == student_id)
+        ).scalars())
+        registered_events_cache.put(student_id, event_ids)
+    return event_ids
+
+
+def _seats_taken():
+    return func.coalesce(events.c.current_participants, 0)
+
+
+def _raise_full(event_id: int, student_id: int):
+    # A student already holding a seat is told so rather than that the event is full
+    registered = db.session.execute(
+        select(registrations.c.registration_id)
+        .where(and_(registrations.c.event_id == event_id, registrations.c.student_id == student_id))
+    ).first()
+    db.session.rollback()
+    if registered is not None:
+        raise AlreadyRegistered('Already registered for this event')
+    raise EventFull('Event is full')
+
+
+def register_student(event_id: int, student_id: int) -> EventRegistration:
+    """Reserve a seat and record the registration in one transaction (committed here)"""
+    # Lock-free pre-check: once an event sells out, rejections never queue on its row lock
+    seats = db.session.execute(
+        select(events.c.max_participants, _seats_taken()).where(events.c.event_id == event_id)
+    ).first()
+    if seats is None:
+        db.session.rollback()
+        raise EventNotFound('Event not found')
+    max_participants, taken = seats
+    if max_participants is not None and taken >= max_participants:
+        _raise_full(event_id, student_id)
+
+    reserved = db.session.execute(
+        update(events)
+        .where(events.c.event_id == event_id)
+        .where(or_(events.c.max_participants.is_(None), _seats_taken() < events.c.max_participants))
+        .values(current_participants=_seats_taken() + 1)
+    ).rowcount
+    if not reserved:
+        # The last seats went between the pre-check and the UPDATE
+        _raise_full(event_id, student_id)
+
+    registration = EventRegistration(event_id=event_id, student_id=student_id, registered_at=datetime.utcnow())
+    db.session.add(registration)
+    # Someone who got a seat directly no longer needs their place in the queue
+    db.session.execute(waitlist.delete().where(_waitlist_entry(event_id, student_id)))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise AlreadyRegistered('Already registered for this event')
+    registered_events_cache.invalidate(student_id)
+    return registration
+
+
+def _lock_event(event_id: int):
+    """(title, max_participants, seats taken) with the event row locked until commit"""
+    return db.session.execute(
+        select(events.c.title, events.c.max_participants, _seats_taken())
+        .where(events.c.event_id == event_id)
+        .with_for_update()
+    ).first()
+
+
+def _waitlist_entry(event_id: int, student_id: int):
+    return and_(waitlist.c.event_id == event_id, waitlist.c.student_id == student_id)
+
+
+def waitlist_position(event_id: int, student_id: int) -> Optional[int]:
+    """1-based place in the event's queue, or None if the student is not on it"""
+    entry = db.session.execute(select(waitlist.c.waitlist_id).where(_waitlist_entry(event_id, student_id))).scalar()
+    if entry is None:
+        return None
+    return db.session.execute(
+        select(func.count()).select_from(waitlist)
+        .where(and_(waitlist.c.event_id == event_id, waitlist.c.waitlist_id <= entry))
+    ).scalar()
+
+
+def join_waitlist(event_id: int, student_id: int) -> Optional[int]:
+    """Queue a student for a full event and return their position (committed here).
+
+    Returns None if a seat has opened since the caller saw the event full;
+    the caller should then register instead.
+    """
+    event = _lock_event(event_id)
+    if event is None:
+        db.session.rollback()
+        raise EventNotFound('Event not found')
+    _, max_participants, taken = event
+    if max_participants is None or taken < max_participants:
+        db.session.rollback()
+        return None
+    db.session.add(EventWaitlist(event_id=event_id, student_id=student_id, joined_at=datetime.utcnow()))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Already queued - joining again keeps the original place
+        db.session.rollback()
+    return waitlist_position(event_id, student_id)
+
+
+def leave_waitlist(event_id: int, student_id: int) -> bool:
+    """Drop a student's place in the queue (committed here); False if they were not queued"""
+    removed = db.session.execute(waitlist.delete().where(_waitlist_entry(event_id, student_id))).rowcount
+    db.session.commit()
+    return bool(removed)
+
+
+def _promote_head(event_id: int, title: str) -> Optional[int]:
+    """Give a freed seat to the first student in the queue; returns their student_id"""
+    while True:
+        head = db.session.execute(
+            select(waitlist.c.waitlist_id, waitlist.c.student_id)
+            .where(waitlist.c.event_id == event_id)
+            .order_by(waitlist.c.waitlist_id)
+            .limit(1)
+        ).first()
+        if head is None:
+            return None
+        db.session.execute(waitlist.delete().where(waitlist.c.waitlist_id == head.waitlist_id))
+        try:
+            # Savepoint: a head entry that already holds a seat only undoes its own insert
+            with db.session.begin_nested():
+                db.session.execute(registrations.insert().values(event_id=event_id, student_id=head.student_id,
+                                                                 registered_at=datetime.utcnow()))
+        except IntegrityError:
+            # Registered by some other path while still queued - drop the stale entry, try the next one
+            continue
+        break
+    user_id = db.session.execute(select(Student.user_id).where(Student.student_id == head.student_id)).scalar()
+    if user_id is not None:
+        # Added through the ORM so the SSE push and unread counter pick it up
+        db.session.add(Notification(
+            user_id=user_id,
+            title=f'Registered for {title}',
+            message=f'A seat opened up for {title} and you have been moved from the waitlist to the participant list.',
+            type='success'
+        ))
+    return head.student_id
+
+
+def clear_waitlist(event_id: int) -> int:
+    """Delete an event's whole queue in the caller's transaction (not committed); returns the rows removed"""
+    return db.session.execute(waitlist.delete().where(waitlist.c.event_id == event_id)).rowcount
+
+
+def cancel_registration(event_id: int, student_id: int) -> Optional[int]:
+    """Delete a registration and pass its seat to the waitlist, or release it (committed here).
+
+    Returns the promoted student's id, or None if nobody was waiting.
+    """
+    event = _lock_event(event_id)
+    deleted = db.session.execute(
+        registrations.delete().where(and_(registrations.c.event_id == event_id,
+                                          registrations.c.student_id == student_id))
+    ).rowcount
+    if event is None or not deleted:
+        db.session.rollback()
+        raise RegistrationNotFound('Registration not found')
+
+    promoted = _promote_head(event_id, event.title)
+    if promoted is None:
+        db.session.execute(
+            update(events)
+            .where(events.c.event_id == event_id)
+            .where(_seats_taken() > 0)
+            .values(current_participants=_seats_taken() - 1)
+        )
+    db.session.commit()
+    registered_events_cache.invalidate(student_id)
+    if promoted is not None:
+        registered_events_cache.invalidate(promoted)
+    return promoted
+
+
+def reconcile_participant_counts() -> int:
+    """Recompute current_participants from event_registrations; returns how many events were repaired"""
+    actual = (
+        select(func.count(registrations.c.registration_id))
+        .where(registrations.c.event_id == events.c.event_id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(events)
+        .where(func.coalesce(events.c.current_participants, -1) != actual)
+        .values(current_participants=actual)
+    )
+    db.session.commit()
+    return result.rowcount
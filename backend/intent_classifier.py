@@ -0,0 +1,204 @@
+"""
+Embedded intent classifier trained on the Rasa NLU data.
+
+Trains on the examples rasa_training.py writes to data/nlu.yml plus every
+phrase of the keyword intent table (intent_matcher.INTENT_TABLE), so /chat
+can resolve intents in-process instead of calling the Rasa server.
+
+- Features: each message becomes hashed word unigrams and bigrams plus
+  character trigrams (which tolerate typos) in N_FEATURES buckets, then
+  L2-normalized.
+- Model: softmax regression, fitted with NumPy full-batch gradient
+  descent.
+- Storage: running this module (a build step) saves the weights to
+  INTENT_MODEL_PATH (.npz), which is loaded once per process. When the
+  file is missing, each process trains the model in memory on first use
+  (a fraction of a second) - nothing is written at request time, so a
+  read-only deploy works.
+
+A prediction below INTENT_CONFIDENCE_THRESHOLD returns FALLBACK_INTENT,
+the same intent RasaService falls back to. This classifier does not
+extract entities.
+
+Run this module to retrain and save the model.
+"""
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NLU_PATH = os.path.join(BASE_DIR, 'data', 'nlu.yml')
+# Relative paths are resolved against backend/; the default models/ is git-ignored
+MODEL_PATH = os.path.join(BASE_DIR, os.getenv('INTENT_MODEL_PATH', os.path.join('models', 'intent_classifier.npz')))
+
+N_FEATURES = 2 ** 12
+FALLBACK_INTENT = 'help_request'
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def parse_nlu_yml(text: str) -> List[Tuple[str, str]]:
+    """(example, intent) pairs from Rasa's nlu.yml format (intent + '- ' example lines)"""
+    examples = []
+    intent = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('- intent:'):
+            intent = stripped.split(':', 1)[1].strip()
+        elif intent and stripped.startswith('- ') and line.startswith('    '):
+            examples.append((stripped[2:].strip(), intent))
+        elif not line.startswith(' ') and not stripped.startswith('- intent:'):
+            intent = None
+    return examples
+
+
+def intent_table_examples() -> List[Tuple[str, str]]:
+    """(phrase, intent) pairs from the keyword matcher's table; a phrase listed twice keeps its first intent"""
+    from intent_matcher import INTENT_TABLE
+    examples = {}
+    for intent, phrases in INTENT_TABLE:
+        for phrase in phrases:
+            examples.setdefault(phrase, intent)
+    return list(examples.items())
+
+
+def load_training_examples(path: str = NLU_PATH) -> List[Tuple[str, str]]:
+    """Examples from data/nlu.yml (or the data rasa_training.py would write there) plus the intent table's phrases"""
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            examples = parse_nlu_yml(f.read())
+    else:
+        from rasa_training import NLU_YML
+        examples = parse_nlu_yml(NLU_YML)
+    seen = {text for text, _ in examples}
+    return examples + [(text, intent) for text, intent in intent_table_examples() if text not in seen]
+
+
+def _bucket(feature: str) -> int:
+    # crc32 rather than hash() so buckets are stable across processes
+    return zlib.crc32(feature.encode('utf-8')) % N_FEATURES
+
+
+def hashed_features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(bucket indices, L2-normalized counts) of a message's hashed n-grams"""
+    words = _WORD.findall((text or '').lower())
+    features = [f'w:{word}' for word in words]
+    features += [f'b:{a} {b}' for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f' {word} '
+        features += [f'c:{padded[i:i + 3]}' for i in range(len(padded) - 2)]
+    counts: Dict[int, float] = {}
+    for feature in features:
+        bucket = _bucket(feature)
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    if len(values):
+        values /= np.linalg.norm(values)
+    return indices, values
+
+
+def featurize(texts: Sequence[str]) -> np.ndarray:
+    """Dense feature matrix (one row per text), used for training"""
+    matrix = np.zeros((len(texts), N_FEATURES), dtype=np.float32)
+    for row, text in enumerate(texts):
+        indices, values = hashed_features(text)
+        matrix[row, indices] = values
+    return matrix
+
+
+class IntentClassifier:
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray,
+                 threshold: Optional[float] = None):
+        self.labels = list(labels)
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold if threshold is not None else \
+            float(os.getenv('INTENT_CONFIDENCE_THRESHOLD', '0.5'))
+
+    @classmethod
+    def train(cls, examples: Sequence[Tuple[str, str]], epochs: int = 600, learning_rate: float = 10.0,
+              l2: float = 1e-5) -> 'IntentClassifier':
+        labels = sorted({intent for _, intent in examples})
+        features = featurize([text for text, _ in examples])
+        # Buckets no example hits keep zero weights, so fit only the columns in use
+        used = np.flatnonzero(features.any(axis=0))
+        features = features[:, used]
+        targets = np.zeros((len(examples), len(labels)), dtype=np.float32)
+        for row, (_, intent) in enumerate(examples):
+            targets[row, labels.index(intent)] = 1.0
+        weights = np.zeros((len(used), len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        for _ in range(epochs):
+            error = (_softmax(features @ weights + bias) - targets) / len(examples)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        full_weights = np.zeros((N_FEATURES, len(labels)), dtype=np.float32)
+        full_weights[used] = weights
+        return cls(labels, full_weights, bias)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> 'IntentClassifier':
+        with np.load(path) as model:
+            if int(model['n_features']) != N_FEATURES:
+                raise ValueError(f"{path} was trained with {int(model['n_features'])} features, expected {N_FEATURES}")
+            return cls([str(label) for label in model['labels']], model['weights'], model['bias'])
+
+    def save(self, path: str = MODEL_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, labels=np.array(self.labels), weights=self.weights, bias=self.bias,
+                            n_features=N_FEATURES)
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """(intent, confidence) per text; low-confidence texts get FALLBACK_INTENT"""
+        # Only the rows of the buckets a message hits are touched, not the whole matrix
+        scores = np.empty((len(texts), len(self.labels)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, values = hashed_features(text)
+            scores[row] = values @ self.weights[indices] + self.bias
+        probabilities = _softmax(scores)
+        results = []
+        for row in probabilities:
+            best = int(row.argmax())
+            confidence = float(row[best])
+            results.append((self.labels[best] if confidence >= self.threshold else FALLBACK_INTENT, confidence))
+        return results
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        return self.predict_batch([text])[0]
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+_classifier: Optional[IntentClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """The per-process classifier: loaded from MODEL_PATH, or trained in memory if there is none"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                try:
+                    _classifier = IntentClassifier.load()
+                except (OSError, ValueError, KeyError):
+                    _classifier = IntentClassifier.train(load_training_examples())
+    return _classifier
+
+
+if __name__ == '__main__':
+    training = load_training_examples()
+    classifier = IntentClassifier.train(training)
+    classifier.save()
+    predictions = classifier.predict_batch([text for text, _ in training])
+    correct = sum(predicted == intent for (predicted, _), (_, intent) in zip(predictions, training))
+    print(f"Trained on {len(training)} examples / {len(classifier.labels)} intents "
+          f"(training accuracy {correct / len(training):.0%}); saved to {MODEL_PATH}")
@@ -0,0 +1,87 @@
+"""
+Keyword intent matcher for the /chatbot route.
+
+The intent table is declarative and ordered by priority: when a message
+contains phrases from several intents, the earliest intent in the table wins.
+All phrases are compiled once at import into a single regex, so a message is
+classified in one scan instead of ~25 chained substring searches.
+
+Phrases match on word boundaries (an optional plural "s"/"es" is allowed), so
+'hi' no longer fires inside 'this' and 'yo' no longer fires inside 'you'.
+"""
+import re
+from typing import List, Optional, Tuple
+
+# (intent, phrases) in priority order - specific intents before general ones
+INTENT_TABLE: List[Tuple[str, List[str]]] = [
+    # Farewell intent (check first to avoid conflicts)
+    ('goodbye', ['bye', 'goodbye', 'see you later', 'catch you later', 'talk to you soon', 'take care',
+                 'see ya', 'good night', 'bye smartedu', 'thanks bye', 'ok bye', 'bye for now']),
+    ('ask_howareyou', ['how are you', 'how are you doing', 'how\'s it going', 'how\'s your day',
+                       'how have you been', 'what\'s up smartedu', 'are you fine', 'you good']),
+    ('ask_whoareyou', ['who are you', 'what are you', 'tell me about yourself', 'what\'s your name',
+                       'introduce yourself', 'are you smartedu', 'who is smartedu', 'what is smartedu']),
+    ('ask_areyoubot', ['are you a bot', 'are you a robot', 'are you real', 'are you human', 'are you alive',
+                       'do you have feelings', 'are you ai', 'are you chatbot']),
+    ('ask_creator', ['who made you', 'who created you', 'who developed you', 'who built you', 'who designed you',
+                     'tell me your developer name', 'who is your owner']),
+    ('ask_help', ['can you help me', 'i need help', 'please help', 'what can you do', 'what services do you provide',
+                  'how can you help me', 'help me smartedu', 'anyone here', 'are you there', 'are you online',
+                  'smartedu can you assist me']),
+    # General greeting intent (after the conversational ones to avoid conflicts)
+    ('greet', ['hi', 'hello', 'hey', 'heya', 'yo', 'hola', 'namaste', 'good morning', 'good afternoon',
+               'good evening', 'hello there', 'hi bot', 'hi smartedu', 'hello smartedu', 'hey smartedu',
+               'smartedu are you there']),
+    ('fee_query', ['fee', 'fees', 'payment', 'due', 'balance', 'show my fees', 'fee details', 'fee status']),
+    ('attendance_query', ['attendance', 'present', 'absent', 'percentage', 'attend', 'attended', 'attending',
+                          'show my attendance', 'attendance details']),
+    ('event_query', ['event', 'events', 'upcoming', 'schedule', 'seminar', 'workshop', 'fest', 'summit',
+                     'show events', 'list events']),
+    ('announcement_query', ['announcement', 'announcements', 'notification', 'notifications', 'show announcements']),
+    ('ask_admission', ['admission', 'admit', 'apply', 'application', 'eligibility', 'entrance', 'mht-cet', 'jee',
+                       'seat', 'intake']),
+    ('ask_cutoff', ['cutoff', 'merit', 'rank', 'percentile']),
+    ('ask_college_info', ['college', 'campus', 'about', 'info', 'information', 'skn', 'sinhgad', 'approved',
+                          'affiliated', 'established']),
+    ('ask_hostel', ['hostel', 'accommodation', 'boarding', 'room', 'mess', 'lodging']),
+    ('ask_transport', ['transport', 'bus', 'vehicle', 'commute', 'travel']),
+    ('ask_placement', ['placement', 'recruiter', 'package', 'salary', 'company', 'companies', 'career']),
+    ('ask_scholarship', ['scholarship', 'financial aid', 'tfws', 'ebc', 'fee waiver']),
+    ('ask_documents', ['document', 'certificate', 'marksheet', 'id proof', 'aadhaar', 'caste']),
+    ('ask_guidance', ['guidance', 'suggest', 'which branch', 'best branch', 'change branch']),
+    # Fallback queries that only apply when nothing above matched
+    ('student_info', ['profile', 'who am i', 'student id', 'roll number', 'department', 'class']),
+    ('marks_query', ['mark', 'marks', 'score', 'result', 'grade', 'academic', 'performance', 'show my marks',
+                     'marks details']),
+    ('help_query', ['help', 'what can you do', 'features', 'how to use', 'assistance']),
+]
+
+
+class IntentMatcher:
+    def __init__(self, table: List[Tuple[str, List[str]]]):
+        self.intents = [intent for intent, _ in table]
+        # One named group per intent, in priority order. Inside a group the
+        # longest phrases go first so alternation prefers the fullest match.
+        groups = []
+        for priority, (_, phrases) in enumerate(table):
+            ordered = sorted(set(phrases), key=len, reverse=True)
+            alternation = '|'.join(re.escape(phrase) for phrase in ordered)
+            groups.append(f'(?P<p{priority}>{alternation})')
+        # The lookahead makes matches zero-width, so a phrase starting inside
+        # another intent's match is still seen (e.g. 'are you there' inside
+        # 'smartedu are you there').
+        self.pattern = re.compile(r'(?=\b(?:' + '|'.join(groups) + r')(?:s|es)?\b)')
+
+    def match(self, message: str) -> Optional[str]:
+        """Return the highest-priority intent found in the message, or None"""
+        best = None
+        for found in self.pattern.finditer(message.lower()):
+            priority = int(found.lastgroup[1:])
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return self.intents[best] if best is not None else None
+
+
+intent_matcher = IntentMatcher(INTENT_TABLE)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Add the composite/unique indexes for the hot query shapes to an existing database
+New databases get them from db.create_all(); this brings older ones up to date.
+Indexes that already exist are skipped, and a unique index is only created once
+the table has no duplicate keys (duplicates are listed so they can be cleaned up).
+On MySQL it also widens announcements.target to the current audience values.
+"""
+
+from sqlalchemy import func, inspect, select
+
+from app import app, db
+from event_registrations import reconcile_participant_counts
+from models import Notification, Mark, Attendance, ChatMessage, Event, Announcement, EventRegistration
+
+HOT_QUERY_TABLES = [Notification, Mark, Attendance, ChatMessage, Event, Announcement, EventRegistration]
+
+
+def hot_query_indexes():
+    return [index for model in HOT_QUERY_TABLES for index in sorted(model.__table__.indexes, key=lambda i: i.name)]
+
+
+def find_duplicates(conn, index, limit=5):
+    columns = list(index.columns)
+    query = (
+        select(*columns, func.count().label('copies'))
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .limit(limit)
+    )
+    return conn.execute(query).fetchall()
+
+
+def widen_announcement_targets(engine):
+    """ALTER the MySQL ENUM behind announcements.target to match the model (other backends store strings)"""
+    if engine.dialect.name != 'mysql':
+        return False
+    column = Announcement.__table__.c.target
+    values = ', '.join(f"'{value}'" for value in column.type.enums)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"ALTER TABLE announcements MODIFY target ENUM({values}) DEFAULT 'all'")
+    return True
+
+
+def migrate_indexes(engine):
+    existing = {}
+    created = skipped = 0
+    with engine.begin() as conn:
+        for index in hot_query_indexes():
+            table_name = index.table.name
+            if table_name not in existing:
+                existing[table_name] = {ix['name'] for ix in inspect(conn).get_indexes(table_name)}
+            if index.name in existing[table_name]:
+                print(f"   = {index.name} already exists")
+                continue
+            if index.unique:
+                duplicates = find_duplicates(conn, index)
+                if duplicates:
+                    print(f"   ! {index.name} skipped - duplicate keys in {table_name}: {duplicates}")
+                    skipped += 1
+                    continue
+            index.create(bind=conn)
+            created += 1
+            print(f"   + {index.name} on {table_name}({', '.join(c.name for c in index.columns)})")
+    return created, skipped
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        print("🔧 Migrating hot-query indexes")
+        print("=" * 60)
+        created, skipped = migrate_indexes(db.engine)
+        print(f"\nCreated {created} index(es), skipped {skipped}")
+        if widen_announcement_targets(db.engine):
+            print("Widened announcements.target to the students/teachers audiences")
+        # Registration now trusts events.current_participants, so start it from the real counts
+        repaired = reconcile_participant_counts()
+        print(f"Resynced current_participants on {repaired} event(s)")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Release-time schema migration - run once per deploy, before the app serves traffic
+The Procfile runs it as Heroku's release phase; on other hosts run it before
+starting the web process. Every step is idempotent, so re-running it is safe.
+
+- Tables that do not exist yet (event_waitlist, announcement_watermarks,
+  announcement_reads, ...) are created with db.create_all(); under gunicorn
+  app.py's __main__ block, which used to do this, never runs.
+- Columns added to existing tables since the first release are ALTERed in
+  (users.unread_count: every User query selects it, so login fails until it
+  exists) and backfilled.
+- The hot-query indexes and the announcements.target values are brought up to
+  date (see migrate_indexes.py), and events.current_participants is resynced.
+"""
+
+from sqlalchemy import inspect
+
+from app import app, db
+from event_registrations import reconcile_participant_counts
+from migrate_indexes import migrate_indexes, widen_announcement_targets
+from notification_counters import reconcile_unread_counts
+
+# (table, column, DDL) for columns added to tables that older databases already have
+ADDED_COLUMNS = [
+    ('users', 'unread_count', 'INTEGER NOT NULL DEFAULT 0'),
+]
+
+
+def add_missing_columns(engine):
+    """ALTER in every ADDED_COLUMNS entry the database lacks; returns the 'table.column' names added"""
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table, column, ddl in ADDED_COLUMNS:
+            if column in {existing['name'] for existing in inspector.get_columns(table)}:
+                continue
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+            added.append(f"{table}.{column}")
+            print(f"   + {table}.{column}")
+    return added
+
+
+def migrate_schema():
+    missing = set(db.metadata.tables) - set(inspect(db.engine).get_table_names())
+    db.create_all()
+    for table in sorted(missing):
+        print(f"   + table {table}")
+    added = add_missing_columns(db.engine)
+    if 'users.unread_count' in added:
+        # A new counter column starts at 0 for everyone; fill it from the notifications table
+        print(f"Backfilled unread counters for {reconcile_unread_counts()} user(s)")
+    created, skipped = migrate_indexes(db.engine)
+    print(f"Created {created} index(es), skipped {skipped}")
+    if widen_announcement_targets(db.engine):
+        print("Widened announcements.target to the current audiences")
+    print(f"Resynced current_participants on {reconcile_participant_counts()} event(s)")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        print("🔧 Migrating schema")
+        print("=" * 60)
+        migrate_schema()
+        print("\n✅ Schema is up to date")
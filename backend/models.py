@@ -1,8 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, date
 from decimal import Decimal
-import os
-import mysql.connector
+from sqlalchemy import text
 from typing import Any, Dict, List, Optional
 
 db = SQLAlchemy()
@@ -20,6 +19,8 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized count of unread notifications, maintained by notification_counters.py
+    unread_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     chat_messages = db.relationship('ChatMessage', backref='user', lazy=True)
@@ -184,6 +185,10 @@ class Fee(db.Model):
 # 7️⃣ MARKS
 class Mark(db.Model):
     __tablename__ = 'marks'
+    __table_args__ = (
+        # One mark row per student per subject (the add-marks route already enforces this)
+        db.Index('uq_marks_student_subject', 'student_id', 'subject_id', unique=True),
+    )
     
     mark_id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
@@ -209,6 +214,9 @@ class Mark(db.Model):
 # 8️⃣ ATTENDANCE (Aggregated Counts Only)
 class Attendance(db.Model):
     __tablename__ = 'attendance'
+    __table_args__ = (
+        db.Index('ix_attendance_student_subject', 'student_id', 'subject_id'),
+    )
     
     attendance_id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
@@ -238,6 +246,10 @@ class Attendance(db.Model):
 # 9️⃣ EVENTS (Enhanced)
 class Event(db.Model):
     __tablename__ = 'events'
+    __table_args__ = (
+        # Upcoming events: is_active = 1 AND event_date >= today ORDER BY event_date
+        db.Index('ix_events_active_date', 'is_active', 'event_date'),
+    )
     
     event_id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -270,8 +282,9 @@ class Event(db.Model):
         return form_links.get(self.event_type, 'https://forms.gle/t5pJb3FZsWcSdDBL8')
     
     def to_dict(self):
-        # Get registration count from relationship
-        registration_count = len(self.registrations) if hasattr(self, 'registrations') else 0
+        # current_participants is maintained by event_registrations.py - reading
+        # self.registrations here would lazy-load every registration row per event
+        registration_count = self.current_participants or 0
         
         return {
             'id': self.event_id,  # Frontend expects 'id' as key
@@ -283,7 +296,7 @@ class Event(db.Model):
             'location': self.location,
             'event_type': self.event_type,
             'max_participants': self.max_participants,
-            'current_participants': self.current_participants or registration_count,
+            'current_participants': registration_count,
             'organized_by': self.organized_by,
             'registration_link': self.registration_link or self.get_google_form_link(),
             'google_form_link': self.get_google_form_link(),
@@ -295,11 +308,17 @@ class Event(db.Model):
 # 🔟 ANNOUNCEMENTS (Enhanced)
 class Announcement(db.Model):
     __tablename__ = 'announcements'
+    __table_args__ = (
+        # Active announcements newest first; expires_at is checked from the index
+        db.Index('ix_announcements_active_created_expires', 'is_active', 'created_at', 'expires_at'),
+        # Per-user inbox: one range per audience (all / students / teachers / class / dept / student), newest id first
+        db.Index('ix_announcements_target_id', 'target', 'target_id', 'announcement_id'),
+    )
     
     announcement_id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
-    target = db.Column(db.Enum('all', 'class', 'dept', 'student'), default='all')
+    target = db.Column(db.Enum('all', 'students', 'teachers', 'class', 'dept', 'student'), default='all')
     target_id = db.Column(db.Integer)
     priority = db.Column(db.Enum('low', 'normal', 'high', 'urgent'), default='normal')
     is_active = db.Column(db.Boolean, default=True)
@@ -323,9 +342,29 @@ class Announcement(db.Model):
             'expires_at': self.expires_at.isoformat() if self.expires_at else None
         }
 
+# ANNOUNCEMENT INBOX STATE (announcements are stored once; see announcement_inbox.py)
+class AnnouncementWatermark(db.Model):
+    __tablename__ = 'announcement_watermarks'
+    
+    # Everything with announcement_id <= last_seen_id counts as read for this user
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    last_seen_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class AnnouncementRead(db.Model):
+    __tablename__ = 'announcement_reads'
+    
+    # Sparse read marks above the user's watermark
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    announcement_id = db.Column(db.Integer, db.ForeignKey('announcements.announcement_id'), primary_key=True)
+    read_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 # 1️⃣1️⃣ CHAT MESSAGES (Enhanced with sentiment)
 class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        db.Index('ix_chat_messages_user_timestamp', 'user_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
@@ -378,6 +417,12 @@ class Course(db.Model):
 # 1️⃣2️⃣ EVENT REGISTRATIONS
 class EventRegistration(db.Model):
     __tablename__ = 'event_registrations'
+    __table_args__ = (
+        # One registration per student per event - also the duplicate guard for registration
+        db.Index('uq_event_registrations_event_student', 'event_id', 'student_id', unique=True),
+        # A student's registrations (my-registrations, registered event ids)
+        db.Index('ix_event_registrations_student_event', 'student_id', 'event_id'),
+    )
     
     registration_id = db.Column(db.Integer, primary_key=True)
     event_id = db.Column(db.Integer, db.ForeignKey('events.event_id'), nullable=False)
@@ -396,9 +441,35 @@ class EventRegistration(db.Model):
             'registered_at': self.registered_at.isoformat() if self.registered_at else None
         }
 
+# EVENT WAITLIST (queue order = waitlist_id)
+class EventWaitlist(db.Model):
+    __tablename__ = 'event_waitlist'
+    __table_args__ = (
+        db.Index('uq_event_waitlist_event_student', 'event_id', 'student_id', unique=True),
+        # Head of the queue and positions: event_id = ? ORDER BY waitlist_id
+        db.Index('ix_event_waitlist_event_position', 'event_id', 'waitlist_id'),
+    )
+    
+    waitlist_id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.event_id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
+    joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'waitlist_id': self.waitlist_id,
+            'event_id': self.event_id,
+            'student_id': self.student_id,
+            'joined_at': self.joined_at.isoformat() if self.joined_at else None
+        }
+
 # 1️⃣3️⃣ NOTIFICATIONS (New)
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Per-user lists (newest first) and unread filters
+        db.Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+    )
     
     notification_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
@@ -422,57 +493,34 @@ class Notification(db.Model):
         }
 
 
-# ---------- Raw MySQL helpers for chatbot ----------
-def _get_mysql_connection():
-    """Create a short-lived MySQL connection using env vars.
-    Falls back to sensible defaults for local dev.
-    """
-    host = os.getenv('MYSQL_HOST', 'localhost')
-    user = os.getenv('MYSQL_USER', 'root')
-    password = os.getenv('MYSQL_PASSWORD', '')
-    database = os.getenv('MYSQL_DB', 'college_system_cse')
-    return mysql.connector.connect(
-        host=host,
-        user=user,
-        password=password,
-        database=database,
-        auth_plugin=os.getenv('MYSQL_AUTH_PLUGIN', 'mysql_native_password')
-    )
+# ---------- Raw SQL helpers for chatbot ----------
+# These run on the engine Flask-SQLAlchemy already manages, so they borrow a
+# connection from its pool instead of opening (and authenticating) a new
+# MySQL connection per call. Pool size and health checks come from the
+# engine configuration.
+def _fetch_rows(sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    with db.engine.connect() as conn:
+        return [dict(row) for row in conn.execute(text(sql), params).mappings()]
 
 
 def get_fee_details(student_id: int) -> Dict[str, Any]:
-    conn = None
     try:
-        conn = _get_mysql_connection()
-        cur = conn.cursor(dictionary=True)
-        cur.execute(
+        rows = _fetch_rows(
             """
             SELECT fee_id, student_id, total_amount, paid_amount, due_amount, payment_status, last_payment_date
             FROM fees
-            WHERE student_id = %s
+            WHERE student_id = :student_id
             """,
-            (student_id,)
+            {'student_id': student_id}
         )
-        row = cur.fetchone()
-        return row or {}
+        return rows[0] if rows else {}
     except Exception:
         return {}
-    finally:
-        try:
-            if cur:
-                cur.close()
-        except Exception:
-            pass
-        if conn:
-            conn.close()
 
 
 def get_attendance(student_id: int) -> Dict[str, Any]:
-    conn = None
     try:
-        conn = _get_mysql_connection()
-        cur = conn.cursor(dictionary=True)
-        cur.execute(
+        rows = _fetch_rows(
             """
             SELECT student_id,
                    SUM(present_count) AS present_count,
@@ -480,41 +528,30 @@ def get_attendance(student_id: int) -> Dict[str, Any]:
                    SUM(total_classes) AS total_classes,
                    ROUND(100 * SUM(present_count) / NULLIF(SUM(total_classes), 0), 2) AS attendance_percentage
             FROM attendance
-            WHERE student_id = %s
+            WHERE student_id = :student_id
             GROUP BY student_id
             """,
-            (student_id,)
+            {'student_id': student_id}
         )
-        row = cur.fetchone()
-        return row or {}
+        return rows[0] if rows else {}
     except Exception:
         return {}
-    finally:
-        try:
-            if cur:
-                cur.close()
-        except Exception:
-            pass
-        if conn:
-            conn.close()
 
 
 def get_upcoming_events(limit: int = 5) -> List[Dict[str, Any]]:
-    conn = None
     try:
-        conn = _get_mysql_connection()
-        cur = conn.cursor(dictionary=True)
-        cur.execute(
+        # Today's date is bound as a parameter rather than CURDATE() so the
+        # query also runs on the SQLite dev database
+        rows = _fetch_rows(
             """
             SELECT event_id, title, description, event_date, event_time, location
             FROM events
-            WHERE is_active = 1 AND event_date >= CURDATE()
+            WHERE is_active = 1 AND event_date >= :today
             ORDER BY event_date ASC
-            LIMIT %s
+            LIMIT :limit
             """,
-            (limit,)
+            {'today': date.today(), 'limit': limit}
         )
-        rows = cur.fetchall() or []
         # Ensure JSON-serializable values
         safe_rows: List[Dict[str, Any]] = []
         for r in rows:
@@ -532,11 +569,3 @@ def get_upcoming_events(limit: int = 5) -> List[Dict[str, Any]]:
         return safe_rows
     except Exception:
         return []
-    finally:
-        try:
-            if cur:
-                cur.close()
-        except Exception:
-            pass
-        if conn:
-            conn.close()
\ No newline at end of file
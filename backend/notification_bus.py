@@ -0,0 +1,150 @@
+"""
+In-process pub/sub for pushing notifications to open SSE streams.
+
+Each /api/notifications/stream connection subscribes a small queue for its
+user. Committed Notification rows are published to their user (with an
+unread-count delta) and committed Announcements go to their audience (everyone
+for target='all', else the students of the class/dept/student targeted), so
+clients no longer poll /api/notifications/unread-count.
+
+Publishing happens from SQLAlchemy session events after commit, which
+covers every code path that writes these rows. The bus is per process:
+a push published in one worker never reaches streams held by another, so
+the app must run as a single (gevent) worker process - the Procfile pins
+-w 1. Scaling past one process needs a shared broker (e.g. Redis pub/sub)
+behind publish/broadcast.
+
+An open stream holds a worker for its whole life, so serve the app with an
+async worker (the Procfile runs `gunicorn -k gevent`): an idle stream then
+costs a greenlet instead of a thread. Streams send a keep-alive comment every
+SSE_HEARTBEAT_SECONDS so proxies do not cut them, and end after
+SSE_MAX_STREAM_SECONDS; the client then reconnects with a fresh stream
+ticket (auth.issue_stream_ticket) and picks up the current unread count again.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from announcement_inbox import announcement_recipients
+from models import Announcement, Notification
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+# A stream is closed after this long, so no client pins a worker indefinitely
+MAX_STREAM_SECONDS = float(os.getenv('SSE_MAX_STREAM_SECONDS', '600'))
+# Reconnect delay EventSource uses after the server ends a stream
+RECONNECT_MS = 3000
+
+
+class NotificationBus:
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[int, Set[queue.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> queue.Queue:
+        events: queue.Queue = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(events)
+        return events
+
+    def unsubscribe(self, user_id: int, events: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(events)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id: int, event_name: str, data: Dict[str, Any]):
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        self._deliver(targets, event_name, data)
+
+    def broadcast(self, event_name: str, data: Dict[str, Any]):
+        with self._lock:
+            targets = [events for subscribers in self._subscribers.values() for events in subscribers]
+        self._deliver(targets, event_name, data)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    @staticmethod
+    def _deliver(targets, event_name, data):
+        for events in targets:
+            try:
+                events.put_nowait((event_name, data))
+            except queue.Full:
+                # A stalled client misses events; it resyncs from the REST endpoints
+                pass
+
+
+notification_bus = NotificationBus()
+
+
+def format_sse(event_name: Optional[str], data: Dict[str, Any]) -> str:
+    return f"event: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream(user_id: int, events: queue.Queue, initial_unread: int):
+    """Generator for the SSE response body; ends after MAX_STREAM_SECONDS and
+    unsubscribes when it ends or the client goes away
+    """
+    deadline = time.monotonic() + MAX_STREAM_SECONDS
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        yield format_sse('unread_count', {'unread_count': initial_unread})
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event_name, data = events.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event_name, data)
+    finally:
+        notification_bus.unsubscribe(user_id, events)
+
+
+# ---------- Publish committed rows ----------
+_PENDING_KEY = 'notification_bus_pending'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_new_rows(session, flush_context):
+    # Serialize now: after commit the rows are expired and no SQL may be emitted.
+    # Each entry is (event name, recipient user ids or None for everyone, payload).
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, Notification):
+            pending.append(('notification', [obj.user_id], obj.to_dict()))
+            if not obj.is_read:
+                pending.append(('unread_count', [obj.user_id], {'delta': 1}))
+        elif isinstance(obj, Announcement):
+            recipients = announcement_recipients(session.connection(), obj.target, obj.target_id)
+            pending.append(('announcement', recipients, obj.to_dict()))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_committed_rows(session):
+    for event_name, recipients, payload in session.info.pop(_PENDING_KEY, []):
+        if recipients is None:
+            notification_bus.broadcast(event_name, payload)
+            continue
+        for user_id in recipients:
+            notification_bus.publish(user_id, event_name, payload)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_rows(session):
+    session.info.pop(_PENDING_KEY, None)
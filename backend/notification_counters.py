@@ -0,0 +1,72 @@
+"""
+Denormalized per-user unread notification counters (users.unread_count).
+
+Notification inserts, is_read changes and deletes made through the ORM adjust
+the owner's counter with an atomic UPDATE in the same transaction, so reading
+the unread count is a primary-key lookup instead of a COUNT(*) over
+notifications. Writes that bypass the ORM (bulk updates, manual SQL) can make
+the counters drift; reconcile_unread_counts() recomputes them and is run
+periodically by reconcile_unread_counts.py.
+"""
+from collections import Counter
+
+from sqlalchemy import and_, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from models import db, User, Notification
+
+users = User.__table__
+notifications = Notification.__table__
+
+
+def _apply_deltas(connection, deltas: Counter):
+    for user_id, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(users)
+                .where(users.c.user_id == user_id)
+                # Keep updated_at as is - a new notification is not a profile change
+                .values(unread_count=users.c.unread_count + delta, updated_at=users.c.updated_at)
+            )
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_unread_changes(session, flush_context):
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Notification) and not obj.is_read:
+            deltas[obj.user_id] += 1
+    for obj in session.dirty:
+        if isinstance(obj, Notification):
+            history = inspect(obj).attrs.is_read.history
+            # Only count transitions whose previous value was loaded
+            if history.added and history.deleted:
+                was_read, now_read = bool(history.deleted[0]), bool(history.added[0])
+                if was_read != now_read:
+                    deltas[obj.user_id] += -1 if now_read else 1
+    for obj in session.deleted:
+        if isinstance(obj, Notification) and inspect(obj).dict.get('is_read') is False:
+            deltas[obj.user_id] -= 1
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+
+
+def get_unread_count(user_id: int) -> int:
+    count = db.session.query(User.unread_count).filter(User.user_id == user_id).scalar()
+    return max(0, count or 0)
+
+
+def reconcile_unread_counts() -> int:
+    """Recompute every user's counter from notifications; returns how many were repaired"""
+    actual = (
+        select(func.count(notifications.c.notification_id))
+        .where(and_(notifications.c.user_id == users.c.user_id, notifications.c.is_read == False))
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(users)
+        .where(users.c.unread_count != actual)
+        .values(unread_count=actual, updated_at=users.c.updated_at)
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+A page is read with `WHERE (sort key) past the cursor ORDER BY sort key LIMIT n`
+instead of OFFSET, so every page costs one index range scan no matter how deep
+the client has paged or how large the table has grown. The sort key must end
+in a unique column (the primary key) so rows with equal timestamps are neither
+skipped nor repeated.
+
+Clients pass `limit` and `after` (the opaque token from the previous
+response's X-Next-Cursor header); the header is absent on the last page.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """The `after` token is malformed or does not match the endpoint's sort key"""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, order: Sequence[Tuple[Any, bool]]) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(order):
+            raise InvalidCursor(token)
+        decoded = []
+        for (column, _), value in zip(order, values):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+
+
+def page_args(default_limit: Optional[int] = None) -> Tuple[Optional[int], Optional[str]]:
+    """(limit, after) from the query string; limit is capped at MAX_PAGE_SIZE"""
+    limit = request.args.get('limit', type=int) or default_limit
+    if limit is not None:
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    return limit, request.args.get('after') or None
+
+
+def _past_cursor(order, values):
+    """(a, b, c) > (x, y, z) spelled out per column, honouring each column's direction"""
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[order[j][0] == values[j] for j in range(i)], step))
+    return or_(*clauses)
+
+
+def keyset_page(query, order: Sequence[Tuple[Any, bool]], limit: Optional[int] = None,
+                after: Optional[str] = None, row_key=None):
+    """Run one page of `query` ordered by `order` ((column, descending) pairs).
+
+    Returns (rows, next cursor). Without a limit every remaining row is
+    returned and the cursor is None. `row_key` maps a result row to its sort
+    key values when the row is not an entity carrying the ordered attributes.
+    """
+    if after:
+        query = query.filter(_past_cursor(order, decode_cursor(after, order)))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order])
+    if not limit:
+        return query.all(), None
+
+    # One extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    key = row_key(last) if row_key else [getattr(last, column.key) for column, _ in order]
+    return rows, encode_cursor(key)
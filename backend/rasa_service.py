@@ -1,7 +1,78 @@
+"""
+Rasa NLU client for /chat.
+
+Parse calls go through one keep-alive requests.Session per process (created
+on first use), with separate connect and read timeouts, so a turn reuses a
+pooled connection instead of opening a new one. A circuit breaker sits in
+front of the server: after RASA_BREAKER_FAILURES consecutive failures it
+opens and turns are answered by the local fallback straight away instead of
+each waiting for a timeout. After RASA_BREAKER_RESET_SECONDS one request is
+let through as a probe; success closes the breaker, failure re-opens it.
+stats() reports the breaker state and call latency.
+
+NLU_BACKEND=embedded skips the server entirely and classifies with the
+in-process model in intent_classifier.py. With the default (rasa) that
+model still answers whenever the server cannot.
+"""
 import os
 import asyncio
-from typing import Any, Dict
-import requests
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the server; while half-open only the single probe may"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 2)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'times_opened': self.times_opened,
+                'retry_in_seconds': retry_in
+            }
 
 
 class RasaService:
@@ -10,53 +81,129 @@ class RasaService:
         self.base_url = os.getenv('RASA_SERVER_URL', 'http://localhost:5005')
         # Rasa NLU parse endpoint
         self.parse_url = f"{self.base_url}/model/parse"
+        self.nlu_backend = os.getenv('NLU_BACKEND', 'rasa').lower()
+        self.timeout = (float(os.getenv('RASA_CONNECT_TIMEOUT', '0.5')), float(os.getenv('RASA_READ_TIMEOUT', '3')))
+        self.pool_size = int(os.getenv('RASA_POOL_SIZE', '10'))
+        self.breaker = CircuitBreaker(int(os.getenv('RASA_BREAKER_FAILURES', '3')),
+                                      float(os.getenv('RASA_BREAKER_RESET_SECONDS', '30')))
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=512)
+        self._counts = {'requests': 0, 'failures': 0, 'short_circuited': 0}
+        self._last_error = None
+
+    def _get_session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def _parse(self, text: str) -> Dict[str, Any]:
+        """POST to /model/parse through the breaker; raises when the server is skipped or fails"""
+        if not self.breaker.allow_request():
+            with self._stats_lock:
+                self._counts['short_circuited'] += 1
+            raise RuntimeError('Rasa server unavailable (circuit open)')
+        started = time.perf_counter()
+        try:
+            resp = self._get_session().post(self.parse_url, json={"text": text}, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json() or {}
+        except Exception as e:
+            self.breaker.record_failure()
+            with self._stats_lock:
+                self._counts['requests'] += 1
+                self._counts['failures'] += 1
+                self._last_error = str(e)
+            raise
+        self.breaker.record_success()
+        with self._stats_lock:
+            self._counts['requests'] += 1
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state, call counts and latency percentiles of recent successful parses"""
+        with self._stats_lock:
+            latencies = sorted(self._latencies_ms)
+            stats = dict(self._counts, last_error=self._last_error)
+        percentile = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 2) if latencies else None
+        stats.update({
+            'nlu_backend': self.nlu_backend,
+            'server_url': self.base_url,
+            'connect_timeout': self.timeout[0],
+            'read_timeout': self.timeout[1],
+            'breaker': self.breaker.snapshot(),
+            'latency_ms': {'p50': percentile(0.50), 'p95': percentile(0.95), 'p99': percentile(0.99),
+                           'samples': len(latencies)}
+        })
+        return stats
+
+    def _embedded_parse(self, text: str) -> Dict[str, Any]:
+        """A /model/parse-shaped result from the in-process classifier (no entities)"""
+        from intent_classifier import get_intent_classifier
+        intent, confidence = get_intent_classifier().predict(text)
+        return {'intent': {'name': intent, 'confidence': confidence}, 'entities': []}
 
     def detect_intent_texts(self, text, language_code='en'):
         """
-        Call Rasa NLU parse API and map response to our expected shape.
+        Call Rasa NLU parse API (or the embedded classifier) and map response to our expected shape.
         """
         try:
-            payload = {"text": text}
-            resp = requests.post(self.parse_url, json=payload, timeout=5)
-            resp.raise_for_status()
-            data = resp.json() or {}
+            data = self._embedded_parse(text) if self.nlu_backend == 'embedded' else self._parse(text)
+            return self._to_result(data, text)
+        except Exception as e:
+            try:
+                # The server is down or skipped: classify locally instead
+                result = self._to_result(self._embedded_parse(text), text)
+            except Exception:
+                # Fallback safe response
+                result = {
+                    'intent': 'help_request',
+                    'confidence': 0.0,
+                    'parameters': {},
+                    'fulfillment_text': 'I can help with fees, attendance, or events.',
+                    'query_text': text,
+                    'action': '',
+                    'all_required_params_present': True
+                }
+            result['error'] = str(e)
+            return result
 
-            intent_name = (data.get('intent') or {}).get('name', 'help_request')
-            confidence = float((data.get('intent') or {}).get('confidence', 0.0))
-            entities = data.get('entities') or []
+    def _to_result(self, data: Dict[str, Any], text: str) -> Dict[str, Any]:
+        intent_name = (data.get('intent') or {}).get('name', 'help_request')
+        confidence = float((data.get('intent') or {}).get('confidence', 0.0))
+        entities = data.get('entities') or []
 
-            # Convert entities list into a simple parameters dict
-            parameters = {}
-            for ent in entities:
-                ent_name = ent.get('entity')
-                ent_value = ent.get('value')
-                if ent_name:
-                    parameters[ent_name] = ent_value
+        # Convert entities list into a simple parameters dict
+        parameters = {}
+        for ent in entities:
+            ent_name = ent.get('entity')
+            ent_value = ent.get('value')
+            if ent_name:
+                parameters[ent_name] = ent_value
 
-            # Map intent to a basic fulfillment text
-            fulfillment_text = self._default_fulfillment_for_intent(intent_name)
+        # Map intent to a basic fulfillment text
+        fulfillment_text = self._default_fulfillment_for_intent(intent_name)
 
-            return {
-                'intent': intent_name,
-                'confidence': confidence,
-                'parameters': parameters,
-                'fulfillment_text': fulfillment_text,
-                'query_text': text,
-                'action': '',
-                'all_required_params_present': True
-            }
-        except Exception as e:
-            # Fallback safe response
-            return {
-                'intent': 'help_request',
-                'confidence': 0.0,
-                'parameters': {},
-                'fulfillment_text': 'I can help with fees, attendance, or events.',
-                'query_text': text,
-                'action': '',
-                'all_required_params_present': True,
-                'error': str(e)
-            }
+        return {
+            'intent': intent_name,
+            'confidence': confidence,
+            'parameters': parameters,
+            'fulfillment_text': fulfillment_text,
+            'query_text': text,
+            'action': '',
+            'all_required_params_present': True
+        }
 
     def _default_fulfillment_for_intent(self, intent_name: str) -> str:
         intent_text = {
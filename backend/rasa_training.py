@@ -2,6 +2,25 @@ import subprocess
 from pathlib import Path
 
 
+# Also the training data of the embedded classifier (intent_classifier.py)
+NLU_YML = (
+    'version: "3.1"\n'
+    'nlu:\n'
+    '- intent: greet\n'
+    '  examples: |\n'
+    '    - hello\n    - hi\n    - hey\n    - good morning\n    - good evening\n'
+    '- intent: fee_query\n'
+    '  examples: |\n'
+    '    - show my fee details\n    - what is my fee status\n    - how much fees pending\n    - fee details\n'
+    '- intent: attendance_query\n'
+    '  examples: |\n'
+    '    - what is my attendance\n    - show my attendance\n    - attendance percentage\n    - attendance details\n'
+    '- intent: event_query\n'
+    '  examples: |\n'
+    '    - list upcoming events\n    - show events\n    - any events this week\n    - upcoming college events\n'
+)
+
+
 def ensure_structure(base: Path):
     data = base / 'data'
     models = base / 'models'
@@ -11,24 +30,7 @@ def ensure_structure(base: Path):
 
 
 def write_files(data: Path, base: Path):
-    (data / 'nlu.yml').write_text(
-        (
-            'version: "3.1"\n'
-            'nlu:\n'
-            '- intent: greet\n'
-            '  examples: |\n'
-            '    - hello\n    - hi\n    - hey\n    - good morning\n    - good evening\n'
-            '- intent: fee_query\n'
-            '  examples: |\n'
-            '    - show my fee details\n    - what is my fee status\n    - how much fees pending\n    - fee details\n'
-            '- intent: attendance_query\n'
-            '  examples: |\n'
-            '    - what is my attendance\n    - show my attendance\n    - attendance percentage\n    - attendance details\n'
-            '- intent: event_query\n'
-            '  examples: |\n'
-            '    - list upcoming events\n    - show events\n    - any events this week\n    - upcoming college events\n'
-        )
-    )
+    (data / 'nlu.yml').write_text(NLU_YML)
 
     (data / 'stories.yml').write_text(
         (
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Repair drift in users.unread_count
+Recomputes every user's counter from the notifications table. The column itself
+is added by migrate_schema.py at release time. Safe to run from cron, e.g. hourly:
+    0 * * * * cd /path/to/backend && python reconcile_unread_counts.py
+"""
+
+from app import app
+from notification_counters import reconcile_unread_counts
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        repaired = reconcile_unread_counts()
+        print(f"Reconciled unread notification counters: {repaired} user(s) repaired")
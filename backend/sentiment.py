@@ -0,0 +1,156 @@
+"""
+Sentiment scoring for chat messages.
+
+The default engine is a lexicon scorer that reimplements TextBlob's pattern
+analyzer. It uses the same word polarities, intensifiers ("very good"),
+negations ("not good" = -0.5 x good), exclamation boosts and emoticons, read
+from a lexicon compiled once to data/sentiment_lexicon.json by
+build_sentiment_lexicon.py. It uses a regex tokenizer instead of pattern's
+sentence splitter. It therefore needs neither TextBlob nor NLTK, and scoring
+a message is a few dict lookups.
+
+Unlike TextBlob's tokenizer, which breaks "don't" into "do n ' t", "n't"
+counts as a negation here. benchmark_sentiment.py checks the polarity gap
+and label agreement against TextBlob on a corpus.
+
+SENTIMENT_ENGINE=textblob switches back to TextBlob itself.
+"""
+import json
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_lexicon.json')
+
+NEGATIONS = frozenset(('no', 'not', "n't", 'never'))
+EXCLAMATION_BOOST = 1.25
+NEGATION_FACTOR = -0.5
+
+_WORD_PATTERN = r"n't|[^\W_]+(?:-[^\W_]+)*|\(\s?!\s?\)|!"
+
+
+def sentiment_label(polarity: float) -> str:
+    if polarity > 0.1:
+        return 'positive'
+    if polarity < -0.1:
+        return 'negative'
+    return 'neutral'
+
+
+class SentimentEngine(ABC):
+    """Scores a batch of texts to polarities in [-1, 1]"""
+    name = None
+
+    @abstractmethod
+    def polarities(self, texts: Sequence[str]) -> List[float]:
+        """One polarity per text, in order"""
+
+    def score_batch(self, texts: Sequence[str]) -> List[Dict]:
+        return [{'polarity': polarity, 'sentiment': sentiment_label(polarity)}
+                for polarity in self.polarities(texts)]
+
+    def score(self, text: str) -> Dict:
+        return self.score_batch([text])[0]
+
+
+class LexiconSentiment(SentimentEngine):
+    """Pattern-compatible lexicon scorer (no TextBlob/NLTK at runtime)"""
+    name = 'lexicon'
+
+    def __init__(self, path: str = LEXICON_PATH):
+        with open(path, encoding='utf-8') as f:
+            lexicon = json.load(f)
+        self.words = {form: tuple(entry) for form, entry in lexicon['words'].items()}
+        self.emoticons = lexicon['emoticons']
+        # Emoticons are matched before words, and only as whole tokens (":)" but not "a:)b")
+        faces = '|'.join(re.escape(face) for face in sorted(self.emoticons, key=len, reverse=True))
+        self._tokens = re.compile(rf"(?:{faces})(?=\s|$)|{_WORD_PATTERN}")
+
+    def tokenize(self, text: str) -> List[str]:
+        text = text.lower().replace("n't", " n't")
+        return [token if token[0] != '(' else '(!)' for token in self._tokens.findall(text)]
+
+    def polarity(self, text: str) -> float:
+        # Each assessment is [polarity, intensity, negated]; see pattern's Sentiment.assessments()
+        assessments = []
+        modifier: Optional[str] = None
+        negation: Optional[str] = None
+        for token in self.tokenize(text):
+            entry = self.words.get(token)
+            if entry is not None:
+                polarity, intensity, is_modifier = entry
+                if modifier is None:
+                    assessments.append([polarity, intensity, False])
+                else:
+                    # "very good": the modifier's own assessment is scaled by its intensity
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(polarity * last[1], 1.0))
+                    last[1] = intensity
+                if negation is not None:
+                    assessments[-1][1] = 1.0 / assessments[-1][1]
+                    assessments[-1][2] = True
+                modifier = token if is_modifier else None
+                negation = token if token in NEGATIONS else None
+                continue
+
+            if token in NEGATIONS:
+                negation = token
+            elif negation is not None and len(token) > 1:
+                # A negation carries over one-letter tokens only ("not a good")
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith('ly'):
+                # "really not good"
+                assessments[-1][2] = True
+                negation = None
+            elif modifier is not None and len(token) > 2:
+                modifier = None
+
+            if token == '!' and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * EXCLAMATION_BOOST, 1.0))
+            elif token == '(!)':
+                # Sarcasm mark: counts as a neutral assessment
+                assessments.append([0.0, 1.0, False])
+            elif token in self.emoticons:
+                assessments.append([self.emoticons[token], 1.0, False])
+
+        if not assessments:
+            return 0.0
+        return sum(polarity * NEGATION_FACTOR if negated else polarity
+                   for polarity, _, negated in assessments) / len(assessments)
+
+    def polarities(self, texts: Sequence[str]) -> List[float]:
+        return [self.polarity(text or '') for text in texts]
+
+
+class TextBlobSentiment(SentimentEngine):
+    """TextBlob's PatternAnalyzer (the reference implementation)"""
+    name = 'textblob'
+
+    def __init__(self):
+        from textblob import TextBlob
+        self._blob = TextBlob
+
+    def polarities(self, texts: Sequence[str]) -> List[float]:
+        return [self._blob(text or '').sentiment.polarity for text in texts]
+
+
+ENGINES = {
+    LexiconSentiment.name: LexiconSentiment,
+    TextBlobSentiment.name: TextBlobSentiment,
+}
+
+_engine: Optional[SentimentEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_sentiment_engine() -> SentimentEngine:
+    """The configured engine (SENTIMENT_ENGINE), loaded once per process on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                name = os.getenv('SENTIMENT_ENGINE', LexiconSentiment.name).lower()
+                _engine = ENGINES.get(name, LexiconSentiment)()
+    return _engine
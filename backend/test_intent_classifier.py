@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test script for the embedded intent classifier (no server needed)
+Short utterances must clear INTENT_CONFIDENCE_THRESHOLD instead of falling
+back to help_request, and off-topic messages must still fall back.
+"""
+
+from intent_classifier import FALLBACK_INTENT, IntentClassifier, get_intent_classifier, load_training_examples
+
+# (message, expected intent)
+UTTERANCES = [
+    ("bye", 'goodbye'), ("goodbye", 'goodbye'), ("ok bye see you", 'goodbye'),
+    ("marks", 'marks_query'), ("show my marks", 'marks_query'), ("my result", 'marks_query'),
+    ("hello", 'greet'), ("hi", 'greet'), ("fee details", 'fee_query'), ("what are my fees", 'fee_query'),
+    ("my attendance", 'attendance_query'), ("my attendence", 'attendance_query'),
+    ("upcoming events", 'event_query'), ("who made you", 'ask_creator'),
+    ("tell me a joke", FALLBACK_INTENT), ("what is the weather", FALLBACK_INTENT),
+]
+
+
+def test_utterances():
+    classifier = get_intent_classifier()
+    for message, expected in UTTERANCES:
+        intent, confidence = classifier.predict(message)
+        assert intent == expected, f"{message!r}: {intent} ({confidence:.2f}), expected {expected}"
+
+
+def test_training_covers_intent_table():
+    labels = IntentClassifier.train(load_training_examples()).labels
+    for intent in ('goodbye', 'marks_query', 'greet', 'fee_query', 'attendance_query', 'event_query'):
+        assert intent in labels, f"{intent} is not a trained intent"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Embedded Intent Classifier")
+    print("=" * 50)
+    classifier = get_intent_classifier()
+    failures = 0
+    for message, expected in UTTERANCES:
+        intent, confidence = classifier.predict(message)
+        ok = intent == expected
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {message!r}: {intent} ({confidence:.2f})" + ("" if ok else f", expected {expected}"))
+    print(f"\n{len(UTTERANCES) - failures}/{len(UTTERANCES)} utterances classified as expected")
@@ -0,0 +1,305 @@
+"""
+Voice pipeline for /api/chatbot/voice: speech-to-text and text-to-speech.
+
+pyttsx3 engines are not thread-safe and are slow to initialise, so a single
+engine lives on a dedicated worker thread and every synthesis request is
+queued to it. Under gevent that thread is a real OS thread from gevent's
+threadpool, so synthesis never blocks the event loop. Uploaded audio is
+converted in memory instead of through temp files. The fixed error replies are
+synthesized once and served from an LRU cache afterwards.
+
+Speech recognition is pluggable (STT_BACKEND): 'google' calls the hosted
+Google recognizer, 'vosk' decodes offline with a model loaded once per
+process. Recognizers consume 16 kHz mono 16-bit PCM in chunks. Werkzeug has
+already received the whole upload when the route runs, so this does not
+overlap decoding with the network. What chunking saves is holding a second,
+converted copy of a WAV clip: vosk decodes it frame by frame.
+"""
+import io
+import json
+import os
+import queue
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Iterable, Iterator, Optional
+
+# Fixed replies used by the voice endpoint - these go through the audio cache
+VOICE_NOT_UNDERSTOOD = 'Sorry, I could not understand your voice. Please try speaking more clearly.'
+VOICE_SERVICE_ERROR = 'Sorry, there was an error with the speech recognition service. Please try again.'
+VOICE_PROCESSING_ERROR = 'Sorry, there was an error processing your voice message. Please try again.'
+VOICE_NO_RESPONSE = 'Sorry, I could not process your request.'
+CANNED_RESPONSES = (VOICE_NOT_UNDERSTOOD, VOICE_SERVICE_ERROR, VOICE_PROCESSING_ERROR, VOICE_NO_RESPONSE)
+
+
+class SpeechNotUnderstood(Exception):
+    """The recognizer returned no transcript for the audio"""
+
+
+class SpeechServiceUnavailable(Exception):
+    """The recognition backend could not be reached or failed"""
+
+
+# Recognizers take 16 kHz mono 16-bit PCM
+PCM_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2
+PCM_CHUNK_FRAMES = 4000  # 0.25 s per chunk
+
+
+class GoogleRecognizer:
+    """Hosted Google Speech Recognition (free, no API key, needs network)"""
+    name = 'google'
+
+    def transcribe(self, pcm_chunks: Iterable[bytes]) -> str:
+        import speech_recognition as sr
+
+        # The web API takes a whole utterance, so the chunks are joined first
+        audio_data = sr.AudioData(b''.join(pcm_chunks), PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH)
+        try:
+            return sr.Recognizer().recognize_google(audio_data, language='en-US')
+        except sr.UnknownValueError:
+            raise SpeechNotUnderstood()
+        except sr.RequestError as e:
+            raise SpeechServiceUnavailable(str(e))
+
+
+class VoskRecognizer:
+    """Offline Kaldi/Vosk decoding with a local model (VOSK_MODEL_PATH)"""
+    name = 'vosk'
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or os.getenv('VOSK_MODEL_PATH', 'models/vosk-model-small-en-us')
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _get_model(self):
+        # Loading a model takes seconds and hundreds of MB - do it once per process
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        import vosk
+                        vosk.SetLogLevel(-1)
+                        self._model = vosk.Model(self.model_path)
+                    except Exception as e:
+                        raise SpeechServiceUnavailable(f"Could not load Vosk model from {self.model_path}: {e}")
+        return self._model
+
+    def transcribe(self, pcm_chunks: Iterable[bytes]) -> str:
+        model = self._get_model()
+        import vosk
+
+        decoder = vosk.KaldiRecognizer(model, PCM_SAMPLE_RATE)
+        for chunk in pcm_chunks:
+            decoder.AcceptWaveform(chunk)
+        text = (json.loads(decoder.FinalResult()).get('text') or '').strip()
+        if not text:
+            raise SpeechNotUnderstood()
+        return text
+
+
+RECOGNIZERS = {
+    GoogleRecognizer.name: GoogleRecognizer,
+    VoskRecognizer.name: VoskRecognizer,
+}
+
+
+# Codecs clients can ask for: codec -> (pydub export format, extra args, MIME type)
+AUDIO_CODECS = {
+    'wav': (None, {}, 'audio/wav'),
+    'opus': ('ogg', {'codec': 'libopus', 'bitrate': '24k'}, 'audio/ogg'),
+    'mp3': ('mp3', {'bitrate': '48k'}, 'audio/mpeg'),
+}
+
+
+def _gevent_patched() -> bool:
+    """True under a gevent worker, where threading.Thread is monkey-patched into a greenlet"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+class TTSWorker:
+    """Owns the process's only pyttsx3 engine; all synthesis runs on one OS thread.
+
+    Under gevent a threading.Thread is really a greenlet, and runAndWait()
+    would block the hub - and every stream and request in the worker - for the
+    whole synthesis. There the engine lives on a one-thread gevent threadpool
+    (a real OS thread), and callers wait on its result cooperatively.
+    """
+
+    def __init__(self, driver: Optional[str] = None, rate: int = 150, volume: float = 0.8):
+        self.driver = driver
+        self.rate = rate
+        self.volume = volume
+        self._jobs: 'queue.Queue' = queue.Queue()
+        self._thread = None
+        self._pool = None
+        self._start_lock = threading.Lock()
+        # Only ever touched from the synthesis thread
+        self._engine = None
+        self._scratch_path = os.path.join(tempfile.gettempdir(), f'smartedu_tts_{os.getpid()}.wav')
+
+    def submit(self, text: str) -> Future:
+        """Queue text for synthesis; the future resolves to WAV bytes"""
+        self._ensure_started()
+        future: Future = Future()
+        if self._pool is None:
+            self._jobs.put((text, future))
+            return future
+
+        import gevent
+        future.set_running_or_notify_cancel()
+
+        def synthesize():
+            # apply() parks this greenlet until the pool thread is done; the hub keeps running
+            try:
+                future.set_result(self._pool.apply(self._synthesize, (text,)))
+            except Exception as e:
+                future.set_exception(e)
+
+        gevent.spawn(synthesize)
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None or self._pool is not None:
+            return
+        with self._start_lock:
+            if self._thread is None and self._pool is None:
+                if _gevent_patched():
+                    from gevent.threadpool import ThreadPool
+                    # One thread, so the engine always runs on the thread that created it
+                    self._pool = ThreadPool(1)
+                else:
+                    self._thread = threading.Thread(target=self._run, name='tts-worker', daemon=True)
+                    self._thread.start()
+
+    def _init_engine(self):
+        import pyttsx3
+        engine = pyttsx3.init(self.driver) if self.driver else pyttsx3.init()
+        # Prefer a female voice if one is installed (looked up once, not per reply)
+        for voice in engine.getProperty('voices') or []:
+            if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+        engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+        return engine
+
+    def _synthesize(self, text: str) -> bytes:
+        """WAV bytes for text; runs on the synthesis thread"""
+        try:
+            if self._engine is None:
+                self._engine = self._init_engine()
+            # pyttsx3 can only render to a file path, so the worker reuses one scratch file
+            self._engine.save_to_file(text, self._scratch_path)
+            self._engine.runAndWait()
+            with open(self._scratch_path, 'rb') as audio_file:
+                return audio_file.read()
+        except Exception:
+            # Drop the engine so the next job starts from a fresh one
+            self._engine = None
+            raise
+
+    def _run(self):
+        while True:
+            text, future = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._synthesize(text))
+            except Exception as e:
+                future.set_exception(e)
+
+
+class VoiceService:
+    def __init__(self, cache_size: int = 32):
+        backend = os.getenv('STT_BACKEND', GoogleRecognizer.name).lower()
+        self.recognizer = RECOGNIZERS.get(backend, GoogleRecognizer)()
+        self.tts = TTSWorker(driver=os.getenv('TTS_DRIVER') or None)
+        self.synthesis_timeout = float(os.getenv('TTS_TIMEOUT_SECONDS', '30'))
+        self.cache_size = cache_size
+        # text -> Future of WAV bytes, so concurrent requests share one synthesis
+        self._audio_cache: 'OrderedDict[str, Future]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def transcribe(self, upload) -> str:
+        """Transcribe an uploaded clip (a readable, seekable file object) to text"""
+        return self.recognizer.transcribe(self._pcm_chunks(upload))
+
+    def _pcm_chunks(self, upload) -> Iterator[bytes]:
+        """Yield the (already received) upload as 16 kHz mono 16-bit PCM chunks"""
+        # WAV already in the recognizer's format is read frame by frame, with no converted copy
+        try:
+            wav = wave.open(upload, 'rb')
+        except (wave.Error, EOFError):
+            wav = None
+        if wav is not None:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (PCM_SAMPLE_RATE, 1, PCM_SAMPLE_WIDTH):
+                while True:
+                    frames = wav.readframes(PCM_CHUNK_FRAMES)
+                    if not frames:
+                        return
+                    yield frames
+
+        # Anything else (webm/ogg from browsers, other rates) is converted in memory
+        from pydub import AudioSegment
+
+        upload.seek(0)
+        audio = AudioSegment.from_file(upload)
+        pcm = audio.set_frame_rate(PCM_SAMPLE_RATE).set_channels(1).set_sample_width(PCM_SAMPLE_WIDTH).raw_data
+        chunk_bytes = PCM_CHUNK_FRAMES * PCM_SAMPLE_WIDTH
+        for offset in range(0, len(pcm), chunk_bytes):
+            yield pcm[offset:offset + chunk_bytes]
+
+    def speak(self, text: str) -> Optional[bytes]:
+        """WAV audio for the text, or None if synthesis is unavailable"""
+        if text in CANNED_RESPONSES:
+            future = self._cached_synthesis(text)
+        else:
+            future = self.tts.submit(text)
+        try:
+            return future.result(timeout=self.synthesis_timeout)
+        except Exception as e:
+            print(f"Error in text-to-speech: {e}")
+            if text in CANNED_RESPONSES:
+                with self._cache_lock:
+                    if self._audio_cache.get(text) is future:
+                        del self._audio_cache[text]
+            return None
+
+    def encode(self, wav_bytes: bytes, codec: str = 'wav'):
+        """Re-encode synthesized WAV for the wire; returns (bytes, MIME type).
+        Falls back to the original WAV if the codec is unknown or ffmpeg fails.
+        """
+        export_format, export_args, mimetype = AUDIO_CODECS.get(codec, AUDIO_CODECS['wav'])
+        if export_format is None:
+            return wav_bytes, mimetype
+        try:
+            from pydub import AudioSegment
+
+            encoded = io.BytesIO()
+            AudioSegment.from_wav(io.BytesIO(wav_bytes)).export(encoded, format=export_format, **export_args)
+            return encoded.getvalue(), mimetype
+        except Exception as e:
+            print(f"Error encoding audio as {codec}: {e}")
+            return wav_bytes, AUDIO_CODECS['wav'][2]
+
+    def _cached_synthesis(self, text: str) -> Future:
+        with self._cache_lock:
+            future = self._audio_cache.get(text)
+            if future is not None:
+                self._audio_cache.move_to_end(text)
+                return future
+            future = self.tts.submit(text)
+            self._audio_cache[text] = future
+            while len(self._audio_cache) > self.cache_size:
+                self._audio_cache.popitem(last=False)
+            return future
+
+
+voice_service = VoiceService()
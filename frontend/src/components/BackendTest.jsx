@@ -18,7 +18,7 @@ const BackendTest = () => {
       { name: 'Students', url: '/api/students', method: 'GET' },
       { name: 'Events', url: '/events', method: 'GET' },
       { name: 'Announcements', url: '/api/announcements', method: 'GET' },
-      { name: 'Chat (with sentiment)', url: '/chat', method: 'POST', data: { message: 'Hello!', user_id: 1, language_code: 'en' } }
+      { name: 'Chat (with sentiment)', url: '/chat', method: 'POST', data: { message: 'Hello!', language_code: 'en' } }
     ];
 
     for (const endpoint of endpoints) {
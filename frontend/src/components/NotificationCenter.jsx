@@ -12,27 +12,87 @@ import axios from 'axios';
 const NotificationCenter = () => {
   const [notifications, setNotifications] = useState([]);
   const [unreadCount, setUnreadCount] = useState(0);
+  // Announcements are not notification rows; their unread count and read marks
+  // live in the announcement inbox (/api/announcements/...)
+  const [unreadAnnouncements, setUnreadAnnouncements] = useState(0);
   const [isOpen, setIsOpen] = useState(false);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchNotifications();
-    fetchUnreadCount();
-    
-    // Poll for new notifications every 30 seconds
-    const interval = setInterval(() => {
+
+    const token = localStorage.getItem('token');
+    if (!token) {
       fetchUnreadCount();
-    }, 30000);
+      return undefined;
+    }
+    fetchAnnouncements();
+
+    // Server pushes new notifications and unread-count changes instead of us polling.
+    // The stream URL carries a short-lived ticket, never the Bearer token itself.
+    let stream = null;
+    let retryTimer = null;
+    let closed = false;
+    const connect = async () => {
+      try {
+        const { data } = await axios.post('/api/notifications/stream-ticket');
+        if (closed) return;
+        stream = new EventSource(`/api/notifications/stream?ticket=${encodeURIComponent(data.ticket)}`);
+      } catch (error) {
+        console.error('Error opening notification stream:', error);
+        retryTimer = setTimeout(connect, 30000);
+        return;
+      }
+      stream.addEventListener('unread_count', (event) => {
+        const data = JSON.parse(event.data);
+        if (data.unread_count !== undefined) {
+          setUnreadCount(data.unread_count);
+        } else {
+          setUnreadCount(count => Math.max(0, count + data.delta));
+        }
+      });
+      stream.addEventListener('notification', (event) => {
+        const notification = JSON.parse(event.data);
+        setNotifications(prev => [{ ...notification, isRead: notification.is_read }, ...prev]);
+      });
+      stream.addEventListener('announcement', (event) => {
+        const announcement = JSON.parse(event.data);
+        setNotifications(prev => [toAnnouncementItem({ ...announcement, is_read: false }), ...prev]);
+        setUnreadAnnouncements(count => count + 1);
+        toast(announcement.title);
+      });
+      // The server ends streams periodically and tickets expire, so reconnect
+      // with a fresh ticket instead of letting EventSource retry the old URL
+      stream.onerror = () => {
+        stream.close();
+        retryTimer = setTimeout(connect, 3000);
+      };
+    };
+    connect();
 
-    return () => clearInterval(interval);
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (stream) stream.close();
+    };
   }, []);
 
+  const toAnnouncementItem = (announcement) => ({
+    ...announcement,
+    id: `announcement-${announcement.announcement_id}`,
+    isAnnouncement: true,
+    isRead: announcement.is_read
+  });
+
   const fetchNotifications = async () => {
     try {
-      const token = localStorage.getItem('token');
       const response = await axios.get('/api/notifications');
       const data = response.data;
-      if (data.success) {
+      // The endpoint returns one page as a bare array
+      if (Array.isArray(data)) {
+        const loaded = data.map(notification => ({ ...notification, isRead: notification.is_read }));
+        setNotifications(prev => [...prev.filter(item => item.isAnnouncement), ...loaded]);
+      } else if (data.success) {
         setNotifications(data.notifications);
       }
     } catch (error) {
@@ -43,6 +103,19 @@ const NotificationCenter = () => {
     }
   };
 
+  const fetchAnnouncements = async () => {
+    try {
+      const [count, feed] = await Promise.all([
+        axios.get('/api/announcements/unread-count'),
+        axios.get('/api/announcements/feed', { params: { unread_only: true } })
+      ]);
+      setUnreadAnnouncements(count.data.unread_count);
+      setNotifications(prev => [...feed.data.map(toAnnouncementItem), ...prev.filter(item => !item.isAnnouncement)]);
+    } catch (error) {
+      console.error('Error fetching announcements:', error);
+    }
+  };
+
   const fetchUnreadCount = async () => {
     try {
       const response = await axios.get('/api/notifications/unread-count');
@@ -56,26 +129,35 @@ const NotificationCenter = () => {
   };
 
   const markAsRead = async (notificationId) => {
+    const item = notifications.find(notif => notif.id === notificationId);
+    if (!item || item.isRead) return;
     try {
-      const token = localStorage.getItem('token');
-      await fetch(`/api/notifications/${notificationId}/read`, {
-        method: 'PATCH',
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
-      
-      // Update local state
-      setNotifications(notifications.map(notif => 
+      if (item.isAnnouncement) {
+        await axios.put(`/api/announcements/${item.announcement_id}/read`);
+        setUnreadAnnouncements(count => Math.max(0, count - 1));
+      } else {
+        // The server pushes the unread_count change over the stream
+        await axios.put(`/api/notifications/${notificationId}/read`);
+      }
+      setNotifications(prev => prev.map(notif =>
         notif.id === notificationId ? { ...notif, isRead: true } : notif
       ));
-      setUnreadCount(Math.max(0, unreadCount - 1));
-      
     } catch (error) {
       console.error('Error marking notification as read:', error);
     }
   };
 
+  const markAllAsRead = async () => {
+    notifications.filter(notif => !notif.isAnnouncement).forEach(notif => markAsRead(notif.id));
+    try {
+      await axios.put('/api/announcements/read-all');
+      setUnreadAnnouncements(0);
+      setNotifications(prev => prev.map(notif => (notif.isAnnouncement ? { ...notif, isRead: true } : notif)));
+    } catch (error) {
+      console.error('Error marking announcements as read:', error);
+    }
+  };
+
   const getNotificationIcon = (type) => {
     switch (type) {
       case 'exam':
@@ -108,9 +190,9 @@ const NotificationCenter = () => {
         className="relative p-2 text-gray-600 hover:text-gray-900 focus:outline-none focus:ring-2 focus:ring-blue-500 rounded-full"
       >
         <BellIcon className="h-6 w-6" />
-        {unreadCount > 0 && (
+        {unreadCount + unreadAnnouncements > 0 && (
           <span className="absolute -top-1 -right-1 bg-red-500 text-white text-xs rounded-full h-5 w-5 flex items-center justify-center">
-            {unreadCount > 9 ? '9+' : unreadCount}
+            {unreadCount + unreadAnnouncements > 9 ? '9+' : unreadCount + unreadAnnouncements}
           </span>
         )}
       </button>
@@ -172,9 +254,7 @@ const NotificationCenter = () => {
           {notifications.length > 0 && (
             <div className="p-4 border-t border-gray-200">
               <button
-                onClick={() => {
-                  notifications.forEach(notif => markAsRead(notif.id));
-                }}
+                onClick={markAllAsRead}
                 className="text-sm text-blue-600 hover:text-blue-800"
               >
                 Mark all as read
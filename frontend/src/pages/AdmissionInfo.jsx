@@ -17,12 +17,14 @@ const AdmissionInfo = () => {
   const [includeHostel, setIncludeHostel] = useState(false);
   const [includeTransport, setIncludeTransport] = useState(false);
   const [calculatedFees, setCalculatedFees] = useState(null);
+  const [feeMatrix, setFeeMatrix] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchAdmissionData();
     fetchFeeData();
     fetchContactData();
+    fetchFeeMatrix();
   }, []);
 
   const fetchAdmissionData = async () => {
@@ -66,7 +68,27 @@ const AdmissionInfo = () => {
     }
   };
 
+  // Every branch/hostel/transport combination, so the calculator works locally
+  const fetchFeeMatrix = async () => {
+    try {
+      const response = await fetch('/api/admission/fees/matrix');
+      const data = await response.json();
+      if (data.success) {
+        setFeeMatrix(data.data);
+      }
+    } catch (error) {
+      console.error('Error fetching fee matrix:', error);
+    }
+  };
+
   const calculateFees = async () => {
+    const branchFees = feeMatrix && (feeMatrix.matrix[selectedBranch] || feeMatrix.matrix[feeMatrix.defaultBranch]);
+    if (branchFees) {
+      setCalculatedFees(branchFees[includeHostel.toString()][includeTransport.toString()]);
+      toast.success('Fee calculation completed');
+      return;
+    }
+
     try {
       const params = new URLSearchParams({
         branch: selectedBranch,
@@ -20,6 +20,8 @@ const Chatbot = () => {
   const messagesEndRef = useRef(null);
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
+  // Clip currently playing and its blob URL, so the URL is revoked once it is done
+  const currentAudioRef = useRef(null);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -29,6 +31,9 @@ const Chatbot = () => {
     scrollToBottom();
   }, [messages]);
 
+  // Release the playing clip's blob URL when leaving the page
+  useEffect(() => () => stopCurrentAudio(), []);
+
 
   const sendMessage = async () => {
     if (!inputMessage.trim()) return;
@@ -48,7 +53,7 @@ const Chatbot = () => {
     try {
       const response = await axios.post('/chatbot', {
         message: messageToSend,
-        user_id: user?.user_id || 1
+        user_id: user?.user_id
       });
 
       const aiMessage = {
@@ -171,6 +176,9 @@ const Chatbot = () => {
     formData.append('audio', audioBlob, 'voice-message.wav');
     formData.append('user_id', user?.user_id || '');
     formData.append('student_id', user?.student_id || '');
+    // Ask for raw (compressed) audio in the body instead of hex inside JSON
+    formData.append('response_format', 'binary');
+    formData.append('audio_codec', 'mp3');
 
     setLoading(true);
 
@@ -178,11 +186,26 @@ const Chatbot = () => {
       const response = await axios.post('/api/chatbot/voice', formData, {
         headers: {
           'Content-Type': 'multipart/form-data'
-        }
+        },
+        responseType: 'blob'
       });
 
+      // Binary replies carry the text in headers; otherwise the body is JSON
+      let reply;
+      let audioBlob = null;
+      if (response.headers['x-audio-response'] === 'true') {
+        reply = {
+          intent: response.headers['x-chatbot-intent'],
+          response: decodeURIComponent(response.headers['x-chatbot-response'] || '')
+        };
+        // Kept as a Blob; each playback makes (and revokes) its own object URL
+        audioBlob = response.data;
+      } else {
+        reply = JSON.parse(await response.data.text());
+      }
+
       // Get the recognized text from the response
-      const recognizedText = response.data.response || 'Voice message received';
+      const recognizedText = reply.response || 'Voice message received';
       
       const userMessage = {
         id: Date.now(),
@@ -193,18 +216,18 @@ const Chatbot = () => {
 
       const aiMessage = {
         id: Date.now() + 1,
-        content: response.data.response,
+        content: reply.response,
         sender: 'ai',
         timestamp: new Date().toISOString(),
-        audioResponse: response.data.audio_response || false,
-        audioData: response.data.audio_data || null
+        audioResponse: Boolean(audioBlob),
+        audioData: audioBlob
       };
 
       setMessages(prev => [...prev, userMessage, aiMessage]);
       
       // Play audio response if available
-      if (response.data.audio_response && response.data.audio_data) {
-        playAudioResponse(response.data.audio_data);
+      if (audioBlob) {
+        playAudioResponse(audioBlob);
       }
       
       toast.success('Voice message processed!');
@@ -213,8 +236,14 @@ const Chatbot = () => {
       
       // Provide specific error messages
       let errorMessage = 'Failed to process voice message';
-      if (error.response?.data?.error) {
-        errorMessage = error.response.data.error;
+      let errorBody = null;
+      try {
+        errorBody = JSON.parse(await error.response?.data?.text());
+      } catch (parseError) {
+        errorBody = null;
+      }
+      if (errorBody?.error) {
+        errorMessage = errorBody.error;
       } else if (error.message) {
         errorMessage = error.message;
       }
@@ -235,26 +264,34 @@ const Chatbot = () => {
     }
   };
 
-  const playAudioResponse = (audioDataHex) => {
+  const stopCurrentAudio = () => {
+    const current = currentAudioRef.current;
+    if (current) {
+      current.audio.pause();
+      URL.revokeObjectURL(current.url);
+      currentAudioRef.current = null;
+    }
+  };
+
+  const playAudioResponse = (audioBlob) => {
     try {
-      // Convert hex string back to binary
-      const audioData = new Uint8Array(audioDataHex.match(/.{1,2}/g).map(byte => parseInt(byte, 16)));
-      
-      // Create blob from binary data
-      const audioBlob = new Blob([audioData], { type: 'audio/wav' });
-      const audioUrl = URL.createObjectURL(audioBlob);
-      
-      // Create and play audio
-      const audio = new Audio(audioUrl);
+      // The next clip replaces the one playing; its URL is released either way
+      stopCurrentAudio();
+      const url = URL.createObjectURL(audioBlob);
+      const audio = new Audio(url);
+      currentAudioRef.current = { audio, url };
+      const release = () => {
+        if (currentAudioRef.current?.audio === audio) {
+          stopCurrentAudio();
+        }
+      };
+      audio.onended = release;
+      audio.onerror = release;
       audio.play().catch(error => {
         console.error('Error playing audio:', error);
         toast.error('Could not play audio response');
+        release();
       });
-      
-      // Clean up URL after playing
-      audio.onended = () => {
-        URL.revokeObjectURL(audioUrl);
-      };
     } catch (error) {
       console.error('Error processing audio response:', error);
       toast.error('Could not process audio response');
@@ -316,6 +316,12 @@ const EventRegistration = () => {
                     <UserGroupIcon className="h-4 w-4 mr-2" />
                     {event.registrationCount} registered
                     {event.max_participants && ` / ${event.max_participants} max`}
+                    {event.is_registered && (
+                      <span className="ml-2 inline-flex items-center px-2 py-0.5 rounded-full text-xs font-medium bg-green-100 text-green-800">
+                        <CheckCircleIcon className="h-3 w-3 mr-1" />
+                        Registered
+                      </span>
+                    )}
                   </div>
 
                   <div className="flex space-x-2">
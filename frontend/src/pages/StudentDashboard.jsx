@@ -24,11 +24,10 @@ const StudentDashboard = () => {
   useEffect(() => {
     const load = async () => {
       try {
-        // Fetch announcements for notifications
+        // Unread announcements addressed to this student
         try {
-          const announcementsRes = await axios.get('/api/announcements');
-          const announcements = announcementsRes.data || [];
-          setStats((s) => ({ ...s, notifications: announcements.length }));
+          const unreadRes = await axios.get('/api/announcements/unread-count');
+          setStats((s) => ({ ...s, notifications: unreadRes.data?.unread_count || 0 }));
         } catch {}
 
         // Fetch upcoming events
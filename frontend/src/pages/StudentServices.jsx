@@ -116,8 +116,12 @@ const StudentServices = () => {
 
   const handleEventRegistration = async (eventId) => {
     try {
-      await axios.post(`/api/events/${eventId}/register`);
-      toast.success('Successfully registered for event!');
+      const res = await axios.post(`/api/events/${eventId}/register`);
+      if (res.data?.waitlisted) {
+        toast.success(`Event is full - you are #${res.data.position} on the waitlist`);
+      } else {
+        toast.success('Successfully registered for event!');
+      }
       fetchData();
     } catch (error) {
       toast.error('Failed to register for event');